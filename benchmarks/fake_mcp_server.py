@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Stand-in stdio MCP server for offline benchmarks.
+
+Exposes the tool names of one of the real security servers (SecOps SIEM,
+SecOps SOAR or GTI) and answers every call with a synthetic JSON payload of
+a configurable size after a configurable delay:
+
+    python fake_mcp_server.py --toolset gti --latency-ms 80 --jitter-ms 20 --payload-bytes 4096
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+
+from mcp.server.fastmcp import FastMCP
+
+# Tool names per toolset, as exposed by the mcp-security servers (see
+# rules-bank/tools/*_MCP_TOOLS_REFERENCE.md).
+TOOLSETS = {
+    "secops": [
+        "search_security_events",
+        "get_security_alerts",
+        "get_security_alert_by_id",
+        "do_update_security_alert",
+        "lookup_entity",
+        "list_security_rules",
+        "search_security_rules",
+        "get_rule_detections",
+        "list_rule_errors",
+        "get_ioc_matches",
+        "get_threat_intel",
+    ],
+    "secops_soar": [
+        "list_cases",
+        "post_case_comment",
+        "list_alerts_by_case",
+        "list_alert_group_identifiers_by_case",
+        "list_events_by_alert",
+        "change_case_priority",
+        "get_entities_by_alert_group_identifiers",
+        "get_entity_details",
+        "search_entity",
+        "get_case_full_details",
+    ],
+    "gti": [
+        "get_file_report",
+        "get_domain_report",
+        "get_ip_address_report",
+        "get_url_report",
+        "get_collection_report",
+        "get_collection_mitre_tree",
+        "get_collection_timeline_events",
+        "get_file_behavior_summary",
+        "get_entities_related_to_a_file",
+        "get_entities_related_to_a_domain",
+        "get_entities_related_to_an_ip_address",
+        "get_entities_related_to_an_url",
+        "search_threats",
+        "search_threat_actors",
+        "search_malware_families",
+        "search_campaigns",
+        "search_iocs",
+    ],
+}
+
+
+def make_payload(tool_name: str, arguments: dict, size: int, sequence: int) -> str:
+    """Builds a JSON response of roughly `size` bytes."""
+    response = {"tool": tool_name, "arguments": arguments, "sequence": sequence, "records": []}
+    record = {"id": 0, "value": "x" * 48}
+    text = json.dumps(response)
+    while len(text) < size:
+        response["records"].append(dict(record, id=len(response["records"])))
+        text = json.dumps(response)
+    return text
+
+
+def build_server(toolset: str, latency_ms: float, jitter_ms: float, payload_bytes: int) -> FastMCP:
+    """Creates a FastMCP server exposing the tool names of `toolset`."""
+    server = FastMCP(f"fake-{toolset}", log_level="WARNING")
+    calls = {"count": 0}
+
+    def register(tool_name):
+        async def tool(
+            case_id: str = "",
+            query: str = "",
+            entity: str = "",
+            hash: str = "",
+            limit: int = 10,
+        ) -> str:
+            calls["count"] += 1
+            delay = latency_ms + random.uniform(-jitter_ms, jitter_ms)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+            arguments = {
+                key: value for key, value in
+                (("case_id", case_id), ("query", query), ("entity", entity), ("hash", hash))
+                if value
+            }
+            return make_payload(tool_name, arguments, payload_bytes, calls["count"])
+
+        server.add_tool(tool, name=tool_name, description=f"Fake {toolset} tool {tool_name}.")
+
+    for tool_name in TOOLSETS[toolset]:
+        register(tool_name)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake MCP server for benchmarks")
+    parser.add_argument('--toolset', choices=sorted(TOOLSETS), required=True)
+    parser.add_argument('--latency-ms', type=float, default=float(os.environ.get("FAKE_MCP_LATENCY_MS", "50")))
+    parser.add_argument('--jitter-ms', type=float, default=float(os.environ.get("FAKE_MCP_JITTER_MS", "10")))
+    parser.add_argument('--payload-bytes', type=int, default=int(os.environ.get("FAKE_MCP_PAYLOAD_BYTES", "2048")))
+    args = parser.parse_args()
+
+    build_server(args.toolset, args.latency_ms, args.jitter_ms, args.payload_bytes).run()
+
+
+if __name__ == "__main__":
+    main()
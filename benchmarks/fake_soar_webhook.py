@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Stand-in SOAR that pushes case-closed notifications to the DAC webhook listener.
+
+Posts generated closed false-positive cases (scenarios.dac_cases, in the raw
+SOAR case shape) to a running listener, optionally signed, then polls its
+/health endpoint until every case has been processed and prints the
+receipt-to-processed latency reported by the listener.
+
+    python benchmarks/fake_soar_webhook.py --url http://127.0.0.1:8787/soar/case-closed --cases 5
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import aiohttp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from scenarios import dac_cases  # noqa: E402
+
+DEFAULT_URL = "http://127.0.0.1:8787/soar/case-closed"
+SIGNATURE_HEADER = "X-DAC-Signature"
+
+
+def raw_case(case: dict) -> dict:
+    """Converts a generated tuning case to a closed SOAR case as SOAR reports it."""
+    raw = {
+        "id": case["id"],
+        "status": "CLOSED",
+        "rootCause": "False Positive",
+        "closeComment": case["analyst_comment"],
+        "ruleName": case["rule_name"],
+        "userName": case["user_name"],
+        "hostName": case["host_name"],
+        "closeTime": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    if case.get("process_name"):
+        raw["processName"] = case["process_name"]
+    return raw
+
+
+async def send_cases(url: str, cases: list, secret: str = None, per_request: int = 1) -> list:
+    """Posts raw cases to the listener, `per_request` cases per notification.
+
+    Returns:
+        list: (HTTP status, response body) of every request.
+    """
+    responses = []
+    async with aiohttp.ClientSession() as session:
+        for start in range(0, len(cases), per_request):
+            chunk = cases[start:start + per_request]
+            body = json.dumps(chunk[0] if per_request == 1 else {"cases": chunk}).encode()
+            headers = {"Content-Type": "application/json"}
+            if secret:
+                headers[SIGNATURE_HEADER] = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+            async with session.post(url, data=body, headers=headers) as response:
+                responses.append((response.status, await response.json()))
+    return responses
+
+
+async def wait_until_processed(health_url: str, expected: int, timeout: float = 300.0) -> dict:
+    """Polls the listener's /health until `expected` cases have been handled."""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while True:
+            async with session.get(health_url) as response:
+                health = await response.json()
+            stats = health["stats"]
+            if stats["processed"] + stats["failed"] + stats["duplicates"] >= expected or time.monotonic() > deadline:
+                return health
+            await asyncio.sleep(0.2)
+
+
+async def run(args):
+    cases = [raw_case(case) for case in dac_cases(args.cases, args.run)]
+    start = time.perf_counter()
+    responses = await send_cases(args.url, cases, args.secret, args.per_request)
+    accepted = sum(len(body.get("queued", [])) for status, body in responses if status == 202)
+    print(f"Sent {len(cases)} cases in {len(responses)} requests: {accepted} queued "
+          f"({time.perf_counter() - start:.3f}s)")
+    for status, body in responses:
+        if status != 202:
+            print(f"- HTTP {status}: {body}")
+    if args.no_wait or not accepted:
+        return
+
+    health = await wait_until_processed(args.url.rsplit("/soar/", 1)[0] + "/health", accepted, args.timeout)
+    latency = health["latency_seconds"]
+    print(f"Processed in {time.perf_counter() - start:.2f}s: {json.dumps(health['stats'])}")
+    if latency["count"]:
+        print(f"Receipt to processed: p50 {latency['p50']:.2f}s, max {latency['max']:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Push case-closed notifications to the DAC webhook listener")
+    parser.add_argument('--url', default=DEFAULT_URL, help='Listener case-closed URL')
+    parser.add_argument('--cases', type=int, default=5, help='Number of cases to send')
+    parser.add_argument('--run', type=int, default=0, help='Iteration folded into the case ids (fresh ids per run)')
+    parser.add_argument('--per-request', type=int, default=1, help='Cases per notification')
+    parser.add_argument('--secret', default=os.getenv('DAC_WEBHOOK_SECRET'),
+                        help='Shared secret to sign requests with (default: $DAC_WEBHOOK_SECRET)')
+    parser.add_argument('--timeout', type=float, default=300.0, help='Seconds to wait for processing')
+    parser.add_argument('--no-wait', action='store_true', help='Only send the cases')
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
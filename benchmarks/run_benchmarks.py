@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmarks for the SOC manager and the DAC workflow.
+
+No Chronicle, SOAR, GTI or Gemini access is needed: the MCP toolsets talk to
+fake stdio servers (fake_mcp_server.py) with configurable latency and payload
+size, and every agent's model is replaced by a ScriptedLlm that replays the
+tool-calling turns in scenarios.py.
+
+    python benchmarks/run_benchmarks.py --suite all --cases 20 --latency-ms 50 --output bench.json
+
+Suites:
+    manager  Initializes the manager with initialize_actual_manager_agent and
+             runs each IRP scenario through an ADK Runner.
+    dac      Runs DACWorkflowExecutor.execute_full_workflow against a scratch
+             git repository (local bare "origin", stand-in `gh` CLI) with a
+             copy of dac-agent/rules.
+    webhook  Pushes the same generated cases to the case-closed webhook
+             listener (fake_soar_webhook.py) in front of that sandbox and
+             measures notification-to-PR latency.
+
+Reports p50/p95/p99 latency per scenario, tool calls per case, pool/cache
+statistics and memory (peak RSS and Python heap peak).
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from scenarios import MANAGER_SCENARIOS, dac_cases, manager_case, scripted_steps  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values` (0 < pct <= 100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(latencies):
+    """Latency summary in milliseconds."""
+    if not latencies:
+        return {"count": 0}
+    return {
+        "count": len(latencies),
+        "mean_ms": sum(latencies) / len(latencies) * 1000,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def memory_snapshot():
+    """Current and peak RSS in KiB (Linux/macOS), if available."""
+    snapshot = {"peak_rss_kb": None, "rss_kb": None}
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        snapshot["peak_rss_kb"] = peak // 1024 if sys.platform == "darwin" else peak
+    try:
+        with open("/proc/self/statm") as f:
+            snapshot["rss_kb"] = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        pass
+    return snapshot
+
+
+def fake_connection_params(args, timeout=60):
+    """StdioConnectionParams for the fake servers, keyed like get_mcp_connection_params()."""
+    from google.adk.tools.mcp_tool import StdioConnectionParams
+    from google.adk.tools.mcp_tool.mcp_session_manager import StdioServerParameters
+
+    def params(toolset):
+        return StdioConnectionParams(
+            server_params=StdioServerParameters(
+                command=sys.executable,
+                args=[
+                    str(BENCH_DIR / "fake_mcp_server.py"),
+                    "--toolset", toolset,
+                    "--latency-ms", str(args.latency_ms),
+                    "--jitter-ms", str(args.jitter_ms),
+                    "--payload-bytes", str(args.payload_bytes),
+                ],
+            ),
+            timeout=timeout,
+        )
+
+    return {name: params(name) for name in ("secops", "secops_soar", "gti")}
+
+
+# --------------------------------------------------------------------------
+# Manager suite
+# --------------------------------------------------------------------------
+
+async def run_manager_suite(args):
+    """Benchmarks IRP scenarios through the manager and its sub-agents."""
+    # Keep the fake servers' tool manifests away from the real ones.
+    os.environ.setdefault("MCP_TOOL_MANIFEST_DIR", tempfile.mkdtemp(prefix="bench-manifests-"))
+    sys.path.insert(0, str(REPO_ROOT / "multi-agent"))
+
+    import_start = time.perf_counter()
+    from manager import agent as manager_agent
+    from manager.tools import tools as manager_tools
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from google.genai import types
+    from scripted_llm import ScriptedLlm
+    import_seconds = time.perf_counter() - import_start
+
+    manager_tools.get_mcp_connection_params = functools.partial(fake_connection_params, args)
+
+    # All cases are generated up front so every model instance shares the scripts.
+    cases = []
+    scripts = {}
+    for scenario in args.scenarios:
+        for i in range(args.cases):
+            case = manager_case(scenario, i)
+            scripts[f"{scenario}/{case['case_id']}"] = scripted_steps(scenario, case["values"])
+            cases.append((scenario, case))
+
+    init_start = time.perf_counter()
+    agent = await manager_agent.initialize_actual_manager_agent()
+    init_seconds = time.perf_counter() - init_start
+
+    for each in (agent, *agent.sub_agents):
+        each.model = ScriptedLlm(agent_name=each.name, scenarios=scripts, latency_ms=args.model_latency_ms)
+
+    session_service = InMemorySessionService()
+    runner = Runner(app_name="benchmark", agent=agent, session_service=session_service)
+    local_tools = {"get_runbook", "list_runbooks", "search_rules_bank", "write_report",
+                   "get_current_time", "transfer_to_agent"}
+
+    async def run_case(scenario, case):
+        session = await session_service.create_session(app_name="benchmark", user_id="bench")
+        message = types.Content(role="user", parts=[types.Part(text=case["prompt"])])
+        calls = {"mcp": 0, "local": 0, "errors": 0}
+        start = time.perf_counter()
+        async for event in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            for call in event.get_function_calls():
+                calls["local" if call.name in local_tools else "mcp"] += 1
+            for response in event.get_function_responses():
+                if isinstance(response.response, dict) and response.response.get("error"):
+                    calls["errors"] += 1
+        return scenario, time.perf_counter() - start, calls
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(scenario, case):
+        async with semaphore:
+            return await run_case(scenario, case)
+
+    if args.warmup:
+        await run_case(*cases[0])
+
+    tracemalloc.start()
+    suite_start = time.perf_counter()
+    results = await asyncio.gather(*(bounded(scenario, case) for scenario, case in cases))
+    wall_seconds = time.perf_counter() - suite_start
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_scenario = {}
+    for scenario, seconds, calls in results:
+        entry = per_scenario.setdefault(scenario, {"latencies": [], "mcp": 0, "local": 0, "errors": 0})
+        entry["latencies"].append(seconds)
+        for key in ("mcp", "local", "errors"):
+            entry[key] += calls[key]
+
+    pools = {}
+    for each in agent.sub_agents:
+        for tool in each.tools:
+            toolset = getattr(tool, "toolset", tool)
+            if hasattr(toolset, "stats") and hasattr(toolset, "pool_size"):
+                pools[toolset.name] = toolset
+    pool_stats = {name: pool.stats() for name, pool in pools.items()}
+    for pool in pools.values():
+        await pool.close()
+
+    return {
+        "import_seconds": import_seconds,
+        "init_seconds": init_seconds,
+        "init_timings": dict(manager_agent.last_init_timings),
+        "wall_seconds": wall_seconds,
+        "cases": len(results),
+        "throughput_cases_per_s": len(results) / wall_seconds if wall_seconds else None,
+        "scenarios": {
+            scenario: {
+                **summarize(entry["latencies"]),
+                "mcp_calls_per_case": entry["mcp"] / len(entry["latencies"]),
+                "local_calls_per_case": entry["local"] / len(entry["latencies"]),
+                "tool_errors": entry["errors"],
+            }
+            for scenario, entry in per_scenario.items()
+        },
+        "model_requests": sum(each.model.requests for each in (agent, *agent.sub_agents)),
+        "pools": pool_stats,
+        "python_heap_peak_kb": heap_peak // 1024,
+        **memory_snapshot(),
+    }
+
+
+# --------------------------------------------------------------------------
+# DAC suite
+# --------------------------------------------------------------------------
+
+def _git(cwd, *git_args):
+    subprocess.run(["git", *git_args], cwd=cwd, check=True, capture_output=True)
+
+
+def make_dac_sandbox(root: Path) -> Path:
+    """Creates a working clone of the rules with a local bare origin and a fake `gh`."""
+    origin = root / "origin.git"
+    work = root / "work"
+    _git(root, "init", "--bare", "-b", "main", str(origin))
+    _git(root, "clone", str(origin), str(work))
+    _git(work, "checkout", "-b", "main")
+    _git(work, "config", "user.email", "bench@example.com")
+    _git(work, "config", "user.name", "DAC Benchmark")
+    shutil.copytree(REPO_ROOT / "dac-agent" / "rules", work / "rules")
+    _git(work, "add", "rules")
+    _git(work, "commit", "-m", "Initial rules")
+    _git(work, "push", "-u", "origin", "main")
+
+    bin_dir = root / "bin"
+    bin_dir.mkdir()
+    gh = bin_dir / "gh"
+    gh.write_text(
+        "#!/bin/sh\n"
+        "# Stand-in for `gh pr create`: prints a fake PR URL.\n"
+        "echo \"https://github.example.com/detections/pull/$$\"\n"
+    )
+    gh.chmod(0o755)
+    (root / "reports").mkdir()
+    return work
+
+
+def dac_agent_tools(args, sandbox: Path, work: Path) -> tuple:
+    """Returns the DAC agent's tools, wired to the fake MCP servers and the sandbox."""
+    from tools import tools as dac_tools
+    from google.adk.tools.mcp_tool import MCPToolset
+
+    reports_dir = sandbox / "reports"
+
+    def write_report(report_name: str, report_contents: str):
+        (reports_dir / f"{report_name}.md").write_text(report_contents)
+
+    connection_params = fake_connection_params(args)
+    agent_tools = (
+        MCPToolset(connection_params=connection_params["secops_soar"]),
+        MCPToolset(connection_params=connection_params["secops"]),
+        MCPToolset(connection_params=connection_params["gti"]),
+        dac_tools.get_current_time,
+        write_report,
+        dac_tools.git_create_branch,
+        dac_tools.git_commit_changes,
+        dac_tools.git_push_branch,
+        dac_tools.create_github_pr,
+        dac_tools.validate_yaml_file,
+        functools.partial(dac_tools.find_rule_files, search_dir=str(work / "rules")),
+    )
+    return agent_tools
+
+
+async def run_dac_suite(args):
+    """Benchmarks DACWorkflowExecutor.execute_full_workflow on generated cases."""
+    sys.path.insert(0, str(REPO_ROOT / "dac-agent"))
+    import workflow as dac_workflow
+    from tools.case_ledger import CaseLedger
+
+    sandbox = Path(tempfile.mkdtemp(prefix="dac-bench-"))
+    work = make_dac_sandbox(sandbox)
+    agent_tools = dac_agent_tools(args, sandbox, work)
+
+    # Keep the benchmark's cases out of the operator's ledger
+    ledger = CaseLedger(str(sandbox / "case_ledger.sqlite3"))
+    batch_latencies = []
+    workflow_latencies = []
+    totals = {"cases_found": 0, "cases_processed": 0, "cases_skipped": 0, "batches": 0, "rules_tuned": 0,
+              "prs_created": 0, "errors": 0}
+
+    class BenchmarkWorkflowExecutor(dac_workflow.DACWorkflowExecutor):
+        """Serves generated cases and times each tuning batch."""
+
+        def __init__(self, tools, cases):
+            super().__init__(tools, max_concurrency=args.dac_concurrency, use_worktrees=args.worktrees,
+                             replay_events=args.dac_replay_events, ledger=ledger)
+            self._cases = cases
+
+        async def _monitor_soar_cases(self):
+            return list(self._cases)
+
+        async def _process_tuning_batch(self, cases, rule_files=None):
+            start = time.perf_counter()
+            try:
+                return await super()._process_tuning_batch(cases, rule_files)
+            finally:
+                batch_latencies.append(time.perf_counter() - start)
+
+    old_cwd = os.getcwd()
+    old_path = os.environ.get("PATH", "")
+    os.chdir(work)
+    os.environ["PATH"] = f"{sandbox / 'bin'}{os.pathsep}{old_path}"
+    tracemalloc.start()
+    try:
+        suite_start = time.perf_counter()
+        for run in range(args.runs):
+            executor = BenchmarkWorkflowExecutor(agent_tools, dac_cases(args.cases, run))
+            start = time.perf_counter()
+            results = await executor.execute_full_workflow()
+            workflow_latencies.append(time.perf_counter() - start)
+            for key in totals:
+                value = results.get(key, 0)
+                totals[key] += len(value) if isinstance(value, list) else value
+        wall_seconds = time.perf_counter() - suite_start
+    finally:
+        _, heap_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        os.chdir(old_cwd)
+        os.environ["PATH"] = old_path
+        ledger.close()
+        if not args.keep_sandbox:
+            shutil.rmtree(sandbox, ignore_errors=True)
+
+    return {
+        "runs": args.runs,
+        "cases_per_run": args.cases,
+        "concurrency": args.dac_concurrency,
+        "worktrees": args.worktrees,
+        "wall_seconds": wall_seconds,
+        "throughput_cases_per_s": totals["cases_processed"] / wall_seconds if wall_seconds else None,
+        "workflow": summarize(workflow_latencies),
+        "batch": summarize(batch_latencies),
+        "totals": totals,
+        "sandbox": str(sandbox) if args.keep_sandbox else None,
+        "python_heap_peak_kb": heap_peak // 1024,
+        **memory_snapshot(),
+    }
+
+
+async def run_webhook_suite(args):
+    """Benchmarks pushed cases: case-closed notification to pull request.
+
+    Starts the webhook listener (webhook.py) on a free local port in front
+    of a DAC executor working in a sandbox, pushes generated cases to it with
+    the stand-in SOAR sender (fake_soar_webhook.py) and reports the latency
+    from receipt of each notification to its pull request.
+    """
+    sys.path.insert(0, str(REPO_ROOT / "dac-agent"))
+    import workflow as dac_workflow
+    from tools.case_ledger import CaseLedger
+    from webhook import CaseWebhookListener, WEBHOOK_PATH
+    from fake_soar_webhook import raw_case, send_cases
+
+    sandbox = Path(tempfile.mkdtemp(prefix="dac-webhook-bench-"))
+    work = make_dac_sandbox(sandbox)
+    ledger = CaseLedger(str(sandbox / "case_ledger.sqlite3"))
+    executor = dac_workflow.DACWorkflowExecutor(
+        dac_agent_tools(args, sandbox, work), max_concurrency=args.dac_concurrency,
+        use_worktrees=args.worktrees, replay_events=args.dac_replay_events, ledger=ledger
+    )
+    listener = CaseWebhookListener(executor, port=0, workers=args.dac_concurrency)
+
+    old_cwd = os.getcwd()
+    old_path = os.environ.get("PATH", "")
+    os.chdir(work)
+    os.environ["PATH"] = f"{sandbox / 'bin'}{os.pathsep}{old_path}"
+    try:
+        await listener.start()
+        url = f"http://{listener.host}:{listener.port}{WEBHOOK_PATH}"
+        cases = [raw_case(case) for run in range(args.runs) for case in dac_cases(args.cases, run)]
+        # Every case is sent twice: the second notification must be deduplicated
+        suite_start = time.perf_counter()
+        responses = await send_cases(url, cases + cases)
+        await listener.queue.join()
+        wall_seconds = time.perf_counter() - suite_start
+    finally:
+        await listener.stop()
+        if executor.worktrees:
+            await executor.worktrees.cleanup()
+        os.chdir(old_cwd)
+        os.environ["PATH"] = old_path
+        prs_created = len({entry["pr_url"] for entry in ledger.entries("pr_created")})
+        ledger.close()
+        if not args.keep_sandbox:
+            shutil.rmtree(sandbox, ignore_errors=True)
+
+    return {
+        "cases": len(cases),
+        "concurrency": args.dac_concurrency,
+        "wall_seconds": wall_seconds,
+        "accepted": sum(1 for status, _ in responses if status == 202),
+        "latency": summarize(list(listener.latencies)),
+        "stats": dict(listener.stats, prs_created=prs_created),
+        "sandbox": str(sandbox) if args.keep_sandbox else None,
+    }
+
+
+def print_summary(report):
+    """Prints a short human-readable table of the results."""
+    manager = report.get("manager")
+    if manager:
+        print(f"\nManager: init {manager['init_seconds']:.2f}s, "
+              f"{manager['cases']} cases in {manager['wall_seconds']:.2f}s")
+        print(f"{'scenario':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mcp/case':>10}")
+        for scenario, stats in manager["scenarios"].items():
+            print(f"{scenario:<24}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}"
+                  f"{stats['p99_ms']:>10.1f}{stats['mcp_calls_per_case']:>10.1f}")
+    dac = report.get("dac")
+    if dac:
+        batch = dac["batch"]
+        print(f"\nDAC: {dac['totals']['cases_processed']} cases in {dac['wall_seconds']:.2f}s "
+              f"({dac['throughput_cases_per_s'] or 0:.1f} cases/s), "
+              f"{dac['totals']['batches']} batches, "
+              f"{dac['totals']['prs_created']} PRs, {dac['totals']['errors']} errors")
+        if batch["count"]:
+            print(f"per batch: p50 {batch['p50_ms']:.1f} ms, p95 {batch['p95_ms']:.1f} ms, "
+                  f"p99 {batch['p99_ms']:.1f} ms")
+    webhook = report.get("webhook")
+    if webhook:
+        latency = webhook["latency"]
+        stats = webhook["stats"]
+        print(f"\nWebhook: {webhook['cases']} cases pushed twice in {webhook['wall_seconds']:.2f}s, "
+              f"{stats['processed']} processed, {stats['duplicates']} duplicates, "
+              f"{stats['failed']} failed, {stats['prs_created']} PRs")
+        if latency["count"]:
+            print(f"notification to PR: p50 {latency['p50_ms']:.1f} ms, p95 {latency['p95_ms']:.1f} ms, "
+                  f"p99 {latency['p99_ms']:.1f} ms")
+
+
+async def run(args):
+    report = {
+        "config": {
+            key: value for key, value in vars(args).items() if key not in ("output",)
+        },
+    }
+    if args.suite in ("manager", "all"):
+        report["manager"] = await run_manager_suite(args)
+    if args.suite in ("dac", "all"):
+        report["dac"] = await run_dac_suite(args)
+    if args.suite in ("webhook", "all"):
+        report["webhook"] = await run_webhook_suite(args)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the manager and the DAC workflow")
+    parser.add_argument('--suite', choices=['manager', 'dac', 'webhook', 'all'], default='all')
+    parser.add_argument('--cases', type=int, default=10, help='Cases per scenario (manager) or per run (dac)')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='Workflow runs for the dac suite (batches of --cases for the webhook suite)')
+    parser.add_argument('--scenarios', nargs='+', choices=sorted(MANAGER_SCENARIOS), default=sorted(MANAGER_SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=1, help='Manager cases run at once')
+    parser.add_argument('--dac-concurrency', type=int, default=1, help='DAC tuning cases processed at once')
+    parser.add_argument('--no-worktrees', dest='worktrees', action='store_false',
+                        help='Create DAC branches in the shared working tree instead of git worktrees')
+    parser.add_argument('--dac-replay-events', nargs='+', metavar='PATH',
+                        help='Event files to replay each DAC rule change over (JSON Lines / Parquet)')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Fake MCP server latency per call')
+    parser.add_argument('--jitter-ms', type=float, default=10.0, help='Uniform jitter on the fake latency')
+    parser.add_argument('--payload-bytes', type=int, default=2048, help='Fake MCP response size')
+    parser.add_argument('--model-latency-ms', type=float, default=0.0, help='Scripted model latency per turn')
+    parser.add_argument('--no-warmup', dest='warmup', action='store_false', help='Skip the manager warm-up case')
+    parser.add_argument('--keep-sandbox', action='store_true', help='Keep the dac scratch repository')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_summary(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"\nReport written to {args.output}")
+    else:
+        print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
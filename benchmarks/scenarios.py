@@ -0,0 +1,146 @@
+"""
+Benchmark scenarios.
+
+MANAGER_SCENARIOS script representative IRP runs through the SOC manager and
+its sub-agents (the tools used must be allowed for each agent in
+multi-agent/manager/config/tool_agent_mapping.yaml). DAC cases are closed
+SOAR cases asking for a rule exclusion, as returned by _monitor_soar_cases.
+"""
+
+# Hashes/domains are drawn from small pools so that repeated cases exercise
+# the shared result cache the way real, overlapping investigations do.
+HASHES = [f"{i:064x}" for i in range(1, 6)]
+DOMAINS = ["login-micros0ft.com", "cdn-update.tk", "payroll-portal.ml", "docs-share.ga", "example.org"]
+
+MANAGER_SCENARIOS = {
+    "phishing_triage": {
+        "prompt": "Triage the reported phishing email in SOAR case {case_id} following the phishing IRP.",
+        "steps": {
+            "manager": [
+                {"calls": [("get_runbook", {"runbook_id": "run_books/irps/phishing_response"})]},
+                {"transfer": "soc_analyst_tier1"},
+            ],
+            "soc_analyst_tier1": [
+                {"calls": [
+                    ("get_case_full_details", {"case_id": "{case_id}"}),
+                    ("list_alerts_by_case", {"case_id": "{case_id}"}),
+                ]},
+                {"calls": [
+                    ("get_file_report", {"hash": "{hash}"}),
+                    ("get_domain_report", {"entity": "{domain}"}),
+                ]},
+                {"calls": [("lookup_entity", {"entity": "{domain}"})]},
+                {"calls": [("post_case_comment", {"case_id": "{case_id}", "query": "Phishing triage complete."})]},
+                {"text": "Case {case_id}: phishing triage complete, sender domain blocked."},
+            ],
+        },
+    },
+    "malware_incident": {
+        "prompt": "Run the malware IRP for SOAR case {case_id}.",
+        "steps": {
+            "manager": [
+                {"calls": [("get_runbook", {"runbook_id": "run_books/irps/malware_incident_response", "section": "Containment"})]},
+                {"transfer": "incident_responder"},
+            ],
+            "incident_responder": [
+                {"calls": [("get_case_full_details", {"case_id": "{case_id}"})]},
+                {"calls": [
+                    ("get_file_report", {"hash": "{hash}"}),
+                    ("get_file_behavior_summary", {"hash": "{hash}"}),
+                    ("search_security_events", {"query": "hash = {hash}"}),
+                ]},
+                {"calls": [("change_case_priority", {"case_id": "{case_id}", "query": "CRITICAL"})]},
+                {"calls": [("post_case_comment", {"case_id": "{case_id}", "query": "Host contained."})]},
+                {"text": "Case {case_id}: malware contained and eradication steps documented."},
+            ],
+        },
+    },
+    "threat_actor_research": {
+        "prompt": "Research the threat actor behind SOAR case {case_id}.",
+        "steps": {
+            "manager": [
+                {"transfer": "cti_researcher"},
+            ],
+            "cti_researcher": [
+                {"calls": [("search_rules_bank", {"query": "threat actor research GTI collection"})]},
+                {"calls": [("search_threat_actors", {"query": "FIN7"})]},
+                {"calls": [
+                    ("get_collection_report", {"entity": "threat-actor--fin7"}),
+                    ("get_collection_mitre_tree", {"entity": "threat-actor--fin7"}),
+                ]},
+                {"calls": [("get_ioc_matches", {"query": "{domain}"})]},
+                {"text": "Case {case_id}: activity is consistent with FIN7 tradecraft."},
+            ],
+        },
+    },
+}
+
+
+def manager_case(scenario: str, index: int) -> dict:
+    """Returns the case id, prompt and per-case substitutions for a scenario run."""
+    case_id = str(5000 + index)
+    values = {"case_id": case_id, "hash": HASHES[index % len(HASHES)], "domain": DOMAINS[index % len(DOMAINS)]}
+    return {
+        "case_id": case_id,
+        "prompt": f"[scenario={scenario} case={case_id}] "
+                  + MANAGER_SCENARIOS[scenario]["prompt"].format(**values),
+        "values": values,
+    }
+
+
+def scripted_steps(scenario: str, values: dict) -> dict:
+    """Returns the scenario's steps with per-case values filled in (except case_id)."""
+    def fill(value):
+        if isinstance(value, str):
+            return value.replace("{hash}", values["hash"]).replace("{domain}", values["domain"])
+        if isinstance(value, dict):
+            return {key: fill(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return type(value)(fill(item) for item in value)
+        return value
+
+    return fill(MANAGER_SCENARIOS[scenario]["steps"])
+
+
+# (rule name, users, hosts, process) used to generate DAC tuning cases.
+DAC_RULES = [
+    ("Remote Monitoring Management Tools Execution",
+     ["jack.torrance", "wendy.torrance", "dick.hallorann"],
+     ["desktop-7xl2kp3", "laptop-overlook1", "desktop-boiler01"],
+     "ScreenConnect.exe"),
+    ("Suspicious Outbound Network Connections",
+     ["svc_backup", "svc_monitoring"],
+     ["backup-srv01", "nagios-01"],
+     None),
+]
+
+
+def dac_cases(count: int, run: int = 0) -> list:
+    """Generates `count` closed SOAR cases asking for rule exclusions.
+
+    Args:
+        count: Number of cases.
+        run: Iteration number, folded into the case ids so every run uses
+            fresh branch names.
+    """
+    cases = []
+    for i in range(count):
+        rule_name, users, hosts, process_name = DAC_RULES[i % len(DAC_RULES)]
+        user = users[i % len(users)]
+        host = hosts[i % len(hosts)]
+        case = {
+            "id": f"{7000 + run * 1000 + i}",
+            "rule_name": rule_name,
+            "analyst_comment": (
+                f"This case was a false positive. User {user} is authorized on {host}. "
+                f"Rule should be tuned to exclude events where user.name = '{user}' "
+                f"AND host.name = '{host}'."
+            ),
+            "host_name": host,
+            "user_name": user,
+            "exclusion_type": "user_host_combination",
+        }
+        if process_name:
+            case["process_name"] = process_name
+        cases.append(case)
+    return cases
@@ -0,0 +1,84 @@
+"""
+A stand-in model that replays scripted tool-calling turns.
+
+Each user message starts with a tag naming a scenario and case, e.g.
+"[scenario=phishing_triage case=4232] Triage the reported phishing email".
+For every request the model looks the scenario up, works out how many turns
+the requesting agent has already taken in this session (its own model
+contents in the request) and returns the next scripted step: one or more
+function calls, a transfer to another agent, or a final text answer. The
+model keeps no state between requests, so sessions can run concurrently.
+"""
+
+import asyncio
+import re
+from typing import AsyncGenerator
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+SCENARIO_TAG = re.compile(r"\[scenario=(?P<scenario>\S+) case=(?P<case>[^\]\s]+)\]")
+
+
+def _fill(value, case_id):
+    if isinstance(value, str):
+        return value.format(case_id=case_id)
+    if isinstance(value, dict):
+        return {key: _fill(item, case_id) for key, item in value.items()}
+    return value
+
+
+class ScriptedLlm(BaseLlm):
+    """Replays the steps scripted for one agent.
+
+    Attributes:
+        agent_name: The agent this model instance serves.
+        scenarios: Maps "scenario/case_id" (for per-case scripts) or
+            "scenario" to {agent name: [step, ...]}. A step is
+            {"calls": [(tool_name, args), ...]}, {"transfer": agent_name} or
+            {"text": answer}. String args may use "{case_id}".
+        latency_ms: Simulated model latency per turn.
+    """
+
+    model: str = "scripted"
+    agent_name: str
+    scenarios: dict
+    latency_ms: float = 0.0
+    requests: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.requests += 1
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        scenario, case_id = self._find_tag(llm_request)
+        script = self.scenarios.get(f"{scenario}/{case_id}") or self.scenarios.get(scenario, {})
+        steps = script.get(self.agent_name, [])
+        turn = sum(1 for content in llm_request.contents if content.role == "model")
+        step = steps[turn] if turn < len(steps) else {"text": f"{self.agent_name}: done."}
+
+        if "calls" in step:
+            parts = [
+                types.Part(function_call=types.FunctionCall(name=name, args=_fill(args, case_id)))
+                for name, args in step["calls"]
+            ]
+        elif "transfer" in step:
+            parts = [types.Part(function_call=types.FunctionCall(
+                name="transfer_to_agent", args={"agent_name": step["transfer"]}
+            ))]
+        else:
+            parts = [types.Part(text=_fill(step["text"], case_id))]
+        yield LlmResponse(content=types.Content(role="model", parts=parts))
+
+    @staticmethod
+    def _find_tag(llm_request: LlmRequest):
+        for content in llm_request.contents:
+            for part in content.parts or []:
+                match = SCENARIO_TAG.search(part.text or "")
+                if match:
+                    return match.group("scenario"), match.group("case")
+        return None, None
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import time
 from pathlib import Path
 
 from google.adk.agents import Agent
@@ -13,6 +14,9 @@ except ImportError:
 # Set the root logger to output debug messages
 logging.basicConfig(level=logging.ERROR)
 
+# Initialization timings (seconds) from the most recent agent init, by phase.
+last_init_timings = {}
+
 
 async def initialize_actual_dac_agent():
     """Initializes the Detection-as-Code Agent for autonomous rule tuning operations.
@@ -24,8 +28,12 @@ async def initialize_actual_dac_agent():
     Returns:
         Agent: The fully configured and initialized DAC Agent instance.
     """
+    last_init_timings.clear()
+
     # Initialize MCP tools for DAC operations
+    start = time.perf_counter()
     shared_tools, _shared_exit_stack = await get_dac_agent_tools()
+    last_init_timings["tools"] = time.perf_counter() - start
 
     BASE_DIR = Path(__file__).resolve().parent
     persona_file_path = (BASE_DIR / "../rules-bank/personas/detection_engineer.md").resolve()
@@ -43,11 +51,13 @@ async def initialize_actual_dac_agent():
         (BASE_DIR / "../rules-bank/run_books/common_steps/generate_report_file.md").resolve(),
     ]
 
+    start = time.perf_counter()
     persona_description = load_persona_and_runbooks(
         persona_file_path,
         runbook_files,
         default_persona_description="Detection-as-Code Agent: Autonomous rule tuning based on SOAR feedback."
     )
+    last_init_timings["persona"] = time.perf_counter() - start
 
     return Agent(
         name="dac_agent",
@@ -0,0 +1,253 @@
+"""
+Long-running scheduler for the DAC workflow.
+
+WorkflowDaemon runs DACWorkflowExecutor.execute_full_workflow on an interval
+in a single process, so the agent, its MCP server subprocesses and their
+sessions are created once instead of on every cron tick.
+
+- Runs start every `interval` seconds, shifted by a random jitter so several
+  agents do not poll SOAR in lockstep.
+- Runs never overlap. A run that takes longer than the interval skips the
+  ticks it missed and doubles the interval for the next wait (up to
+  MAX_BACKOFF times), until runs fit in the interval again.
+- SIGTERM / SIGINT stop the daemon after the current run (or cancel it after
+  `shutdown_timeout` seconds).
+- A run history and health summary are kept in memory and written to a JSON
+  status file after every run (`run_dac_agent.py --mode status` prints it).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import signal
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "dac_daemon_status.json")
+
+# Largest multiple of the interval waited after consecutive overruns.
+MAX_BACKOFF = 8
+
+# Consecutive failed runs after which the daemon reports itself failing.
+FAILING_AFTER = 3
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class WorkflowDaemon:
+    """Runs the DAC workflow periodically with a warm executor.
+
+    Attributes:
+        executor: DACWorkflowExecutor (or anything with an async
+            execute_full_workflow) reused for every run.
+        interval: Seconds between run starts.
+        jitter: Random shift of each start, as a fraction of the interval.
+        shutdown_timeout: Seconds a run may continue after a stop request
+            before it is cancelled (None waits for it).
+        status_path: JSON file the health summary is written to (None
+            keeps it in memory only).
+    """
+
+    def __init__(self, executor, interval: float = 900.0, jitter: float = 0.1,
+                 shutdown_timeout: Optional[float] = None, history_size: int = 50,
+                 status_path: Optional[str] = DEFAULT_STATUS_PATH):
+        if interval <= 0:
+            raise ValueError(f"interval must be greater than 0, got {interval}")
+        if jitter < 0:
+            raise ValueError(f"jitter must not be negative, got {jitter}")
+        self.executor = executor
+        self.interval = interval
+        self.jitter = jitter
+        self.shutdown_timeout = shutdown_timeout
+        self.status_path = status_path
+        self.history = deque(maxlen=history_size)
+        self.started_at = None
+        self.next_run_at = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped_ticks = 0
+        self.consecutive_failures = 0
+        self.consecutive_overruns = 0
+        self.totals = {"cases_found": 0, "cases_processed": 0, "rules_tuned": 0, "prs_created": 0}
+        self._stop = asyncio.Event()
+        self._running = None
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def _delay(self) -> float:
+        """Seconds until the next run, with backoff and jitter applied."""
+        backoff = min(2 ** self.consecutive_overruns, MAX_BACKOFF)
+        return max(0.0, self.interval * backoff * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    async def run(self, max_runs: Optional[int] = None) -> None:
+        """Runs the workflow until stopped.
+
+        Args:
+            max_runs: Stop after this many runs (None runs until stopped).
+        """
+        self.started_at = _now()
+        started = time.monotonic()
+        # First run immediately; later ones on the schedule.
+        next_start = started
+        logger.info(f"DAC daemon started (interval {self.interval:.0f}s, jitter {self.jitter:.0%})")
+
+        while not self._stop.is_set() and (max_runs is None or self.runs < max_runs):
+            wait = next_start - time.monotonic()
+            self.next_run_at = datetime.fromtimestamp(time.time() + max(wait, 0), timezone.utc).isoformat(
+                timespec="seconds")
+            self._write_status()
+            if wait > 0:
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=wait)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+
+            run_start = time.monotonic()
+            await self._run_once()
+            elapsed = time.monotonic() - run_start
+
+            if elapsed > self.interval:
+                # Do not queue up the ticks missed while the run was going;
+                # back off from the end of the run until runs fit in the
+                # interval again.
+                self.skipped_ticks += int(elapsed // self.interval)
+                self.consecutive_overruns += 1
+                logger.warning(
+                    f"Workflow run took {elapsed:.0f}s (interval {self.interval:.0f}s); "
+                    f"waiting {min(2 ** self.consecutive_overruns, MAX_BACKOFF)}x the interval"
+                )
+                next_start = time.monotonic() + self._delay()
+            else:
+                self.consecutive_overruns = 0
+                next_start = run_start + self._delay()
+
+        self._stop.set()
+        self.next_run_at = None
+        self._write_status()
+        logger.info(f"DAC daemon stopped after {self.runs} runs")
+
+    async def _run_once(self) -> None:
+        entry = {"started_at": _now()}
+        start = time.monotonic()
+        self._running = asyncio.create_task(self.executor.execute_full_workflow())
+        self._write_status()
+        try:
+            results = await self._running
+            errors = results.get("errors", [])
+            entry.update({key: results.get(key, 0) for key in self.totals})
+            entry["cases_skipped"] = results.get("cases_skipped", 0)
+            entry["errors"] = len(errors)
+            # A workflow failure (as opposed to a failed case) fails the run.
+            entry["status"] = "failed" if any(str(e).startswith("Workflow failure") for e in errors) else "ok"
+            if entry["status"] == "failed":
+                entry["error"] = next(str(e) for e in errors if str(e).startswith("Workflow failure"))
+            for key in self.totals:
+                self.totals[key] += entry[key]
+        except asyncio.CancelledError:
+            entry.update(status="cancelled")
+            if not self._stop.is_set():
+                raise
+        except Exception as e:
+            logger.error(f"Workflow run failed: {e}")
+            entry.update(status="failed", error=str(e))
+        finally:
+            self._running = None
+
+        entry["seconds"] = round(time.monotonic() - start, 3)
+        entry["overran"] = entry["seconds"] > self.interval
+        self.runs += 1
+        if entry["status"] == "ok":
+            self.consecutive_failures = 0
+        else:
+            self.failures += 1
+            self.consecutive_failures += 1
+        self.history.append(entry)
+        logger.info(f"Workflow run {self.runs} finished: {entry}")
+
+    # ------------------------------------------------------------------
+    # Shutdown
+    # ------------------------------------------------------------------
+
+    def stop(self) -> None:
+        """Requests a graceful stop: the current run finishes first."""
+        if self._stop.is_set():
+            return
+        logger.info("Stop requested; finishing the current run" if self._running else "Stop requested")
+        self._stop.set()
+        if self._running and self.shutdown_timeout is not None:
+            running = self._running
+            asyncio.get_running_loop().call_later(self.shutdown_timeout, running.cancel)
+
+    def install_signal_handlers(self) -> None:
+        """Stops the daemon on SIGTERM and SIGINT."""
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                loop.add_signal_handler(signum, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Windows event loops do not support signal handlers.
+                signal.signal(signum, lambda *_: loop.call_soon_threadsafe(self.stop))
+
+    # ------------------------------------------------------------------
+    # Health
+    # ------------------------------------------------------------------
+
+    def health(self) -> Dict:
+        """Returns the health summary and run history."""
+        if self._stop.is_set():
+            status = "stopping" if self._running else "stopped"
+        elif self.consecutive_failures >= FAILING_AFTER:
+            status = "failing"
+        elif self.consecutive_failures or self.consecutive_overruns:
+            status = "degraded"
+        else:
+            status = "ok"
+        return {
+            "status": status,
+            "pid": os.getpid(),
+            "started_at": self.started_at,
+            "updated_at": _now(),
+            "interval_seconds": self.interval,
+            "next_run_at": self.next_run_at,
+            "running": self._running is not None,
+            "runs": self.runs,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "consecutive_overruns": self.consecutive_overruns,
+            "skipped_ticks": self.skipped_ticks,
+            "totals": dict(self.totals),
+            "last_run": self.history[-1] if self.history else None,
+            "history": list(self.history),
+        }
+
+    def _write_status(self) -> None:
+        if not self.status_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.status_path), exist_ok=True)
+            tmp_path = f"{self.status_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.health(), f, indent=2)
+            os.replace(tmp_path, self.status_path)
+        except OSError as e:
+            logger.warning(f"Could not write daemon status {self.status_path}: {e}")
+
+
+def read_status(status_path: str = DEFAULT_STATUS_PATH) -> Optional[Dict]:
+    """Reads the status file written by a running (or stopped) daemon."""
+    try:
+        with open(status_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
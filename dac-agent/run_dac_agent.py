@@ -8,44 +8,54 @@ based on SOAR case feedback.
 
 import asyncio
 import logging
+import os
 import sys
+import time
 from pathlib import Path
 
 # Add the parent directory to the path so we can import the agent
 sys.path.insert(0, str(Path(__file__).parent))
 
-try:
-    from agent import get_root_agent
-    from workflow import DACWorkflowExecutor
-except ImportError:
-    # Handle relative imports when run as script
-    import importlib.util
-    import os
-    
-    # Load agent module
-    agent_path = os.path.join(os.path.dirname(__file__), 'agent.py')
-    spec = importlib.util.spec_from_file_location("agent", agent_path)
-    agent_module = importlib.util.module_from_spec(spec)
-    
-    # Load tools first
-    tools_path = os.path.join(os.path.dirname(__file__), 'tools', 'tools.py')
-    tools_spec = importlib.util.spec_from_file_location("tools", tools_path)
-    tools_module = importlib.util.module_from_spec(tools_spec)
-    tools_spec.loader.exec_module(tools_module)
-    
-    # Add tools to agent module namespace
-    agent_module.tools = tools_module
-    spec.loader.exec_module(agent_module)
-    
-    get_root_agent = agent_module.get_root_agent
-    
-    # Load workflow module
-    workflow_path = os.path.join(os.path.dirname(__file__), 'workflow.py')
-    workflow_spec = importlib.util.spec_from_file_location("workflow", workflow_path)
-    workflow_module = importlib.util.module_from_spec(workflow_spec)
-    workflow_spec.loader.exec_module(workflow_module)
-    
-    DACWorkflowExecutor = workflow_module.DACWorkflowExecutor
+# --profile-startup has to install its import hook before the agent (and
+# google.adk) are imported.
+from tools.startup_profile import StartupProfiler
+
+profiler = StartupProfiler("dac-agent", enabled="--profile-startup" in sys.argv)
+profiler.start()
+
+with profiler.phase("import_agent"):
+    try:
+        from agent import get_root_agent
+        from workflow import DACWorkflowExecutor
+    except ImportError:
+        # Handle relative imports when run as script
+        import importlib.util
+        import os
+
+        # Load agent module
+        agent_path = os.path.join(os.path.dirname(__file__), 'agent.py')
+        spec = importlib.util.spec_from_file_location("agent", agent_path)
+        agent_module = importlib.util.module_from_spec(spec)
+
+        # Load tools first
+        tools_path = os.path.join(os.path.dirname(__file__), 'tools', 'tools.py')
+        tools_spec = importlib.util.spec_from_file_location("tools", tools_path)
+        tools_module = importlib.util.module_from_spec(tools_spec)
+        tools_spec.loader.exec_module(tools_module)
+
+        # Add tools to agent module namespace
+        agent_module.tools = tools_module
+        spec.loader.exec_module(agent_module)
+
+        get_root_agent = agent_module.get_root_agent
+
+        # Load workflow module
+        workflow_path = os.path.join(os.path.dirname(__file__), 'workflow.py')
+        workflow_spec = importlib.util.spec_from_file_location("workflow", workflow_path)
+        workflow_module = importlib.util.module_from_spec(workflow_spec)
+        workflow_spec.loader.exec_module(workflow_module)
+
+        DACWorkflowExecutor = workflow_module.DACWorkflowExecutor
 
 # Configure logging
 logging.basicConfig(
@@ -60,8 +70,17 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def run_autonomous_workflow():
-    """Run the DAC agent in autonomous mode."""
+async def run_autonomous_workflow(max_concurrency: int = 1, use_worktrees: bool = True,
+                                  replay_events: list = None):
+    """Run the DAC agent in autonomous mode.
+    
+    Args:
+        max_concurrency: Number of tuning cases processed at once
+        use_worktrees: Prepare tuning branches in git worktrees of a bare
+            mirror rather than in the current checkout
+        replay_events: Historical event files or directories to replay rule
+            changes over
+    """
     logger.info("Starting DAC Agent in autonomous mode")
     
     try:
@@ -71,7 +90,10 @@ async def run_autonomous_workflow():
         
         # Get the agent's tools for the workflow executor
         if hasattr(agent, 'tools') and agent.tools:
-            workflow_executor = DACWorkflowExecutor(agent.tools)
+            workflow_executor = DACWorkflowExecutor(
+                agent.tools, max_concurrency=max_concurrency, use_worktrees=use_worktrees,
+                replay_events=replay_events
+            )
             
             # Execute the full workflow
             results = await workflow_executor.execute_full_workflow()
@@ -96,6 +118,101 @@ async def run_autonomous_workflow():
         raise
 
 
+async def run_daemon_mode(interval: float = 900.0, jitter: float = 0.1, shutdown_timeout: float = None,
+                          max_concurrency: int = 1, use_worktrees: bool = True, replay_events: list = None,
+                          webhook_port: int = None, webhook_host: str = "127.0.0.1", webhook_secret: str = None):
+    """Run the workflow periodically, keeping the agent and MCP servers warm.
+    
+    Args:
+        interval: Seconds between workflow runs
+        jitter: Random shift of each run, as a fraction of the interval
+        shutdown_timeout: Seconds a run may continue after SIGTERM before it
+            is cancelled (None lets it finish)
+        max_concurrency: Number of tuning cases processed at once
+        use_worktrees: Prepare tuning branches in git worktrees
+        replay_events: Historical event files or directories to replay rule
+            changes over
+        webhook_port: Also process cases pushed to a case-closed webhook
+            listener on this port (polling remains as reconciliation)
+        webhook_host: Interface the webhook listener binds to
+        webhook_secret: Shared secret webhook requests are signed with
+    """
+    from google.adk.tools.base_toolset import BaseToolset
+    from daemon import WorkflowDaemon
+    
+    logger.info("Starting DAC Agent in daemon mode")
+    agent = await get_root_agent()
+    if not (hasattr(agent, 'tools') and agent.tools):
+        logger.error("Agent tools not available")
+        return
+    
+    workflow_executor = DACWorkflowExecutor(
+        agent.tools, max_concurrency=max_concurrency, use_worktrees=use_worktrees,
+        replay_events=replay_events
+    )
+    daemon = WorkflowDaemon(workflow_executor, interval=interval, jitter=jitter, shutdown_timeout=shutdown_timeout)
+    daemon.install_signal_handlers()
+    toolsets = [tool for tool in agent.tools if isinstance(tool, BaseToolset)]
+    listener = None
+    
+    try:
+        # Start the MCP servers once; every run reuses their sessions
+        started = await asyncio.gather(*(toolset.get_tools() for toolset in toolsets), return_exceptions=True)
+        for result in started:
+            if isinstance(result, Exception):
+                logger.warning(f"MCP toolset failed to start: {result}")
+        
+        if webhook_port is not None:
+            from webhook import CaseWebhookListener
+            listener = CaseWebhookListener(
+                workflow_executor, host=webhook_host, port=webhook_port, secret=webhook_secret,
+                workers=max_concurrency
+            )
+            await listener.start()
+        
+        await daemon.run()
+    finally:
+        if listener:
+            await listener.stop(shutdown_timeout)
+            if workflow_executor.worktrees:
+                await workflow_executor.worktrees.cleanup()
+        for toolset in toolsets:
+            try:
+                await toolset.close()
+            except Exception as e:
+                logger.warning(f"Error closing toolset: {e}")
+
+
+def show_daemon_status():
+    """Print the health summary and recent runs of the daemon."""
+    from daemon import DEFAULT_STATUS_PATH, read_status
+    
+    status = read_status()
+    if not status:
+        print(f"No daemon status found at {DEFAULT_STATUS_PATH}")
+        return
+    
+    print(f"DAC daemon (pid {status['pid']}): {status['status']}")
+    print(f"- Started: {status['started_at']}, updated: {status['updated_at']}")
+    print(f"- Interval: {status['interval_seconds']:.0f}s, next run: {status['next_run_at'] or '-'}"
+          f"{' (running)' if status['running'] else ''}")
+    print(f"- Runs: {status['runs']}, failures: {status['failures']} "
+          f"({status['consecutive_failures']} consecutive), skipped ticks: {status['skipped_ticks']}")
+    totals = status['totals']
+    print(f"- Cases processed: {totals['cases_processed']}, rules tuned: {totals['rules_tuned']}, "
+          f"PRs created: {totals['prs_created']}")
+    
+    print("\nRecent runs:")
+    for run in status['history'][-10:]:
+        line = (f"- {run['started_at']} {run['status']} in {run['seconds']:.1f}s: "
+                f"{run.get('cases_processed', 0)} cases, {run.get('prs_created', 0)} PRs")
+        if run.get('overran'):
+            line += " (overran)"
+        if run.get('error'):
+            line += f" - {run['error']}"
+        print(line)
+
+
 async def run_interactive_mode():
     """Run the DAC agent in interactive mode for testing."""
     logger.info("Starting DAC Agent in interactive mode")
@@ -129,6 +246,90 @@ async def run_interactive_mode():
         raise
 
 
+async def run_startup_profile(output_path=None, connect=True):
+    """Profile DAC agent startup and write the report as JSON.
+
+    Covers importing the agent, building its tools and persona, connecting
+    to each MCP server (`uv run` spawn + handshake + tool listing) and
+    constructing the workflow executor.
+    """
+    from google.adk.tools.base_toolset import BaseToolset
+
+    with profiler.phase("initialize_agent"):
+        agent = await get_root_agent()
+    agent_module = sys.modules.get(get_root_agent.__module__)
+    for name, seconds in getattr(agent_module, "last_init_timings", {}).items():
+        profiler.record_phase(f"initialize_agent:{name}", seconds)
+
+    toolsets = [tool for tool in agent.tools if isinstance(tool, BaseToolset)]
+
+    def toolset_label(index, toolset):
+        # e.g. "secops_soar_mcp", from the server's `uv --directory` argument
+        server_params = getattr(getattr(toolset, "_connection_params", None), "server_params", None)
+        args = list(getattr(server_params, "args", None) or [])
+        if "--directory" in args[:-1]:
+            return Path(args[args.index("--directory") + 1]).name
+        return str(index)
+
+    async def connect_toolset(index, toolset):
+        label = toolset_label(index, toolset)
+        start = time.perf_counter()
+        error = None
+        try:
+            tools = await toolset.get_tools()
+            tool_count = len(tools)
+        except Exception as e:
+            error = str(e)
+            tool_count = 0
+        seconds = time.perf_counter() - start
+        profiler.record_phase(f"mcp_connect:{label}", seconds)
+        return {"toolset": label, "seconds": seconds, "tools": tool_count, "error": error}
+
+    try:
+        if connect:
+            with profiler.phase("mcp_connect"):
+                profiler.extra["mcp"] = await asyncio.gather(
+                    *(connect_toolset(i, toolset) for i, toolset in enumerate(toolsets))
+                )
+        with profiler.phase("workflow_executor"):
+            DACWorkflowExecutor(agent.tools)
+    finally:
+        with profiler.phase("shutdown"):
+            for toolset in toolsets:
+                try:
+                    await toolset.close()
+                except Exception as e:
+                    logger.warning(f"Error closing toolset: {e}")
+
+    profiler.write(output_path)
+
+
+def show_ledger(case_ids: list = None, outcome: str = None):
+    """Print the processed-case ledger.
+    
+    Args:
+        case_ids: Only show these cases
+        outcome: Only show cases with this outcome
+    """
+    from tools.case_ledger import CaseLedger
+    ledger = CaseLedger()
+    if case_ids:
+        entries = [entry for entry in map(ledger.get, case_ids) if entry]
+        if outcome:
+            entries = [entry for entry in entries if entry["outcome"] == outcome]
+    else:
+        entries = ledger.entries(outcome)
+    
+    print(f"Processed-case ledger: {ledger.path} ({len(ledger)} entries)")
+    for entry in entries:
+        print(f"\n- Case {entry['case_id']}: {entry['outcome']} at {entry['processed_at']}")
+        for field in ('branch', 'pr_url', 'rule_file', 'rule_version', 'content_hash', 'error'):
+            if entry.get(field):
+                print(f"  {field}: {entry[field]}")
+        if entry['outcome'] == 'failed':
+            print(f"  attempts: {entry['attempts']}")
+
+
 def main():
     """Main entry point for the DAC agent."""
     import argparse
@@ -136,9 +337,102 @@ def main():
     parser = argparse.ArgumentParser(description="Detection-as-Code Agent")
     parser.add_argument(
         '--mode', 
-        choices=['autonomous', 'interactive'], 
+        choices=['autonomous', 'daemon', 'interactive', 'ledger', 'status'], 
         default='autonomous',
-        help='Run mode for the DAC agent'
+        help='Run mode for the DAC agent (daemon runs the workflow periodically, '
+             'status shows the daemon\'s health, ledger lists processed cases)'
+    )
+    parser.add_argument(
+        '--interval',
+        type=float,
+        default=900.0,
+        help='With --mode daemon, seconds between workflow runs'
+    )
+    parser.add_argument(
+        '--jitter',
+        type=float,
+        default=0.1,
+        help='With --mode daemon, random shift of each run as a fraction of the interval'
+    )
+    parser.add_argument(
+        '--shutdown-timeout',
+        type=float,
+        help='With --mode daemon, seconds a run may continue after SIGTERM before it is cancelled'
+    )
+    parser.add_argument(
+        '--webhook-port',
+        type=int,
+        help='With --mode daemon, also accept SOAR case-closed notifications on this port'
+    )
+    parser.add_argument(
+        '--webhook-host',
+        default='127.0.0.1',
+        help='Interface the case-closed webhook listener binds to'
+    )
+    parser.add_argument(
+        '--webhook-secret',
+        default=os.getenv('DAC_WEBHOOK_SECRET'),
+        help='Shared secret case-closed notifications are signed with (default: $DAC_WEBHOOK_SECRET)'
+    )
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        default=1,
+        help='Number of tuning cases processed in parallel (cases for the same rule file are serialized)'
+    )
+    parser.add_argument(
+        '--no-worktrees',
+        dest='use_worktrees',
+        action='store_false',
+        help='Create tuning branches by checking them out in the current working tree'
+    )
+    parser.add_argument(
+        '--replay-events',
+        nargs='+',
+        metavar='PATH',
+        help='JSON Lines / Parquet event exports (files or directories) to replay each rule change over'
+    )
+    parser.add_argument(
+        '--reset-soar-cursor',
+        action='store_true',
+        help='Forget the SOAR polling watermark so the next run re-reads the initial lookback window'
+    )
+    parser.add_argument(
+        '--case',
+        nargs='+',
+        dest='case_ids',
+        metavar='CASE_ID',
+        help='With --mode ledger, show only these cases'
+    )
+    parser.add_argument(
+        '--outcome',
+        choices=['pr_created', 'pushed', 'no_change', 'failed'],
+        help='With --mode ledger, show only cases with this outcome'
+    )
+    parser.add_argument(
+        '--forget-cases',
+        nargs='+',
+        metavar='CASE_ID',
+        help='Remove cases from the processed-case ledger so they can be tuned again'
+    )
+    parser.add_argument(
+        '--reset-ledger',
+        action='store_true',
+        help='Remove every entry from the processed-case ledger'
+    )
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help='Profile startup (imports, init phases, MCP connections, peak RSS) and print JSON'
+    )
+    parser.add_argument(
+        '--profile-output',
+        help='Write the --profile-startup report to this file instead of stdout'
+    )
+    parser.add_argument(
+        '--no-connect',
+        action='store_true',
+        help='With --profile-startup, do not connect to the MCP servers'
     )
     parser.add_argument(
         '--log-level',
@@ -148,13 +442,40 @@ def main():
     )
     
     args = parser.parse_args()
+    if args.interval <= 0:
+        parser.error("--interval must be greater than 0")
+    if args.jitter < 0:
+        parser.error("--jitter must not be negative")
     
     # Set logging level
     logging.getLogger().setLevel(getattr(logging, args.log_level))
     
+    if args.reset_soar_cursor:
+        from tools.soar_polling import CaseCursor
+        CaseCursor().reset()
+        logger.info("SOAR polling watermark reset")
+    
+    if args.forget_cases or args.reset_ledger:
+        from tools.case_ledger import CaseLedger
+        ledger = CaseLedger()
+        removed = ledger.reset() if args.reset_ledger else ledger.delete(args.forget_cases)
+        logger.info(f"Removed {removed} entries from the processed-case ledger")
+    
     # Run the appropriate mode
-    if args.mode == 'autonomous':
-        asyncio.run(run_autonomous_workflow())
+    if args.mode == 'ledger':
+        show_ledger(args.case_ids, args.outcome)
+    elif args.mode == 'status':
+        show_daemon_status()
+    elif args.profile_startup:
+        asyncio.run(run_startup_profile(args.profile_output, connect=not args.no_connect))
+    elif args.mode == 'autonomous':
+        asyncio.run(run_autonomous_workflow(args.max_concurrency, args.use_worktrees, args.replay_events))
+    elif args.mode == 'daemon':
+        asyncio.run(run_daemon_mode(
+            args.interval, args.jitter, args.shutdown_timeout,
+            args.max_concurrency, args.use_worktrees, args.replay_events,
+            args.webhook_port, args.webhook_host, args.webhook_secret
+        ))
     else:
         asyncio.run(run_interactive_mode())
 
@@ -0,0 +1,6 @@
+"""Makes the dac-agent modules importable as they are by run_dac_agent.py."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,26 @@
+"""Tests for the WorkflowDaemon schedule."""
+
+import asyncio
+
+import pytest
+
+from daemon import WorkflowDaemon
+
+
+class SlowExecutor:
+    async def execute_full_workflow(self):
+        await asyncio.sleep(0.05)
+        return {"cases_found": 0, "errors": []}
+
+
+@pytest.mark.parametrize("kwargs", [{"interval": 0}, {"interval": -1}, {"jitter": -0.1}])
+def test_rejects_invalid_schedule(kwargs):
+    with pytest.raises(ValueError):
+        WorkflowDaemon(SlowExecutor(), status_path=None, **kwargs)
+
+
+def test_overrunning_runs_skip_ticks():
+    daemon = WorkflowDaemon(SlowExecutor(), interval=0.01, jitter=0, status_path=None)
+    asyncio.run(daemon.run(max_runs=2))
+    assert daemon.runs == 2
+    assert daemon.skipped_ticks >= 2
@@ -0,0 +1,68 @@
+"""Tests for the persistent rule catalog."""
+
+import os
+import re
+import shutil
+from pathlib import Path
+
+from tools import rule_catalog
+from tools.rule_catalog import RuleCatalog
+
+RULES_DIR = Path(__file__).resolve().parent.parent / "rules"
+
+
+def rename(rule_path, name):
+    rule_path.write_text(re.sub(r"^name: .*$", f"name: {name}", rule_path.read_text(), count=1, flags=re.M))
+
+
+def make_catalog(tmp_path):
+    rules_dir = tmp_path / "rules"
+    shutil.copytree(RULES_DIR, rules_dir)
+    return RuleCatalog(str(rules_dir), catalog_path=str(tmp_path / "catalog.json")), rules_dir
+
+
+def test_lookups_do_not_rescan(tmp_path, monkeypatch):
+    catalog, _ = make_catalog(tmp_path)
+    assert catalog.search("rmm-tools-execution")
+    assert catalog.stats["scans"] == 1
+
+    def walk(*args, **kwargs):
+        raise AssertionError("rules directory walked")
+
+    monkeypatch.setattr(os, "walk", walk)
+    for _ in range(3):
+        assert catalog.search("rmm-tools-execution")
+        assert catalog.get("suspicious-outbound-connections")
+    assert catalog.stats["scans"] == 1
+
+
+def test_added_and_removed_files_are_picked_up(tmp_path):
+    catalog, rules_dir = make_catalog(tmp_path)
+    catalog.refresh()
+    source = rules_dir / "endpoint" / "rmm_tools_execution.yaml"
+    added = source.parent / "copy_of_rule.yaml"
+    shutil.copy(source, added)
+    rename(added, "Copied Rule")
+    # Directory mtimes can have coarse resolution; make the change visible.
+    stat = os.stat(source.parent)
+    os.utime(source.parent, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert any(result["file_name"] == "copy_of_rule.yaml" for result in catalog.search("Copied Rule"))
+    assert catalog.stats["scans"] == 2
+
+    added.unlink()
+    os.utime(source.parent, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000_000))
+    assert not any(result["file_name"] == "copy_of_rule.yaml" for result in catalog.search("Copied Rule"))
+
+
+def test_rule_written_in_place_is_reindexed(tmp_path, monkeypatch):
+    catalog, rules_dir = make_catalog(tmp_path)
+    catalog.refresh()
+    monkeypatch.setitem(rule_catalog._catalogs, catalog.rules_dir, catalog)
+    rule_path = rules_dir / "endpoint" / "rmm_tools_execution.yaml"
+    rename(rule_path, "Renamed Rule")
+
+    rule_catalog.rule_file_written(str(rule_path))
+
+    assert [result["file_name"] for result in catalog.search("Renamed Rule")] == ["rmm_tools_execution.yaml"]
+    assert catalog.stats["scans"] == 1
@@ -0,0 +1,48 @@
+"""Tests for compiled rule evaluation and the sample rules' embedded test cases."""
+
+from datetime import date
+from pathlib import Path
+
+import pytest
+import yaml
+
+from tools import tools as dac_tools
+from tools.rule_eval import run_test_cases
+
+RULES_DIR = Path(__file__).resolve().parent.parent / "rules"
+SAMPLE_RULES = sorted(RULES_DIR.rglob("*.yaml"))
+
+# Before every sample exclusion's expiry, so the checks do not depend on today.
+AS_OF = date(2025, 6, 1)
+
+
+@pytest.mark.parametrize("rule_path", SAMPLE_RULES, ids=lambda path: path.name)
+def test_sample_rule_test_cases_pass(rule_path):
+    results = run_test_cases(yaml.safe_load(rule_path.read_text()), as_of=AS_OF)
+    assert results["passed"], [result for result in results["results"] if not result["passed"]]
+
+
+@pytest.mark.parametrize("rule_path", SAMPLE_RULES, ids=lambda path: path.name)
+def test_sample_rules_validate(rule_path):
+    result = dac_tools.validate_yaml_file(str(rule_path), run_tests=True, as_of=AS_OF.isoformat())
+    assert result["valid"], result
+    assert not result.get("warnings")
+
+
+def test_expired_exclusion_is_a_warning():
+    rule_path = RULES_DIR / "endpoint" / "rmm_tools_execution.yaml"
+    result = dac_tools.validate_yaml_file(str(rule_path), run_tests=True, as_of="2026-01-01")
+
+    assert result["valid"], result
+    assert [exclusion["expires"] for exclusion in result["expired_exclusions"]] == ["2025-12-31"]
+    assert "2025-12-31" in result["warnings"][0]
+
+
+def test_structural_validation_skips_test_cases(tmp_path):
+    rule = yaml.safe_load((RULES_DIR / "endpoint" / "rmm_tools_execution.yaml").read_text())
+    rule["validation"]["test_cases"][0]["should_alert"] = not rule["validation"]["test_cases"][0]["should_alert"]
+    rule_path = tmp_path / "rule.yaml"
+    rule_path.write_text(yaml.safe_dump(rule))
+
+    assert dac_tools.validate_yaml_file(str(rule_path))["valid"]
+    assert not dac_tools.validate_yaml_file(str(rule_path), run_tests=True)["valid"]
@@ -0,0 +1,99 @@
+"""Tests for the rule query parser, serializer and exclusion merging."""
+
+from pathlib import Path
+
+import pytest
+import yaml
+
+from tools.rule_query import (
+    And, Comparison, Not, Or, QuerySyntaxError, add_exclusions, normalize_exclusions, parse_query, to_query,
+)
+
+RULES_DIR = Path(__file__).resolve().parent.parent / "rules"
+SAMPLE_RULES = sorted(RULES_DIR.rglob("*.yaml"))
+
+
+def cmp(field, value, operator="="):
+    return Comparison(field, operator, value)
+
+
+@pytest.mark.parametrize("rule_path", SAMPLE_RULES, ids=lambda path: path.name)
+@pytest.mark.parametrize("pretty", [True, False])
+def test_sample_rules_round_trip(rule_path, pretty):
+    query = yaml.safe_load(rule_path.read_text())["logic"]["query"]
+    ast = parse_query(query)
+    text = to_query(ast, pretty=pretty)
+    assert parse_query(text) == ast
+    assert to_query(parse_query(text), pretty=pretty) == text
+
+
+def test_comments_are_not_preserved():
+    ast = parse_query('a = 1 AND  // why\n  b = "x"  # and why not')
+    assert ast == And((cmp("a", 1), cmp("b", "x")))
+    assert "//" not in to_query(ast) and "#" not in to_query(ast)
+
+
+def test_precedence_not_and_or():
+    assert parse_query("a = 1 OR b = 2 AND NOT c = 3") == Or((
+        cmp("a", 1),
+        And((cmp("b", 2), Not(cmp("c", 3)))),
+    ))
+    assert parse_query("NOT a = 1 AND b = 2") == And((Not(cmp("a", 1)), cmp("b", 2)))
+    assert parse_query("(a = 1 OR b = 2) AND c = 3") == And((Or((cmp("a", 1), cmp("b", 2))), cmp("c", 3)))
+
+
+def test_parenthesized_groups_survive_serialization():
+    ast = parse_query("(a = 1 OR b = 2) AND NOT (c = 3 AND d = 4)")
+    assert parse_query(to_query(ast)) == ast
+    assert parse_query(to_query(ast, pretty=False)) == ast
+
+
+def test_normalize_exclusions_drops_duplicates_in_any_order():
+    a_and_b = And((cmp("a", 1), cmp("b", 2)))
+    b_and_a = And((cmp("b", 2), cmp("a", 1)))
+    assert normalize_exclusions([a_and_b, b_and_a, Or((a_and_b, cmp("c", 3)))]) == [a_and_b, cmp("c", 3)]
+
+
+def test_normalize_exclusions_drops_subsumed():
+    broad = cmp("user.name", "svc_backup")
+    narrow = And((cmp("user.name", "svc_backup"), cmp("host.name", "backup-srv01")))
+    assert normalize_exclusions([narrow, broad]) == [broad]
+    assert normalize_exclusions([broad, narrow]) == [broad]
+
+
+def test_add_exclusions_merges_several_top_level_not_terms():
+    query = parse_query('x = 1 AND NOT a = 1 AND y = 2 AND NOT b = 2')
+    new = [And((cmp("a", 1), cmp("c", 3))), cmp("d", 4), cmp("b", 2)]
+
+    merged, added = add_exclusions(query, new)
+
+    assert merged == And((cmp("x", 1), cmp("y", 2), Not(Or((cmp("a", 1), cmp("b", 2), cmp("d", 4))))))
+    assert added == [cmp("d", 4)]
+
+
+def test_add_exclusions_reports_nothing_added_when_covered():
+    query = parse_query('x = 1 AND NOT (a = 1 OR b = 2)')
+    merged, added = add_exclusions(query, [And((cmp("b", 2), cmp("c", 3)))])
+    assert merged == query
+    assert added == []
+
+
+def test_add_exclusions_to_query_without_not():
+    merged, added = add_exclusions(parse_query("x = 1"), [cmp("a", 1)])
+    assert merged == And((cmp("x", 1), Not(cmp("a", 1))))
+    assert added == [cmp("a", 1)]
+
+
+@pytest.mark.parametrize("query, position", [
+    ('a = "1" AND', 11),
+    ('a = "1" AND (b = 2', 18),
+    ("a == 1", 3),
+    ('a = "1" b = 2', 8),
+    ("a IN (1, 2", 10),
+    ('a = "x', 4),
+])
+def test_syntax_error_positions(query, position):
+    with pytest.raises(QuerySyntaxError) as error:
+        parse_query(query)
+    assert error.value.position == position
+    assert f"at position {position}" in str(error.value)
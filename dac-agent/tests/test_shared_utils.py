@@ -0,0 +1,40 @@
+"""Checks the modules dac-agent shares with the SOC manager (as copies)."""
+
+import ast
+from pathlib import Path
+
+import pytest
+
+from tools import file_cache
+
+TOOLS_DIR = Path(__file__).resolve().parent.parent / "tools"
+MANAGER_UTILS_DIR = Path(__file__).resolve().parents[2] / "multi-agent" / "manager" / "utils"
+
+
+def _code(path):
+    """The module's AST without docstrings (the copies differ in indentation and docs)."""
+    tree = ast.parse(path.read_text())
+    for node in ast.walk(tree):
+        body = getattr(node, "body", None)
+        if (isinstance(body, list) and body and isinstance(body[0], ast.Expr)
+                and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str)):
+            node.body = body[1:] or [ast.Pass()]
+    return ast.dump(tree)
+
+
+@pytest.mark.parametrize("name", ["file_cache", "startup_profile"])
+def test_copy_matches_the_manager(name):
+    manager_copy = MANAGER_UTILS_DIR / f"{name}.py"
+    if not manager_copy.exists():
+        pytest.skip("multi-agent is not checked out next to dac-agent")
+    assert _code(TOOLS_DIR / f"{name}.py") == _code(manager_copy)
+
+
+def test_file_cache_rereads_changed_files(tmp_path):
+    path = tmp_path / "persona.md"
+    path.write_text("one")
+    first = file_cache.read_cached_file(str(path))
+    assert file_cache.read_cached_file(str(path)) is first
+
+    path.write_text("two, longer")
+    assert file_cache.read_cached_file(str(path)) == "two, longer"
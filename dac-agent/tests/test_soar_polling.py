@@ -0,0 +1,133 @@
+"""Tests for incremental SOAR polling against a fake paged list_cases."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from tools.soar_polling import CaseCursor, case_id, fetch_closed_cases
+
+PAGE_SIZE = 50
+
+
+class FakeSoar:
+    """Closed cases one minute apart, listed most recently updated first."""
+
+    def __init__(self, count, now=None):
+        self.now = now or datetime.now(timezone.utc)
+        self.cases = []
+        self.add(count)
+
+    def add(self, count):
+        for _ in range(count):
+            self.now += timedelta(minutes=1)
+            closed = self.now.isoformat()
+            self.cases.append({"id": len(self.cases) + 1, "status": "CLOSED",
+                               "closeTime": closed, "updateTime": closed})
+
+    async def list_cases(self, token):
+        if token == "expired":
+            raise RuntimeError("invalid page token")
+        offset = int(token or 0)
+        newest_first = self.cases[::-1]
+        page = newest_first[offset:offset + PAGE_SIZE]
+        more = offset + PAGE_SIZE < len(newest_first)
+        return {"cases": page, "nextPageToken": str(offset + PAGE_SIZE) if more else None}
+
+
+def poll(soar, cursor, failed_ids=frozenset(), **kwargs):
+    cases, stats = asyncio.run(fetch_closed_cases(soar.list_cases, cursor, **kwargs))
+    cursor.advance(cases, failed_ids, next_page_token=stats["next_page_token"], since=stats["since"])
+    return cases, stats
+
+
+def test_truncated_first_poll_loses_no_cases():
+    # 20k cases one minute apart: about 10k fall inside the 7-day lookback,
+    # far more than one 50-page poll reads.
+    soar = FakeSoar(20000, now=datetime.now(timezone.utc) - timedelta(minutes=20000))
+    in_window = {case["id"] for case in soar.cases
+                 if datetime.fromisoformat(case["closeTime"]) >= soar.now - timedelta(days=7, minutes=-5)}
+    cursor = CaseCursor(path=None)
+
+    returned = set()
+    cases, stats = poll(soar, cursor)
+    assert stats["next_page_token"] and cursor.key is None
+    returned.update(case["id"] for case in cases)
+    for _ in range(10):
+        if not cursor.sweep:
+            break
+        cases, stats = poll(soar, cursor)
+        returned.update(case["id"] for case in cases)
+
+    assert cursor.sweep is None
+    assert in_window <= returned
+    assert cursor.case_id == "20000"
+
+    # Caught up: a case closed afterwards is found without a long read
+    soar.add(1)
+    cases, stats = poll(soar, cursor)
+    assert [case["id"] for case in cases] == [20001] and stats["pages"] <= 2
+
+
+def test_new_cases_during_a_sweep_are_polled_after_it():
+    soar = FakeSoar(300)
+    cursor = CaseCursor(path=None)
+    poll(soar, cursor)
+    soar.add(300)
+    cases, _ = poll(soar, cursor, max_pages=2)
+    assert cursor.sweep
+    returned = {case["id"] for case in cases}
+    soar.add(20)
+    while True:
+        cases, _ = poll(soar, cursor, max_pages=2)
+        returned.update(case["id"] for case in cases)
+        if not cursor.sweep:
+            break
+    cases, _ = poll(soar, cursor, max_pages=2)
+    returned.update(case["id"] for case in cases)
+    assert set(range(301, 621)) <= returned
+    assert cursor.case_id == "620"
+
+
+def test_failed_case_is_polled_again():
+    soar = FakeSoar(10)
+    cursor = CaseCursor(path=None)
+    poll(soar, cursor, failed_ids={"4"})
+    assert (cursor.case_id, cursor.exclusive) == ("4", True)
+
+    cases, _ = poll(soar, cursor)
+    assert [case_id(case) for case in cases] == [str(n) for n in range(4, 11)]
+    cursor.advance(cases)
+    assert (cursor.case_id, cursor.exclusive) == ("10", False)
+
+
+def test_failure_during_a_sweep_holds_the_watermark():
+    soar = FakeSoar(500)
+    cursor = CaseCursor(path=None)
+    poll(soar, cursor, max_pages=3)
+    cases, _ = poll(soar, cursor, max_pages=3, failed_ids={"300"})
+    assert 300 in {case["id"] for case in cases}
+    while cursor.sweep:
+        poll(soar, cursor, max_pages=3)
+    assert (cursor.case_id, cursor.exclusive) == ("300", True)
+    cases, _ = poll(soar, cursor)
+    assert min(case["id"] for case in cases) == 300
+
+
+def test_sweep_is_persisted(tmp_path):
+    soar = FakeSoar(500)
+    path = str(tmp_path / "cursor.json")
+    cursor = CaseCursor(path=path)
+    poll(soar, cursor, max_pages=3)
+
+    reloaded = CaseCursor(path=path)
+    assert reloaded.sweep == cursor.sweep
+    cases, stats = asyncio.run(fetch_closed_cases(soar.list_cases, reloaded, max_pages=3))
+    assert max(case["id"] for case in cases) == 500 - 3 * PAGE_SIZE
+
+
+def test_expired_page_token_restarts_from_the_first_page():
+    soar = FakeSoar(500)
+    cursor = CaseCursor(path=None)
+    poll(soar, cursor, max_pages=3)
+    cursor.sweep["token"] = "expired"
+    cases, stats = asyncio.run(fetch_closed_cases(soar.list_cases, cursor, max_pages=3))
+    assert max(case["id"] for case in cases) == 500
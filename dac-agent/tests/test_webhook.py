@@ -0,0 +1,83 @@
+"""Tests for coalescing pushed cases in the case-closed webhook listener."""
+
+import asyncio
+import time
+
+from tools.case_ledger import CaseLedger
+from webhook import CaseWebhookListener
+
+
+class FakeExecutor:
+    """Groups cases by rule name and records every batch it processes."""
+
+    def __init__(self):
+        self.ledger = CaseLedger(":memory:")
+        self.worktrees = None
+        self.batches = []
+        self._in_flight = set()
+
+    def _claim_cases(self, cases):
+        claimed = []
+        for case in cases:
+            if case["id"] not in self._in_flight:
+                self._in_flight.add(case["id"])
+                claimed.append(case)
+        return claimed
+
+    def _release_cases(self, cases):
+        self._in_flight.difference_update(case["id"] for case in cases)
+
+    async def _batch_tuning_cases(self, cases):
+        batches = {}
+        for case in cases:
+            batches.setdefault(case["rule_name"], {"rule_files": [case["rule_name"]], "cases": []})["cases"].append(case)
+        return list(batches.values())
+
+    async def _process_and_record(self, cases, rule_files=None):
+        self.batches.append([case["id"] for case in cases])
+        for case in cases:
+            self.ledger.record(case["id"], "pr_created", pr_url=f"https://example.test/pr/{len(self.batches)}")
+        return {"rule_tuned": True, "pr_created": True}
+
+
+def run_listener(listener, pushes):
+    """Queues (delay, case) pushes as the HTTP handler would and waits for them."""
+
+    async def main():
+        workers = [asyncio.create_task(listener._consume()) for _ in range(listener.workers)]
+        for delay, case in pushes:
+            await asyncio.sleep(delay)
+            listener.queue.put_nowait((case, time.monotonic()))
+        await listener.queue.join()
+        listener._stopping = True
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    asyncio.run(main())
+
+
+def case(case_id, rule_name):
+    return {"id": case_id, "rule_name": rule_name}
+
+
+def test_cases_closed_together_share_a_batch_per_rule():
+    executor = FakeExecutor()
+    listener = CaseWebhookListener(executor, workers=2, coalesce_seconds=0.2)
+    run_listener(listener, [(0, case("1", "rmm")), (0.01, case("2", "outbound")),
+                            (0.01, case("3", "rmm")), (0.01, case("1", "rmm"))])
+
+    assert sorted(executor.batches) == [["1", "3"], ["2"]]
+    assert listener.stats["processed"] == 3
+    assert listener.stats["duplicates"] == 1
+    assert len(listener.latencies) == 3
+
+
+def test_processed_cases_are_not_batched_again():
+    executor = FakeExecutor()
+    executor.ledger.record("1", "pr_created")
+    listener = CaseWebhookListener(executor, coalesce_seconds=0.05)
+    run_listener(listener, [(0, case("1", "rmm")), (0, case("2", "rmm")), (0.3, case("3", "rmm"))])
+
+    assert executor.batches == [["2"], ["3"]]
+    assert listener.stats["duplicates"] == 1
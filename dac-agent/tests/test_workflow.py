@@ -0,0 +1,150 @@
+"""Tests for DACWorkflowExecutor steps that run without SOAR, SIEM or git."""
+
+import asyncio
+import shutil
+from pathlib import Path
+
+import yaml
+
+from tools import tools as dac_tools
+from tools.case_ledger import CaseLedger
+from tools.soar_polling import CaseCursor
+from workflow import DACWorkflowExecutor
+
+RULES_DIR = Path(__file__).resolve().parent.parent / "rules"
+
+REQUIREMENTS = [{"conditions": [
+    {"field": "user.name", "operator": "=", "value": "svc_backup"},
+    {"field": "host.name", "operator": "=", "value": "backup-srv01"},
+]}]
+
+
+def make_executor(validate_yaml_file=dac_tools.validate_yaml_file, **kwargs):
+    def unused(*args, **kwargs):
+        raise AssertionError("not expected to be called")
+
+    agent_tools = (None, None, None, dac_tools.get_current_time, unused, unused, unused, unused, unused,
+                   validate_yaml_file, unused)
+    return DACWorkflowExecutor(agent_tools, use_worktrees=False, case_cursor=CaseCursor(path=None),
+                               ledger=CaseLedger(":memory:"), **kwargs)
+
+
+def copy_rule(tmp_path, name="network/suspicious_outbound_connections.yaml"):
+    rule_path = tmp_path / Path(name).name
+    shutil.copy(RULES_DIR / name, rule_path)
+    return rule_path
+
+
+def test_modification_validates_the_written_rule(tmp_path):
+    rule_path = copy_rule(tmp_path)
+    validated = []
+
+    def validate(file_path, run_tests=True):
+        # The modified rule must already be on disk when it is validated
+        validated.append(yaml.safe_load(Path(file_path).read_text())["logic"]["query"])
+        return dac_tools.validate_yaml_file(file_path, run_tests)
+
+    executor = make_executor(validate)
+    result = asyncio.run(executor._generate_rule_modification(str(rule_path), REQUIREMENTS))
+
+    assert result["success"], result
+    assert result["validation"]["valid"]
+    assert 'user.name = "svc_backup"' in validated[0]
+    _, body = executor._generate_pr_content([{"id": "1", "rule_name": "r"}], result)
+    assert "- [x] Rule syntax validation passed" in body
+
+
+def test_failed_validation_restores_the_rule(tmp_path):
+    rule_path = copy_rule(tmp_path)
+    original = rule_path.read_text()
+
+    def invalid(file_path, run_tests=True):
+        return {"valid": False, "file_path": file_path, "error": "broken"}
+
+    result = asyncio.run(make_executor(invalid)._generate_rule_modification(str(rule_path), REQUIREMENTS))
+
+    assert not result["success"]
+    assert "broken" in result["error"]
+    assert rule_path.read_text() == original
+
+
+def test_pr_body_leaves_validation_unticked_without_a_result():
+    _, body = make_executor()._generate_pr_content([{"id": "1", "rule_name": "r"}], {"success": True})
+    assert "- [ ] Rule syntax validation passed" in body
+
+
+def test_failed_outcome_holds_the_soar_watermark():
+    polled = [{"id": str(n), "status": "CLOSED", "closeTime": f"2026-01-0{n}T00:00:00Z"} for n in (1, 2, 3)]
+    executor = make_executor()
+
+    async def monitor():
+        executor._polled_cases = polled
+        executor._poll_stats = {"next_page_token": None, "since": None}
+        return [dict(case) for case in polled]
+
+    async def batch(cases):
+        return [{"rule_files": [], "cases": [case]} for case in cases]
+
+    async def process(cases, rule_files=None):
+        if cases[0]["id"] == "2":
+            return {"success": False, "error": "Rule file not found"}
+        return {"success": True, "pr_created": True, "rule_tuned": True}
+
+    async def report(results):
+        pass
+
+    executor._monitor_soar_cases = monitor
+    executor._batch_tuning_cases = batch
+    executor._process_tuning_batch = process
+    executor._generate_workflow_report = report
+    results = asyncio.run(executor.execute_full_workflow())
+
+    assert results["prs_created"] == 2 and not results["errors"]
+    assert executor.ledger.get("2")["outcome"] == "failed"
+    # The failed case and those after it are polled again
+    assert (executor.case_cursor.case_id, executor.case_cursor.exclusive) == ("2", True)
+    assert [case for case in polled if executor.case_cursor.is_new(case)] == polled[1:]
+
+
+def test_case_failing_repeatedly_stops_holding_the_watermark():
+    polled = [{"id": str(n), "status": "CLOSED", "closeTime": f"2026-01-0{n}T00:00:00Z"} for n in (1, 2, 3)]
+    executor = make_executor()
+    processed = []
+
+    async def monitor():
+        executor._polled_cases = [case for case in polled if executor.case_cursor.is_new(case)]
+        executor._poll_stats = {"next_page_token": None, "since": None}
+        return [dict(case) for case in executor._polled_cases]
+
+    async def batch(cases):
+        return [{"rule_files": [], "cases": [case]} for case in cases]
+
+    async def process(cases, rule_files=None):
+        processed.append(cases[0]["id"])
+        if cases[0]["id"] == "2":
+            raise RuntimeError("rule regression")
+        return {"success": True, "pr_created": True, "rule_tuned": True}
+
+    async def report(results):
+        pass
+
+    executor._monitor_soar_cases = monitor
+    executor._batch_tuning_cases = batch
+    executor._process_tuning_batch = process
+    executor._generate_workflow_report = report
+    for _ in range(executor.ledger.max_attempts):
+        asyncio.run(executor.execute_full_workflow())
+
+    assert processed == ["1", "2", "3", "2", "2"]
+    assert executor.ledger.get("2")["attempts"] == executor.ledger.max_attempts
+    assert (executor.case_cursor.case_id, executor.case_cursor.exclusive) == ("3", False)
+
+
+def test_ledger_counts_consecutive_failures():
+    ledger = CaseLedger(":memory:", max_attempts=2)
+    ledger.record("7", "failed", error="boom")
+    assert not ledger.done(["7"])
+    ledger.record("7", "failed", error="boom")
+    assert ledger.done(["7"])["7"]["attempts"] == 2
+    ledger.record("7", "no_change")
+    assert ledger.get("7")["attempts"] == 1
@@ -0,0 +1,184 @@
+"""
+Ledger of SOAR cases the DAC agent has processed.
+
+Every case the workflow handles is recorded in a local SQLite database with
+its outcome, branch, pull request URL and the version and content hash of
+the rule it produced. Before doing any work the workflow looks the polled
+case IDs up (primary-key lookups), so a rerun never recreates a tuning
+branch or adds another copy of an exclusion for a case that was already
+turned into a pull request.
+
+A failed case is retried until it has failed MAX_FAILED_ATTEMPTS times in a
+row; after that it is treated as done (and no longer holds back the SOAR
+watermark) until it is removed with --forget-cases.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_LEDGER_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "case_ledger.sqlite3"))
+
+# Outcomes after which a case is never processed again. "failed" entries
+# are kept for inspection and only block a retry after MAX_FAILED_ATTEMPTS.
+DONE_OUTCOMES = ("pr_created", "pushed", "no_change")
+
+# Consecutive failures after which a case is no longer retried.
+MAX_FAILED_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS processed_cases (
+    case_id TEXT PRIMARY KEY,
+    outcome TEXT NOT NULL,
+    branch TEXT,
+    pr_url TEXT,
+    rule_file TEXT,
+    rule_version TEXT,
+    content_hash TEXT,
+    error TEXT,
+    processed_at TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 1
+)
+"""
+
+_COLUMNS = ("case_id", "outcome", "branch", "pr_url", "rule_file", "rule_version",
+            "content_hash", "error", "processed_at")
+
+# Consecutive failures are counted; any other outcome starts over at 1.
+_UPSERT = f"""
+INSERT INTO processed_cases ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})
+ON CONFLICT(case_id) DO UPDATE SET
+    {', '.join(f"{column} = excluded.{column}" for column in _COLUMNS[1:])},
+    attempts = CASE WHEN excluded.outcome = 'failed' AND processed_cases.outcome = 'failed'
+                    THEN processed_cases.attempts + 1 ELSE 1 END
+"""
+
+# SQLite's default limit on host parameters per statement.
+_MAX_PARAMETERS = 999
+
+
+class CaseLedger:
+    """SQLite-backed record of processed SOAR cases.
+
+    Attributes:
+        path: Database file (":memory:" for a throwaway ledger).
+        max_attempts: Consecutive failures after which a case counts as done.
+    """
+
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH, max_attempts: int = MAX_FAILED_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock, self._db:
+            if path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(_SCHEMA)
+            columns = {row["name"] for row in self._db.execute("PRAGMA table_info(processed_cases)")}
+            if "attempts" not in columns:
+                # Ledgers created before failures were counted
+                self._db.execute("ALTER TABLE processed_cases ADD COLUMN attempts INTEGER NOT NULL DEFAULT 1")
+
+    def get(self, case_id: str) -> Optional[Dict]:
+        """Returns the ledger entry of a case, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT * FROM processed_cases WHERE case_id = ?", (str(case_id),)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def done(self, case_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Returns the entries of the given cases that must not be processed again.
+
+        Args:
+            case_ids: Case IDs to look up.
+
+        Returns:
+            Dict[str, Dict]: Entries with a DONE_OUTCOMES outcome, or that
+            failed max_attempts times in a row, by case ID.
+        """
+        case_ids = [str(case_id) for case_id in case_ids]
+        found = {}
+        chunk_size = _MAX_PARAMETERS - len(DONE_OUTCOMES) - 1
+        with self._lock:
+            for start in range(0, len(case_ids), chunk_size):
+                chunk = case_ids[start:start + chunk_size]
+                rows = self._db.execute(
+                    f"SELECT * FROM processed_cases WHERE case_id IN ({', '.join('?' * len(chunk))}) "
+                    f"AND (outcome IN ({', '.join('?' * len(DONE_OUTCOMES))}) "
+                    f"OR (outcome = 'failed' AND attempts >= ?))",
+                    (*chunk, *DONE_OUTCOMES, self.max_attempts)
+                ).fetchall()
+                found.update((row["case_id"], dict(row)) for row in rows)
+        return found
+
+    def record(self, case_id: str, outcome: str, branch: str = None, pr_url: str = None,
+               rule_file: str = None, rule_version: str = None, content_hash: str = None,
+               error: str = None) -> None:
+        """Records (or replaces) the outcome of a case.
+
+        A failure following a failure increments the entry's attempts.
+
+        Args:
+            case_id: SOAR case ID
+            outcome: pr_created, pushed (branch pushed, PR not created),
+                no_change (the rule already excluded the case) or failed
+            branch: Tuning branch
+            pr_url: Pull request URL
+            rule_file: Modified rule file
+            rule_version: Rule version after the change
+            content_hash: SHA-256 of the modified rule file
+            error: Error message of a failed case
+        """
+        entry = (str(case_id), outcome, branch, pr_url, rule_file, rule_version, content_hash, error,
+                 datetime.now(timezone.utc).isoformat(timespec="seconds"))
+        with self._lock, self._db:
+            self._db.execute(_UPSERT, entry)
+
+    def entries(self, outcome: str = None, limit: int = None) -> List[Dict]:
+        """Returns ledger entries, most recent first."""
+        query = "SELECT * FROM processed_cases"
+        parameters = []
+        if outcome:
+            query += " WHERE outcome = ?"
+            parameters.append(outcome)
+        query += " ORDER BY processed_at DESC, case_id DESC"
+        if limit:
+            query += " LIMIT ?"
+            parameters.append(limit)
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query, parameters)]
+
+    def delete(self, case_ids: Iterable[str]) -> int:
+        """Removes entries so their cases can be processed again.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        with self._lock, self._db:
+            return sum(
+                self._db.execute("DELETE FROM processed_cases WHERE case_id = ?", (str(case_id),)).rowcount
+                for case_id in case_ids
+            )
+
+    def reset(self) -> int:
+        """Removes every entry.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        with self._lock, self._db:
+            return self._db.execute("DELETE FROM processed_cases").rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM processed_cases").fetchone()[0]
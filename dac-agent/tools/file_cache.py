@@ -0,0 +1,86 @@
+"""Process-wide cache of rules-bank markdown.
+
+Every agent loads overlapping persona/runbook sets (report_writing.md is used
+by nearly all of them), so file contents are stored once and assembled
+descriptions are shared between agents that ask for the same inputs. Entries
+are validated against each file's (mtime, size) signature on every lookup, so
+edits on disk are picked up.
+
+The SOC manager has the same module (multi-agent/manager/utils/file_cache.py).
+The two projects are run and deployed separately, so each keeps its own copy;
+tests/test_shared_utils.py checks that the code has not drifted apart.
+"""
+import os
+import threading
+
+_file_cache = {}
+_assembled_cache = {}
+_cache_lock = threading.Lock()
+
+
+def file_signature(file_path):
+    """Returns the (mtime_ns, size) signature of a file, or None if it is missing."""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_cached_file(file_path) -> str:
+    """Reads a text file through the process-wide content cache.
+
+    Args:
+        file_path: Path to the file to read.
+
+    Returns:
+        The file contents. Repeated calls return the same string object until
+        the file's mtime or size changes.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    key = os.path.realpath(file_path)
+    signature = file_signature(key)
+    if signature is None:
+        raise FileNotFoundError(file_path)
+    with _cache_lock:
+        cached = _file_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    with open(key, 'r', encoding='utf-8') as f:
+        content = f.read()
+    with _cache_lock:
+        _file_cache[key] = (signature, content)
+    return content
+
+
+def cached_assembly(file_paths, key, build):
+    """Returns what `build` assembles from a set of files, reused while none change.
+
+    Args:
+        file_paths: Files the result is assembled from (missing files are fine).
+        key: Anything else the result depends on (hashable).
+        build: Zero-argument callable assembling the result.
+
+    Returns:
+        The cached result for the same files and key, or a freshly built one.
+    """
+    paths = tuple(os.path.realpath(p) for p in file_paths)
+    cache_key = (paths, key)
+    signature = tuple(file_signature(p) for p in paths)
+    with _cache_lock:
+        cached = _assembled_cache.get(cache_key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    result = build()
+    with _cache_lock:
+        _assembled_cache[cache_key] = (signature, result)
+    return result
+
+
+def clear_file_cache():
+    """Drops all cached file contents and assembled descriptions."""
+    with _cache_lock:
+        _file_cache.clear()
+        _assembled_cache.clear()
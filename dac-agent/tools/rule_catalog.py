@@ -0,0 +1,381 @@
+"""
+Persistent, indexed catalog of detection rules.
+
+Each rule file is parsed once and indexed by id, name, tags, MITRE techniques
+and data sources. The catalog is saved as JSON and refreshed incrementally:
+files whose size and mtime are unchanged are not reopened, and files whose
+content hash is unchanged are not re-parsed. Lookups are dictionary hits for
+exact matches and a token index for fuzzy name matches, so they do not depend
+on the size of the rules directory.
+
+Lookups do not rescan the directory: they only compare the mtimes of the
+rule directories, which change when a rule file is added, removed or
+replaced (including a git checkout), and rescan only then. Rule files the
+workflow rewrites in place are re-indexed one at a time through
+rule_file_written; refresh(force=True) rescans everything.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "rules"))
+DEFAULT_CATALOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "rule_catalog"))
+
+# Bump when the entry layout changes so old catalogs are rebuilt.
+CATALOG_VERSION = 1
+
+# Minimum name-token overlap (Jaccard) for a fuzzy match.
+FUZZY_THRESHOLD = 0.5
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# libyaml's loader is an order of magnitude faster on large rule sets.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _normalize(value) -> str:
+    return " ".join(str(value).lower().split())
+
+
+def _tokens(value) -> set:
+    return set(_TOKEN.findall(str(value).lower()))
+
+
+def _rule_fields(rule: dict) -> dict:
+    """Extracts the indexed fields of a parsed rule."""
+    metadata = rule.get("metadata") or {}
+    mitre = rule.get("mitre") or {}
+    return {
+        "id": rule.get("id"),
+        "name": rule.get("name"),
+        "severity": rule.get("severity"),
+        "status": rule.get("status"),
+        "tags": [str(tag) for tag in rule.get("tags") or []],
+        "techniques": [str(t) for t in mitre.get("techniques") or []],
+        "tactics": [str(t) for t in mitre.get("tactics") or []],
+        "data_sources": [str(d) for d in metadata.get("data_sources") or []],
+    }
+
+
+class RuleCatalog:
+    """Indexes the YAML rules under a directory.
+
+    Attributes:
+        rules_dir: Directory scanned for *.yaml / *.yml rules.
+        catalog_path: JSON file the catalog is persisted to (None keeps it in
+            memory only).
+    """
+
+    def __init__(self, rules_dir: str = DEFAULT_RULES_DIR, catalog_path: str = None):
+        self.rules_dir = os.path.realpath(rules_dir)
+        if catalog_path is None:
+            digest = hashlib.sha1(self.rules_dir.encode()).hexdigest()[:16]
+            catalog_path = os.path.join(DEFAULT_CATALOG_DIR, f"{digest}.json")
+        self.catalog_path = catalog_path
+        self.stats = {"scans": 0, "parsed": 0, "rehashed": 0, "lookups": 0}
+        self._entries = {}
+        # mtime_ns of every directory seen by the last scan (empty: never scanned)
+        self._dir_mtimes = {}
+        self._lock = threading.RLock()
+        self._build_indexes()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence and incremental refresh
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        if not self.catalog_path:
+            return
+        try:
+            with open(self.catalog_path, "r") as f:
+                catalog = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable rule catalog {self.catalog_path}: {e}")
+            return
+        if catalog.get("version") != CATALOG_VERSION or catalog.get("rules_dir") != self.rules_dir:
+            return
+        self._entries = catalog.get("rules", {})
+        self._build_indexes()
+
+    def _save(self) -> None:
+        if not self.catalog_path:
+            return
+        catalog = {"version": CATALOG_VERSION, "rules_dir": self.rules_dir, "rules": self._entries}
+        try:
+            os.makedirs(os.path.dirname(self.catalog_path), exist_ok=True)
+            tmp_path = f"{self.catalog_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(catalog, f)
+            os.replace(tmp_path, self.catalog_path)
+        except OSError as e:
+            logger.warning(f"Could not save rule catalog {self.catalog_path}: {e}")
+
+    def _scan(self) -> dict:
+        """Returns {relative path: (mtime_ns, size)} for every rule file."""
+        found = {}
+        self._dir_mtimes = {}
+        for root, dirs, files in os.walk(self.rules_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            try:
+                self._dir_mtimes[root] = os.stat(root).st_mtime_ns
+            except OSError:
+                continue
+            for file_name in files:
+                if file_name.endswith((".yaml", ".yml")):
+                    path = os.path.join(root, file_name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    found[os.path.relpath(path, self.rules_dir)] = (stat.st_mtime_ns, stat.st_size)
+        return found
+
+    def _dirs_changed(self) -> bool:
+        """True if a rule file may have been added, removed or replaced since the last scan."""
+        if not self._dir_mtimes:
+            return True
+        for directory, mtime_ns in self._dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime_ns:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def _index_file(self, relative: str, mtime_ns: int, size: int) -> str:
+        """(Re-)indexes one rule file.
+
+        Returns:
+            str: "changed" if its entry was added or changed, "touched" if
+            only its mtime changed, "" if it is up to date or unreadable.
+        """
+        entry = self._entries.get(relative)
+        if entry and entry["mtime_ns"] == mtime_ns and entry["size"] == size:
+            return ""
+        path = os.path.join(self.rules_dir, relative)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+        except OSError:
+            return ""
+        sha256 = hashlib.sha256(content).hexdigest()
+        if entry and entry["sha256"] == sha256:
+            # Touched but not edited: keep the parsed fields.
+            entry.update(mtime_ns=mtime_ns, size=size)
+            self.stats["rehashed"] += 1
+            return "touched"
+
+        new_entry = {"mtime_ns": mtime_ns, "size": size, "sha256": sha256, "error": None}
+        try:
+            rule = yaml.load(content, Loader=_YAML_LOADER)
+            if not isinstance(rule, dict):
+                raise ValueError("rule is not a mapping")
+            new_entry.update(_rule_fields(rule))
+        except Exception as e:
+            new_entry["error"] = str(e)
+        self._entries[relative] = new_entry
+        self.stats["parsed"] += 1
+        return "changed"
+
+    def refresh(self, force: bool = False) -> bool:
+        """Brings the catalog up to date with the rules directory.
+
+        Args:
+            force: Scan even if no rule directory changed since the last scan.
+
+        Returns:
+            bool: True if any entry was added, changed or removed.
+        """
+        with self._lock:
+            if not force and not self._dirs_changed():
+                return False
+            self.stats["scans"] += 1
+
+            found = self._scan()
+            changed = False
+            touched = False
+            for relative in set(self._entries) - set(found):
+                del self._entries[relative]
+                changed = True
+
+            for relative, (mtime_ns, size) in found.items():
+                result = self._index_file(relative, mtime_ns, size)
+                changed = changed or result == "changed"
+                touched = touched or result == "touched"
+
+            if changed:
+                self._build_indexes()
+            if changed or touched:
+                self._save()
+            return changed
+
+    def update_file(self, path: str) -> bool:
+        """Re-indexes a single rule file after it was written (or removed).
+
+        Args:
+            path: Rule file under rules_dir.
+
+        Returns:
+            bool: True if its entry was added, changed or removed.
+        """
+        relative = os.path.relpath(os.path.realpath(path), self.rules_dir)
+        with self._lock:
+            try:
+                stat = os.stat(os.path.join(self.rules_dir, relative))
+            except OSError:
+                result = "changed" if self._entries.pop(relative, None) else ""
+            else:
+                result = self._index_file(relative, stat.st_mtime_ns, stat.st_size)
+            if result == "changed":
+                self._build_indexes()
+            if result:
+                self._save()
+            return result == "changed"
+
+    def _build_indexes(self) -> None:
+        self._by_id = {}
+        self._by_name = {}
+        self._by_tag = {}
+        self._by_technique = {}
+        self._by_data_source = {}
+        self._by_name_token = {}
+        self._name_tokens = {}
+
+        def add(index, key, relative):
+            if key:
+                index.setdefault(_normalize(key), []).append(relative)
+
+        for relative, entry in sorted(self._entries.items()):
+            if entry.get("error"):
+                continue
+            add(self._by_id, entry.get("id"), relative)
+            add(self._by_name, entry.get("name"), relative)
+            for tag in entry.get("tags", []):
+                add(self._by_tag, tag, relative)
+            for technique in entry.get("techniques", []):
+                add(self._by_technique, technique, relative)
+            for data_source in entry.get("data_sources", []):
+                add(self._by_data_source, data_source, relative)
+            self._name_tokens[relative] = _tokens(entry.get("name") or "")
+            for token in self._name_tokens[relative]:
+                self._by_name_token.setdefault(token, []).append(relative)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def _result(self, relative: str, match: str, score: float = 1.0) -> dict:
+        entry = self._entries[relative]
+        path = os.path.join(self.rules_dir, relative)
+        return {
+            "file_path": path,
+            "file_name": os.path.basename(path),
+            "directory": os.path.dirname(path),
+            "rule_id": entry.get("id"),
+            "rule_name": entry.get("name"),
+            "match": match,
+            "score": score,
+        }
+
+    def search(self, pattern: str, fuzzy: bool = True, limit: int = None) -> list:
+        """Finds rules by id, name, tag, MITRE technique or data source.
+
+        Exact matches on id or name win; otherwise tag, technique and data
+        source matches are returned; otherwise, with fuzzy=True, rules whose
+        name shares enough words with the pattern, best first.
+
+        Args:
+            pattern: Rule id, name, tag, technique ID or data source.
+            fuzzy: Fall back to fuzzy name matching.
+            limit: Maximum number of results.
+
+        Returns:
+            list[dict]: Matches with file_path, file_name, directory, rule_id,
+            rule_name, match (the index that matched) and score.
+        """
+        self.refresh()
+        with self._lock:
+            self.stats["lookups"] += 1
+            key = _normalize(pattern)
+            results = []
+            seen = set()
+
+            def collect(index, match):
+                for relative in index.get(key, []):
+                    if relative not in seen:
+                        seen.add(relative)
+                        results.append(self._result(relative, match))
+
+            collect(self._by_id, "id")
+            collect(self._by_name, "name")
+            if not results:
+                collect(self._by_tag, "tag")
+                collect(self._by_technique, "technique")
+                collect(self._by_data_source, "data_source")
+
+            if not results and fuzzy:
+                query = _tokens(pattern)
+                # A match shares at least FUZZY_THRESHOLD * len(query) tokens,
+                # so it contains one of the rarest len(query) - required + 1.
+                required = max(1, math.ceil(FUZZY_THRESHOLD * len(query)))
+                rarest = sorted(query, key=lambda token: len(self._by_name_token.get(token, ())))
+                candidates = set()
+                for token in rarest[:len(query) - required + 1]:
+                    candidates.update(self._by_name_token.get(token, ()))
+                scored = []
+                for relative in candidates:
+                    name_tokens = self._name_tokens[relative]
+                    score = len(query & name_tokens) / len(query | name_tokens)
+                    if score >= FUZZY_THRESHOLD:
+                        scored.append((score, relative))
+                for score, relative in sorted(scored, key=lambda item: (-item[0], item[1])):
+                    results.append(self._result(relative, "fuzzy", round(score, 3)))
+
+            return results[:limit] if limit else results
+
+    def get(self, rule_id: str):
+        """Returns the catalog entry of a rule id, or None."""
+        self.refresh()
+        with self._lock:
+            relatives = self._by_id.get(_normalize(rule_id))
+            if not relatives:
+                return None
+            return dict(self._entries[relatives[0]], file_path=os.path.join(self.rules_dir, relatives[0]))
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self._entries.values() if not entry.get("error"))
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_rule_catalog(rules_dir: str = None) -> RuleCatalog:
+    """Returns the process-wide catalog for a rules directory (default: dac-agent/rules)."""
+    key = os.path.realpath(rules_dir or DEFAULT_RULES_DIR)
+    with _catalogs_lock:
+        if key not in _catalogs:
+            _catalogs[key] = RuleCatalog(key)
+        return _catalogs[key]
+
+
+def rule_file_written(path: str) -> None:
+    """Re-indexes a rule file in the catalog of its rules directory, if one is loaded."""
+    path = os.path.realpath(path)
+    with _catalogs_lock:
+        catalogs = list(_catalogs.values())
+    for catalog in catalogs:
+        if path.startswith(catalog.rules_dir + os.sep):
+            catalog.update_file(path)
@@ -0,0 +1,340 @@
+"""
+In-process evaluation of detection rules.
+
+compile_rule() turns a rule's `logic.query` and its `exclusions` into a
+Python predicate over an event (a dict with dotted field names, or nested
+dicts). Compiled rules are cached, so re-evaluating the same rule is free.
+run_test_cases() checks a rule's `validation.test_cases` against it.
+
+Matching semantics:
+    - String comparisons (=, !=, IN, CONTAINS) ignore case; MATCHES is a
+      case-insensitive regular-expression search.
+    - Numbers compare numerically (the event value is converted).
+    - IN entries written as CIDR ranges ("10.0.0.0/8") match IP addresses in
+      the range.
+    - A comparison on a missing field is false. A list value matches if any
+      of its items does.
+    - An exclusion whose `expires` date has passed no longer applies.
+"""
+
+import argparse
+import functools
+import ipaddress
+import json
+import operator
+import os
+import re
+import sys
+import time
+from datetime import date, datetime
+from typing import Callable, List, Optional, Tuple
+
+import yaml
+
+try:
+    from .rule_query import And, Comparison, Not, Or, parse_query
+except ImportError:
+    from rule_query import And, Comparison, Not, Or, parse_query
+
+Predicate = Callable[[dict], bool]
+
+_MISSING = object()
+
+_NUMERIC_OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+def _field_getter(field: str) -> Callable[[dict], object]:
+    parts = field.split(".")
+
+    def get(event):
+        if field in event:
+            return event[field]
+        value = event
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                return _MISSING
+            value = value[part]
+        return value
+
+    return get
+
+
+def _as_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _as_network(value):
+    if isinstance(value, str) and "/" in value:
+        try:
+            return ipaddress.ip_network(value, strict=False)
+        except ValueError:
+            return None
+    return None
+
+
+def _value_test(node: Comparison) -> Callable[[object], bool]:
+    """Returns a test for a single (non-list) event value."""
+    op, expected = node.operator, node.value
+
+    if op in ("=", "!="):
+        number = _as_number(expected) if not isinstance(expected, str) else None
+        if number is not None:
+            def equal(value):
+                return _as_number(value) == number
+        else:
+            text = str(expected).lower()
+
+            def equal(value):
+                return str(value).lower() == text
+        return equal if op == "=" else (lambda value: not equal(value))
+
+    if op in _NUMERIC_OPERATORS:
+        compare, number = _NUMERIC_OPERATORS[op], _as_number(expected)
+
+        def numeric(value):
+            value = _as_number(value)
+            return value is not None and number is not None and compare(value, number)
+        return numeric
+
+    if op == "IN":
+        strings = {str(item).lower() for item in expected if not _as_network(item)}
+        numbers = {_as_number(item) for item in expected if not isinstance(item, str)}
+        networks = [network for network in map(_as_network, expected) if network]
+
+        def member(value):
+            if str(value).lower() in strings or _as_number(value) in numbers - {None}:
+                return True
+            if networks:
+                try:
+                    address = ipaddress.ip_address(str(value))
+                except ValueError:
+                    return False
+                return any(address in network for network in networks)
+            return False
+        return member
+
+    if op == "CONTAINS":
+        text = str(expected).lower()
+        return lambda value: text in str(value).lower()
+
+    if op == "MATCHES":
+        pattern = re.compile(str(expected), re.IGNORECASE)
+        return lambda value: pattern.search(str(value)) is not None
+
+    raise ValueError(f"Unsupported operator {op!r}")
+
+
+def compile_query(node) -> Predicate:
+    """Compiles a query AST (see rule_query.parse_query) into a predicate.
+
+    Args:
+        node: Comparison, Not, And or Or.
+
+    Returns:
+        Callable[[dict], bool]: True if the event matches.
+    """
+    if isinstance(node, Comparison):
+        get, test = _field_getter(node.field), _value_test(node)
+
+        def comparison(event):
+            value = get(event)
+            if value is _MISSING or value is None:
+                return False
+            if isinstance(value, (list, tuple)):
+                return any(test(item) for item in value)
+            return test(value)
+        return comparison
+    if isinstance(node, Not):
+        inner = compile_query(node.operand)
+        return lambda event: not inner(event)
+    operands = [compile_query(operand) for operand in node.operands]
+    if isinstance(node, And):
+        return lambda event: all(operand(event) for operand in operands)
+    if isinstance(node, Or):
+        return lambda event: any(operand(event) for operand in operands)
+    raise TypeError(f"Not a query node: {node!r}")
+
+
+def _expiry(value) -> Optional[date]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value), "%Y-%m-%d").date()
+
+
+def split_exclusions(exclusions: tuple, as_of: date) -> Tuple[list, list]:
+    """Splits (condition, expires) pairs into active conditions and expired
+    {"condition", "expires"} entries."""
+    active, expired = [], []
+    for condition, expires in exclusions:
+        expiry = _expiry(expires)
+        if expiry is not None and expiry < as_of:
+            expired.append({"condition": condition, "expires": str(expiry)})
+        else:
+            active.append(condition)
+    return active, expired
+
+
+def rule_logic(rule: dict) -> Tuple[str, tuple]:
+    """Returns a rule's query and its exclusions as (condition, expires) pairs.
+
+    Raises:
+        ValueError: If the rule has no logic.query.
+    """
+    query = (rule.get("logic") or {}).get("query")
+    if not query:
+        raise ValueError("Rule has no logic.query")
+    exclusions = tuple(
+        (exclusion["condition"], str(exclusion.get("expires") or ""))
+        for exclusion in rule.get("exclusions") or []
+        if exclusion.get("condition")
+    )
+    return query, exclusions
+
+
+class CompiledRule:
+    """A rule's query and active exclusions, compiled.
+
+    Attributes:
+        matches: Predicate that is True if the rule alerts on an event.
+        expired_exclusions: Exclusion conditions skipped because their
+            `expires` date has passed.
+    """
+
+    def __init__(self, query: str, exclusions: tuple, as_of: date):
+        detection = compile_query(parse_query(query))
+        conditions, self.expired_exclusions = split_exclusions(exclusions, as_of)
+        active = [compile_query(parse_query(condition)) for condition in conditions]
+
+        if active:
+            self.matches = lambda event: detection(event) and not any(e(event) for e in active)
+        else:
+            self.matches = detection
+
+    def __call__(self, event: dict) -> bool:
+        return self.matches(event)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_cached(query: str, exclusions: tuple, as_of: date) -> CompiledRule:
+    return CompiledRule(query, exclusions, as_of)
+
+
+def compile_rule(rule: dict, as_of: date = None) -> CompiledRule:
+    """Compiles a parsed rule (cached by query, exclusions and date).
+
+    Args:
+        rule: The rule's YAML content.
+        as_of: Date used for exclusion expiry (default: today).
+
+    Returns:
+        CompiledRule
+
+    Raises:
+        rule_query.QuerySyntaxError: If the query or an exclusion is invalid.
+        ValueError: If the rule has no logic.query.
+    """
+    query, exclusions = rule_logic(rule)
+    return _compile_cached(query, exclusions, as_of or date.today())
+
+
+def run_test_cases(rule: dict, as_of: date = None) -> dict:
+    """Runs a rule's validation.test_cases in-process.
+
+    Args:
+        rule: The rule's YAML content.
+        as_of: Date used for exclusion expiry (default: today).
+
+    Returns:
+        dict: passed (all cases pass), total, failed, results (per case:
+        description, should_alert, alerted, passed), expired_exclusions and
+        seconds.
+    """
+    start = time.perf_counter()
+    compiled = compile_rule(rule, as_of)
+    results = []
+    for test_case in (rule.get("validation") or {}).get("test_cases") or []:
+        alerted = compiled(test_case.get("event_data") or {})
+        should_alert = bool(test_case.get("should_alert"))
+        results.append({
+            "description": test_case.get("description", ""),
+            "should_alert": should_alert,
+            "alerted": alerted,
+            "passed": alerted == should_alert,
+        })
+    failed = sum(1 for result in results if not result["passed"])
+    return {
+        "passed": failed == 0,
+        "total": len(results),
+        "failed": failed,
+        "results": results,
+        "expired_exclusions": compiled.expired_exclusions,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _rule_paths(paths: List[str]) -> List[str]:
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _dirs, files in os.walk(path):
+                found.extend(os.path.join(root, f) for f in sorted(files) if f.endswith((".yaml", ".yml")))
+        else:
+            found.append(path)
+    return found
+
+
+def main(argv: List[str] = None) -> int:
+    """Runs the test cases of the given rule files or directories."""
+    default_rules = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "rules")
+    parser = argparse.ArgumentParser(description="Run the embedded test cases of detection rules")
+    parser.add_argument("paths", nargs="*", default=[default_rules], help="Rule files or directories")
+    parser.add_argument("--as-of", help="Evaluate exclusion expiry as of this date (YYYY-MM-DD)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args(argv)
+
+    as_of = _expiry(args.as_of) if args.as_of else None
+    report = {}
+    for path in _rule_paths(args.paths):
+        try:
+            with open(path, "r") as f:
+                rule = yaml.safe_load(f)
+            report[path] = run_test_cases(rule, as_of)
+        except Exception as e:
+            report[path] = {"passed": False, "error": str(e)}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for path, result in report.items():
+            if "error" in result:
+                print(f"ERROR {path}: {result['error']}")
+                continue
+            status = "PASS" if result["passed"] else "FAIL"
+            print(f"{status} {path}: {result['total'] - result['failed']}/{result['total']} test cases "
+                  f"({result['seconds'] * 1000:.2f} ms)")
+            for case in result["results"]:
+                if not case["passed"]:
+                    print(f"  - {case['description']}: expected alert={case['should_alert']}, got {case['alerted']}")
+            for exclusion in result["expired_exclusions"]:
+                print(f"  ! expired exclusion not applied: {exclusion['condition']} (expired {exclusion['expires']})")
+    return 0 if all(result.get("passed") for result in report.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
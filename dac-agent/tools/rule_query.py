@@ -0,0 +1,361 @@
+"""
+Parser and serializer for the detection rule query language.
+
+Rule queries (`logic.query`) are boolean expressions over event fields:
+
+    event.type = "process" AND
+    process.name IN ("ScreenConnect.exe", "AnyDesk.exe") AND
+    process.signer CONTAINS "IT_DEPARTMENT" AND
+    destination.domain MATCHES ".*\\.tk$" AND
+    network.bytes_sent > 10485760  // > 10MB
+    AND NOT (user.name = "svc_helpdesk" OR host.name = "build-01")
+
+Comparisons use =, !=, >, >=, <, <=, IN, CONTAINS and MATCHES; they combine
+with AND, OR, NOT (in decreasing precedence: NOT, AND, OR) and parentheses.
+`//` and `#` start comments that run to the end of the line.
+
+parse_query() builds an AST of frozen dataclasses, to_query() writes it back
+out, and add_exclusions() merges exclusions into the query's NOT clause
+structurally: nested groups are flattened, duplicates dropped and exclusions
+made redundant by broader ones removed, so repeated tuning keeps the query
+compact.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Tuple, Union
+
+Value = Union[str, int, float]
+
+COMPARISON_OPERATORS = ("=", "!=", ">", ">=", "<", "<=")
+KEYWORD_OPERATORS = ("IN", "CONTAINS", "MATCHES")
+INDENT = "  "
+
+
+class QuerySyntaxError(ValueError):
+    """Raised when a rule query cannot be parsed."""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} at position {position}")
+        self.position = position
+
+
+@dataclass(frozen=True)
+class Comparison:
+    """`field operator value`; for IN, value is a tuple of values."""
+    field: str
+    operator: str
+    value: Union[Value, Tuple[Value, ...]]
+
+
+@dataclass(frozen=True)
+class Not:
+    operand: "Node"
+
+
+@dataclass(frozen=True)
+class And:
+    operands: Tuple["Node", ...]
+
+
+@dataclass(frozen=True)
+class Or:
+    operands: Tuple["Node", ...]
+
+
+Node = Union[Comparison, Not, And, Or]
+
+
+# ----------------------------------------------------------------------
+# Tokenizer and parser
+# ----------------------------------------------------------------------
+
+_TOKEN_PATTERN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<comment>(//|\#)[^\n]*)
+  | (?P<string>"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')
+  | (?P<number>-?\d+(?:\.\d+)?(?![\w.]))
+  | (?P<operator>!=|>=|<=|=|>|<)
+  | (?P<punct>[(),])
+  | (?P<word>[A-Za-z_@][\w.@:-]*)
+""", re.VERBOSE)
+
+_KEYWORDS = {"AND", "OR", "NOT", "IN", "CONTAINS", "MATCHES"}
+
+
+def _unquote(literal: str) -> str:
+    """Strips quotes; backslash escapes only the quote and backslash
+    characters, so regular expressions such as ".*\\.tk$" keep their
+    backslashes."""
+    quote, body = literal[0], literal[1:-1]
+    return re.sub(r"\\([\\" + quote + r"])", r"\1", body)
+
+
+def _tokenize(text: str) -> List[Tuple[str, object, int]]:
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _TOKEN_PATTERN.match(text, position)
+        if not match:
+            raise QuerySyntaxError(f"Unexpected character {text[position]!r}", position)
+        kind = match.lastgroup
+        raw = match.group()
+        if kind == "string":
+            tokens.append(("value", _unquote(raw), position))
+        elif kind == "number":
+            tokens.append(("value", float(raw) if "." in raw else int(raw), position))
+        elif kind == "word" and raw.upper() in _KEYWORDS:
+            tokens.append(("keyword", raw.upper(), position))
+        elif kind in ("operator", "punct", "word"):
+            tokens.append((kind, raw, position))
+        position = match.end()
+    tokens.append(("end", None, len(text)))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.index = 0
+
+    def peek(self, kind=None, value=None) -> bool:
+        token_kind, token_value, _ = self.tokens[self.index]
+        return (kind is None or token_kind == kind) and (value is None or token_value == value)
+
+    def take(self, kind=None, value=None):
+        token = self.tokens[self.index]
+        if not self.peek(kind, value):
+            expected = value or kind
+            found = token[1] if token[0] != "end" else "end of query"
+            raise QuerySyntaxError(f"Expected {expected}, found {found!r}", token[2])
+        self.index += 1
+        return token[1]
+
+    def parse(self) -> Node:
+        node = self.parse_or()
+        self.take("end")
+        return node
+
+    def parse_or(self) -> Node:
+        operands = [self.parse_and()]
+        while self.peek("keyword", "OR"):
+            self.take()
+            operands.append(self.parse_and())
+        return _make(Or, operands)
+
+    def parse_and(self) -> Node:
+        operands = [self.parse_not()]
+        while self.peek("keyword", "AND"):
+            self.take()
+            operands.append(self.parse_not())
+        return _make(And, operands)
+
+    def parse_not(self) -> Node:
+        if self.peek("keyword", "NOT"):
+            self.take()
+            return Not(self.parse_not())
+        if self.peek("punct", "("):
+            self.take()
+            node = self.parse_or()
+            self.take("punct", ")")
+            return node
+        return self.parse_comparison()
+
+    def parse_comparison(self) -> Comparison:
+        field = self.take("word")
+        if self.peek("operator"):
+            return Comparison(field, self.take(), self.take("value"))
+        operator = self.take("keyword")
+        if operator == "IN":
+            self.take("punct", "(")
+            values = [self.take("value")]
+            while self.peek("punct", ","):
+                self.take()
+                values.append(self.take("value"))
+            self.take("punct", ")")
+            return Comparison(field, "IN", tuple(values))
+        if operator in ("CONTAINS", "MATCHES"):
+            return Comparison(field, operator, self.take("value"))
+        raise QuerySyntaxError(f"Expected an operator after {field}, found {operator!r}",
+                               self.tokens[self.index - 1][2])
+
+
+def _make(kind, operands: List[Node]) -> Node:
+    """Builds an And/Or, flattening nested groups of the same kind."""
+    flat = []
+    for operand in operands:
+        flat.extend(operand.operands if isinstance(operand, kind) else (operand,))
+    return flat[0] if len(flat) == 1 else kind(tuple(flat))
+
+
+def parse_query(text: str) -> Node:
+    """Parses a rule query into an AST.
+
+    Args:
+        text: The rule's logic.query.
+
+    Returns:
+        Node: Comparison, Not, And or Or.
+
+    Raises:
+        QuerySyntaxError: If the query is not valid.
+    """
+    return _Parser(text).parse()
+
+
+# ----------------------------------------------------------------------
+# Serializer
+# ----------------------------------------------------------------------
+
+def _literal(value: Value) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    text = str(value)
+    # Escape quotes, and backslashes that would otherwise read as escapes.
+    escaped = re.sub(r'\\(?=["\\]|$)', r"\\\\", text).replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _comparison(node: Comparison) -> str:
+    if node.operator == "IN":
+        return f"{node.field} IN ({', '.join(_literal(v) for v in node.value)})"
+    return f"{node.field} {node.operator} {_literal(node.value)}"
+
+
+def _inline(node: Node) -> str:
+    if isinstance(node, Comparison):
+        return _comparison(node)
+    if isinstance(node, Not):
+        return f"NOT {_inline_group(node.operand)}"
+    joiner = " AND " if isinstance(node, And) else " OR "
+    return joiner.join(_inline_group(operand) for operand in node.operands)
+
+
+def _inline_group(node: Node) -> str:
+    # Groups are always parenthesized (operands never nest the same kind).
+    if isinstance(node, (And, Or)):
+        return f"({_inline(node)})"
+    return _inline(node)
+
+
+def _pretty(node: Node, level: int) -> str:
+    pad = INDENT * level
+    if isinstance(node, Comparison):
+        return pad + _comparison(node)
+    if isinstance(node, Not):
+        if isinstance(node.operand, Comparison):
+            return f"{pad}NOT {_comparison(node.operand)}"
+        return f"{pad}NOT (\n{_pretty(node.operand, level + 1)}\n{pad})"
+    joiner = " AND\n" if isinstance(node, And) else " OR\n"
+    parts = []
+    for operand in node.operands:
+        if isinstance(operand, Or) and isinstance(node, And):
+            parts.append(f"{pad}(\n{_pretty(operand, level + 1)}\n{pad})")
+        elif isinstance(operand, And) and isinstance(node, Or):
+            parts.append(f"{pad}({_inline(operand)})")
+        else:
+            parts.append(_pretty(operand, level))
+    return joiner.join(parts)
+
+
+def to_query(node: Node, pretty: bool = True) -> str:
+    """Serializes an AST back to query text.
+
+    Args:
+        node: The query AST.
+        pretty: One top-level term per line with indented groups; otherwise
+            a single line.
+
+    Returns:
+        str: The query text (comments are not preserved).
+    """
+    return _pretty(node, 0) if pretty else _inline(node)
+
+
+# ----------------------------------------------------------------------
+# Exclusions
+# ----------------------------------------------------------------------
+
+def _canonical(node: Node):
+    """An order-insensitive key: A AND B equals B AND A."""
+    if isinstance(node, Comparison):
+        value = tuple(sorted(map(str, node.value))) if node.operator == "IN" else node.value
+        return ("cmp", node.field, node.operator, value)
+    if isinstance(node, Not):
+        return ("not", _canonical(node.operand))
+    return (type(node).__name__, frozenset(_canonical(operand) for operand in node.operands))
+
+
+def _conjuncts(node: Node) -> frozenset:
+    operands = node.operands if isinstance(node, And) else (node,)
+    return frozenset(_canonical(operand) for operand in operands)
+
+
+def normalize_exclusions(exclusions: List[Node]) -> List[Node]:
+    """Flattens, deduplicates and simplifies a list of exclusions (OR-ed).
+
+    An exclusion whose conditions include all of another exclusion's
+    conditions is narrower and therefore redundant.
+
+    Args:
+        exclusions: Exclusion expressions.
+
+    Returns:
+        List[Node]: The remaining exclusions, in their original order.
+    """
+    flat = []
+    for exclusion in exclusions:
+        flat.extend(exclusion.operands if isinstance(exclusion, Or) else (exclusion,))
+
+    kept = []
+    seen = set()
+    for exclusion in flat:
+        key = _canonical(exclusion)
+        if key not in seen:
+            seen.add(key)
+            kept.append(exclusion)
+
+    conjuncts = [_conjuncts(exclusion) for exclusion in kept]
+    return [
+        exclusion for i, exclusion in enumerate(kept)
+        if not any(j != i and conjuncts[j] < conjuncts[i] for j in range(len(kept)))
+    ]
+
+
+def exclusion_from_conditions(conditions: List[dict]) -> Node:
+    """Builds the AND of {"field", "operator", "value"} conditions."""
+    comparisons = []
+    for condition in conditions:
+        operator = condition["operator"].upper()
+        value = tuple(condition["value"]) if operator == "IN" else condition["value"]
+        comparisons.append(Comparison(condition["field"], operator, value))
+    return _make(And, comparisons)
+
+
+def add_exclusions(query: Node, exclusions: List[Node]) -> Tuple[Node, List[Node]]:
+    """Adds exclusions to a query's top-level NOT clause.
+
+    All top-level NOT terms are merged into one `NOT (a OR b OR ...)`, new
+    exclusions are appended, and the result is normalized (see
+    normalize_exclusions).
+
+    Args:
+        query: The rule query AST.
+        exclusions: Exclusions to add.
+
+    Returns:
+        Tuple[Node, List[Node]]: The new query and the exclusions that were
+        actually added (duplicates and already-covered ones are dropped).
+    """
+    terms = list(query.operands) if isinstance(query, And) else [query]
+    existing = [term.operand for term in terms if isinstance(term, Not)]
+    others = [term for term in terms if not isinstance(term, Not)]
+
+    before = normalize_exclusions(existing)
+    merged = normalize_exclusions(existing + list(exclusions))
+    before_keys = {_canonical(exclusion) for exclusion in before}
+    added = [exclusion for exclusion in merged if _canonical(exclusion) not in before_keys]
+
+    if not merged:
+        return _make(And, others), []
+    return _make(And, others + [Not(_make(Or, merged))]), added
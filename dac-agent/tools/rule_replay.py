@@ -0,0 +1,395 @@
+"""
+Historical replay of detection rules over exported event corpora.
+
+replay() evaluates two versions of a rule (typically before and after a
+tuning change) over events exported as JSON Lines or Parquet and reports how
+many alerts each version fires and which events the change suppressed:
+
+    python tools/rule_replay.py rules/endpoint/rmm_tools_execution.yaml events/*.jsonl
+
+Events are parsed with Arrow and loaded into pandas DataFrames (nested
+objects become dotted columns such as `process.name`), and each comparison
+is evaluated column-wise:
+numeric comparisons run directly on numeric columns, and every other
+operator is evaluated once per distinct value of the column and broadcast
+back to the rows. Matching semantics are those of rule_eval, so a rule
+alerts on the same events here as in its embedded test cases.
+
+Large corpora are split into partitions (byte ranges of JSON Lines files,
+row groups of Parquet files) that are evaluated in a process pool.
+"""
+
+import argparse
+import functools
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import repeat
+from multiprocessing import get_context
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.json as pa_json
+import pyarrow.parquet as pq
+import yaml
+
+try:
+    from .rule_eval import (_NUMERIC_OPERATORS, _as_number, _expiry, _value_test, compile_query,
+                            rule_logic, split_exclusions)
+    from .rule_query import And, Comparison, Not, Or, parse_query
+except ImportError:
+    from rule_eval import (_NUMERIC_OPERATORS, _as_number, _expiry, _value_test, compile_query,
+                           rule_logic, split_exclusions)
+    from rule_query import And, Comparison, Not, Or, parse_query
+
+Mask = Callable[[pd.DataFrame], np.ndarray]
+
+# Target size of a JSON Lines partition.
+DEFAULT_PARTITION_BYTES = 64 * 1024 * 1024
+
+# Number of suppressed (and newly alerting) events included in a report.
+DEFAULT_SAMPLES = 20
+
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+PARQUET_SUFFIXES = (".parquet", ".pq")
+
+
+# ----------------------------------------------------------------------
+# Loading
+# ----------------------------------------------------------------------
+
+def _flatten_table(table: pa.Table) -> pd.DataFrame:
+    """Converts an Arrow table to pandas with struct fields as dotted columns."""
+    while any(pa.types.is_struct(column.type) for column in table.columns):
+        table = table.flatten()
+    return table.to_pandas()
+
+
+def _parse_jsonl(data: bytes) -> pd.DataFrame:
+    try:
+        return _flatten_table(pa_json.read_json(io.BytesIO(data)))
+    except pa.ArrowInvalid:
+        # Arrow needs one type per field; fall back for inconsistent events.
+        records = [json.loads(line) for line in data.splitlines() if line.strip()]
+        return pd.json_normalize(records, sep=".")
+
+
+def _read_jsonl_range(path: str, start: int, end: int) -> pd.DataFrame:
+    """Reads the lines of a JSON Lines file that start in [start, end)."""
+    with open(path, "rb") as f:
+        if start:
+            # Skip the rest of the line that straddles the start.
+            f.seek(start - 1)
+            f.readline()
+        begin = f.tell()
+        if begin >= end:
+            return pd.DataFrame()
+        data = f.read(end - begin)
+        if not data.endswith(b"\n"):
+            data += f.readline()
+    if not data.strip():
+        return pd.DataFrame()
+    return _parse_jsonl(data)
+
+
+def _read_partition(partition: tuple) -> pd.DataFrame:
+    kind, path = partition[0], partition[1]
+    if kind == "jsonl":
+        frame = _read_jsonl_range(path, partition[2], partition[3])
+    else:
+        frame = _flatten_table(pq.ParquetFile(path).read_row_group(partition[2]))
+    return frame.reset_index(drop=True)
+
+
+def _corpus_files(paths: List[str]) -> List[str]:
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _dirs, files in os.walk(path):
+                found.extend(
+                    os.path.join(root, f) for f in sorted(files)
+                    if f.endswith(JSONL_SUFFIXES + PARQUET_SUFFIXES)
+                )
+        else:
+            found.append(path)
+    return found
+
+
+def partition_corpus(paths: List[str], partition_bytes: int = DEFAULT_PARTITION_BYTES) -> List[tuple]:
+    """Splits event files into independently readable partitions.
+
+    Args:
+        paths: JSON Lines / Parquet files or directories containing them.
+        partition_bytes: Target size of a JSON Lines partition.
+
+    Returns:
+        List[tuple]: ("jsonl", path, start, end) byte ranges and
+        ("parquet", path, row_group) row groups.
+    """
+    partitions = []
+    for path in _corpus_files(paths):
+        if path.endswith(PARQUET_SUFFIXES):
+            row_groups = pq.ParquetFile(path).num_row_groups
+            partitions.extend(("parquet", path, row_group) for row_group in range(row_groups))
+        else:
+            size = os.path.getsize(path)
+            for start in range(0, size, max(1, partition_bytes)):
+                partitions.append(("jsonl", path, start, min(start + partition_bytes, size)))
+    return partitions
+
+
+# ----------------------------------------------------------------------
+# Column-wise evaluation
+# ----------------------------------------------------------------------
+
+def _per_value(column: pd.Series, node: Comparison) -> np.ndarray:
+    """Evaluates a comparison once per distinct value of a column."""
+    try:
+        codes, uniques = pd.factorize(column)
+    except TypeError:
+        # Unhashable cells (lists of values): evaluate row by row.
+        row_match = compile_query(node)
+        return np.fromiter(
+            (row_match({node.field: value.tolist() if isinstance(value, np.ndarray) else value})
+             for value in column),
+            dtype=bool, count=len(column)
+        )
+    if pd.api.types.is_float_dtype(column):
+        # Integer fields with missing values are read as float; compare 10.0
+        # as the 10 the event had, or "10" would not match it.
+        uniques = [int(value) if float(value).is_integer() else value for value in uniques]
+    test = _value_test(node)
+    matches = np.fromiter((test(value) for value in uniques), dtype=bool, count=len(uniques))
+    # Missing values get code -1 and never match.
+    return np.append(matches, False)[codes]
+
+
+def _comparison_mask(frame: pd.DataFrame, node: Comparison) -> np.ndarray:
+    if node.field not in frame.columns:
+        return np.zeros(len(frame), dtype=bool)
+    column = frame[node.field]
+    if (node.operator in _NUMERIC_OPERATORS and pd.api.types.is_numeric_dtype(column)
+            and not pd.api.types.is_bool_dtype(column)):
+        number = _as_number(node.value)
+        if number is None:
+            return np.zeros(len(frame), dtype=bool)
+        # NaN (missing) compares false.
+        return np.asarray(_NUMERIC_OPERATORS[node.operator](column.to_numpy(dtype=float), number))
+    return _per_value(column, node)
+
+
+def compile_mask(node) -> Mask:
+    """Compiles a query AST into a function returning a boolean row mask.
+
+    Args:
+        node: Comparison, Not, And or Or (see rule_query.parse_query).
+
+    Returns:
+        Callable[[pd.DataFrame], np.ndarray]: True for matching rows.
+    """
+    if isinstance(node, Comparison):
+        return lambda frame: _comparison_mask(frame, node)
+    if isinstance(node, Not):
+        inner = compile_mask(node.operand)
+        return lambda frame: ~inner(frame)
+    operands = [compile_mask(operand) for operand in node.operands]
+    if isinstance(node, And):
+        return lambda frame: np.logical_and.reduce([operand(frame) for operand in operands])
+    if isinstance(node, Or):
+        return lambda frame: np.logical_or.reduce([operand(frame) for operand in operands])
+    raise TypeError(f"Not a query node: {node!r}")
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_rule_mask(query: str, exclusions: tuple, as_of: date) -> Mask:
+    detection = compile_mask(parse_query(query))
+    conditions, _expired = split_exclusions(exclusions, as_of)
+    active = [compile_mask(parse_query(condition)) for condition in conditions]
+
+    def alerts(frame):
+        mask = detection(frame)
+        for exclusion in active:
+            mask = mask & ~exclusion(frame)
+        return mask
+    return alerts
+
+
+def rule_mask(rule: dict, frame: pd.DataFrame, as_of: date = None) -> np.ndarray:
+    """Returns the rows of a DataFrame a rule alerts on.
+
+    Args:
+        rule: The rule's YAML content.
+        frame: Events, one per row, with dotted column names.
+        as_of: Date used for exclusion expiry (default: today).
+
+    Returns:
+        np.ndarray: Boolean mask, True where the rule alerts.
+    """
+    query, exclusions = rule_logic(rule)
+    if frame.empty:
+        return np.zeros(0, dtype=bool)
+    return _compile_rule_mask(query, exclusions, as_of or date.today())(frame)
+
+
+# ----------------------------------------------------------------------
+# Replay
+# ----------------------------------------------------------------------
+
+def _records(frame: pd.DataFrame) -> List[dict]:
+    """Rows as JSON-safe dicts without their missing fields."""
+    records = json.loads(frame.to_json(orient="records"))
+    return [{key: value for key, value in record.items() if value is not None} for record in records]
+
+
+def _replay_partition(partition: tuple, old_rule: dict, new_rule: dict, as_of: date, samples: int) -> dict:
+    frame = _read_partition(partition)
+    old = rule_mask(old_rule, frame, as_of)
+    new = rule_mask(new_rule, frame, as_of)
+    suppressed = old & ~new
+    added = new & ~old
+    return {
+        "events": len(frame),
+        "old_alerts": int(old.sum()),
+        "new_alerts": int(new.sum()),
+        "suppressed": int(suppressed.sum()),
+        "added": int(added.sum()),
+        "suppressed_samples": _records(frame[suppressed].head(samples)) if samples else [],
+        "added_samples": _records(frame[added].head(samples)) if samples else [],
+    }
+
+
+def replay(old_rule: dict, new_rule: dict, paths: List[str], workers: int = None,
+           partition_bytes: int = DEFAULT_PARTITION_BYTES, as_of: date = None,
+           samples: int = DEFAULT_SAMPLES) -> dict:
+    """Replays two versions of a rule over historical events.
+
+    Args:
+        old_rule: The rule before the change (YAML content).
+        new_rule: The rule after the change.
+        paths: JSON Lines / Parquet event files or directories.
+        workers: Worker processes (default: one per CPU, at most one per
+            partition; 1 evaluates in this process).
+        partition_bytes: Target size of a JSON Lines partition.
+        as_of: Date used for exclusion expiry (default: today).
+        samples: Number of suppressed / newly alerting events to include.
+
+    Returns:
+        dict: events, old_alerts, new_alerts, suppressed (alerts of the old
+        version the new one no longer fires), added (new alerts),
+        reduction (fraction of old alerts suppressed), suppressed_samples,
+        added_samples, partitions, workers, seconds and events_per_second.
+    """
+    start = time.perf_counter()
+    # Validate both versions before starting any workers.
+    for rule in (old_rule, new_rule):
+        parse_query(rule_logic(rule)[0])
+    as_of = as_of or date.today()
+    partitions = partition_corpus(paths, partition_bytes)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(partitions)))
+
+    arguments = (partitions, repeat(old_rule), repeat(new_rule), repeat(as_of), repeat(samples))
+    if workers == 1:
+        results = list(map(_replay_partition, *arguments))
+    else:
+        # Spawned workers: forking is unsafe when called from a threaded
+        # (asyncio) process.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+            results = list(pool.map(_replay_partition, *arguments))
+
+    report = {key: sum(result[key] for result in results)
+              for key in ("events", "old_alerts", "new_alerts", "suppressed", "added")}
+    for key in ("suppressed_samples", "added_samples"):
+        report[key] = [record for result in results for record in result[key]][:samples]
+    seconds = time.perf_counter() - start
+    report.update(
+        reduction=report["suppressed"] / report["old_alerts"] if report["old_alerts"] else None,
+        partitions=len(partitions),
+        workers=workers,
+        seconds=seconds,
+        events_per_second=report["events"] / seconds if seconds else None,
+    )
+    return report
+
+
+# ----------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------
+
+def format_impact(report: dict) -> str:
+    """One-line summary of a replay report."""
+    summary = (f"Replayed {report['events']:,} events in {report['seconds']:.2f}s: "
+               f"{report['old_alerts']:,} alerts before, {report['new_alerts']:,} after, "
+               f"{report['suppressed']:,} suppressed")
+    if report["reduction"] is not None:
+        summary += f" ({report['reduction']:.1%} fewer)"
+    if report["added"]:
+        summary += f", {report['added']:,} new"
+    return summary
+
+
+def _load_rule(path: str) -> dict:
+    with open(path, "r") as f:
+        return yaml.safe_load(f)
+
+
+def _load_rule_at(path: str, ref: str) -> dict:
+    """Loads a rule file as it is in a git revision."""
+    directory, file_name = os.path.split(os.path.abspath(path))
+    content = subprocess.run(
+        ["git", "show", f"{ref}:./{file_name}"], cwd=directory,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return yaml.safe_load(content)
+
+
+def main(argv: List[str] = None) -> int:
+    """Replays a rule file against its baseline version over event files."""
+    parser = argparse.ArgumentParser(description="Replay a detection rule change over historical events")
+    parser.add_argument("rule", help="Rule file (the new version)")
+    parser.add_argument("events", nargs="+", help="JSON Lines / Parquet event files or directories")
+    parser.add_argument("--baseline", help="Rule file of the old version (default: the rule at --baseline-ref)")
+    parser.add_argument("--baseline-ref", default="HEAD", help="Git revision of the old version (default: HEAD)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--partition-mb", type=float, default=DEFAULT_PARTITION_BYTES / 1024 / 1024,
+                        help="Target JSON Lines partition size in MB")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="Suppressed events to show")
+    parser.add_argument("--as-of", help="Evaluate exclusion expiry as of this date (YYYY-MM-DD)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        new_rule = _load_rule(args.rule)
+        old_rule = _load_rule(args.baseline) if args.baseline else _load_rule_at(args.rule, args.baseline_ref)
+    except subprocess.CalledProcessError as e:
+        print(f"Could not load baseline rule: {e.stderr.strip()}", file=sys.stderr)
+        return 2
+
+    report = replay(
+        old_rule, new_rule, args.events, workers=args.workers,
+        partition_bytes=int(args.partition_mb * 1024 * 1024),
+        as_of=_expiry(args.as_of) if args.as_of else None, samples=args.samples
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(format_impact(report))
+    for record in report["suppressed_samples"]:
+        print(f"  - suppressed: {json.dumps(record)}")
+    for record in report["added_samples"]:
+        print(f"  + new alert: {json.dumps(record)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""
+Incremental polling of closed SOAR cases.
+
+Instead of re-reading a fixed lookback window on every run, the DAC workflow
+keeps a persisted watermark: the close time and ID of the newest case it has
+handled. Each poll pages through `list_cases` (most recently updated cases
+first) and stops at the first page with nothing newer than the watermark,
+so the cost of a poll follows the amount of new activity rather than the
+size of the window.
+
+A poll reads at most `max_pages` pages. When there is more to read (the
+first poll of a large lookback window, or a burst of activity), the cursor
+keeps the page token and the next polls continue from it; the watermark only
+moves once the whole range has been read, so no case is skipped.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CURSOR_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".cache", "soar_cursor.json"))
+
+# How far back the first poll (without a watermark) looks.
+DEFAULT_INITIAL_LOOKBACK = timedelta(days=7)
+
+# Upper bound on pages read by one poll (a longer read continues on the next poll).
+DEFAULT_MAX_PAGES = 50
+
+_CLOSED_TIME_FIELDS = ("closeTime", "closedTime", "closed_time", "closeTimeUnixTimeInMs")
+_UPDATED_TIME_FIELDS = ("updateTime", "modificationTimeUnixTimeInMs", "lastModifiedTime", "updated_time")
+
+ListCases = Callable[[Optional[str]], Awaitable[Dict]]
+
+
+def _parse_time(value) -> Optional[datetime]:
+    """Parses ISO 8601 strings and epoch seconds / milliseconds as UTC."""
+    if value in (None, ""):
+        return None
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+        number = float(value)
+        # Values this large are milliseconds.
+        return datetime.fromtimestamp(number / 1000 if number > 1e11 else number, tz=timezone.utc)
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _first_time(case: Dict, fields: Tuple[str, ...]) -> Optional[datetime]:
+    for field in fields:
+        parsed = _parse_time(case.get(field))
+        if parsed:
+            return parsed
+    return None
+
+
+def case_id(case: Dict) -> str:
+    """Returns a case's ID (the last segment of its resource name if needed)."""
+    value = case.get("id") or case.get("caseId") or case.get("name") or ""
+    return str(value).rsplit("/", 1)[-1]
+
+
+def case_closed_time(case: Dict) -> Optional[datetime]:
+    """Returns when a case was closed (its last update if no close time is given)."""
+    return _first_time(case, _CLOSED_TIME_FIELDS) or _first_time(case, _UPDATED_TIME_FIELDS)
+
+
+def is_closed(case: Dict) -> bool:
+    return str(case.get("status", "")).lower() in ("closed", "close")
+
+
+def _id_key(value: str):
+    return (0, int(value), "") if value.isdigit() else (1, 0, value)
+
+
+def case_key(case: Dict) -> tuple:
+    """Sort key of a closed case: close time, then case ID."""
+    return (case_closed_time(case), _id_key(case_id(case)))
+
+
+def _key_of(closed_time: Optional[datetime], case_id_value: Optional[str]) -> Optional[tuple]:
+    return None if closed_time is None else (closed_time, _id_key(case_id_value or ""))
+
+
+def _dump_key(key: Optional[tuple]) -> Optional[Dict]:
+    if key is None:
+        return None
+    kind, number, text = key[1]
+    return {"closed_time": key[0].isoformat(), "case_id": str(number) if kind == 0 else text}
+
+
+def _load_key(value: Optional[Dict]) -> Optional[tuple]:
+    if not value:
+        return None
+    return _key_of(_parse_time(value.get("closed_time")), value.get("case_id"))
+
+
+class CaseCursor:
+    """Persisted watermark of the newest closed case handled.
+
+    Attributes:
+        path: JSON file the watermark is stored in (None keeps it in memory).
+        closed_time: Close time of the newest handled case, or None.
+        case_id: ID of that case.
+        exclusive: True if the watermark case itself failed and is polled
+            again (the watermark then sits just before it).
+        sweep: State of a poll that was cut off by the page limit and is
+            continued by the next polls: page token, lookback start, and the
+            newest and oldest failed case keys seen so far (None when no
+            sweep is in progress).
+    """
+
+    def __init__(self, path: str = DEFAULT_CURSOR_PATH):
+        self.path = path
+        self.closed_time: Optional[datetime] = None
+        self.case_id: Optional[str] = None
+        self.exclusive = False
+        self.sweep: Optional[Dict] = None
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r") as f:
+                cursor = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable SOAR cursor {self.path}: {e}")
+            return
+        self.closed_time = _parse_time(cursor.get("closed_time"))
+        self.case_id = cursor.get("case_id")
+        self.exclusive = bool(cursor.get("exclusive"))
+        sweep = cursor.get("sweep")
+        if sweep:
+            self.sweep = {
+                "token": sweep.get("token"),
+                "since": _parse_time(sweep.get("since")),
+                "high": _load_key(sweep.get("high")),
+                "hold": _load_key(sweep.get("hold")),
+            }
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        cursor = {
+            "closed_time": self.closed_time.isoformat() if self.closed_time else None,
+            "case_id": self.case_id,
+            "exclusive": self.exclusive,
+        }
+        if self.sweep:
+            cursor["sweep"] = {
+                "token": self.sweep["token"],
+                "since": self.sweep["since"].isoformat() if self.sweep["since"] else None,
+                "high": _dump_key(self.sweep["high"]),
+                "hold": _dump_key(self.sweep["hold"]),
+            }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(cursor, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save SOAR cursor {self.path}: {e}")
+
+    @property
+    def key(self) -> Optional[tuple]:
+        return _key_of(self.closed_time, self.case_id)
+
+    def is_new(self, case: Dict) -> bool:
+        """True if a closed case is newer than the watermark (or is the failed watermark case)."""
+        if self.key is None:
+            return True
+        key = case_key(case)
+        return key > self.key or (self.exclusive and key == self.key)
+
+    def advance(self, cases: List[Dict], failed_ids: set = frozenset(),
+                next_page_token: Optional[str] = None, since: Optional[datetime] = None) -> bool:
+        """Moves the watermark over handled cases and saves it.
+
+        The watermark stops just before the oldest failed case, so that case
+        and everything after it are polled again on the next run. When the
+        poll was cut off by the page limit (next_page_token is set), the
+        watermark does not move: the page token is kept and the next polls
+        continue from it, and the watermark moves once the last of them
+        completes.
+
+        Args:
+            cases: Cases returned by fetch_closed_cases (oldest first).
+            failed_ids: IDs of cases whose processing failed.
+            next_page_token: The poll's next_page_token statistic (None if
+                it read everything newer than the watermark).
+            since: The poll's lookback start (its `since` statistic).
+
+        Returns:
+            bool: True if the watermark moved.
+        """
+        keys = [case_key(case) for case in cases]
+        failed = [key for key, case in zip(keys, cases) if case_id(case) in failed_ids]
+        sweep = self.sweep or {"token": None, "since": since, "high": None, "hold": None}
+        sweep["high"] = max([key for key in (sweep["high"], *keys) if key is not None], default=None)
+        sweep["hold"] = min([key for key in (sweep["hold"], *failed) if key is not None], default=None)
+
+        if next_page_token:
+            sweep["token"] = next_page_token
+            self.sweep = sweep
+            self._save()
+            return False
+
+        self.sweep = None
+        target, exclusive = (sweep["hold"], True) if sweep["hold"] else (sweep["high"], False)
+        moved = target is not None and (self.key is None or target > self.key or (
+            target == self.key and self.exclusive and not exclusive))
+        if moved:
+            self.closed_time, self.case_id = target[0], _dump_key(target)["case_id"]
+            self.exclusive = exclusive
+        self._save()
+        return moved
+
+    def reset(self) -> None:
+        """Forgets the watermark (the next poll uses the initial lookback)."""
+        self.closed_time = self.case_id = None
+        self.exclusive = False
+        self.sweep = None
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _cases_and_token(response: Dict) -> Tuple[List[Dict], Optional[str]]:
+    cases = response.get("cases") or response.get("results") or response.get("items") or []
+    token = response.get("nextPageToken") or response.get("next_page_token")
+    return cases, token
+
+
+async def fetch_closed_cases(list_cases: ListCases, cursor: CaseCursor,
+                             initial_lookback: timedelta = DEFAULT_INITIAL_LOOKBACK,
+                             max_pages: int = DEFAULT_MAX_PAGES) -> Tuple[List[Dict], Dict]:
+    """Pages through list_cases and returns the closed cases newer than the cursor.
+
+    Args:
+        list_cases: Coroutine taking a page token (None for the first page)
+            and returning the raw list_cases response.
+        cursor: Watermark of the newest case already handled.
+        initial_lookback: Window used when the cursor has no watermark.
+        max_pages: Maximum number of pages to read.
+
+    Returns:
+        Tuple[List[Dict], Dict]: New closed cases, oldest first, and poll
+        statistics (pages, cases_seen, new_cases, since, next_page_token).
+        next_page_token is set when the poll stopped at max_pages with more
+        to read; pass it to CaseCursor.advance so the next poll continues
+        from there.
+    """
+    sweep = cursor.sweep or {}
+    if sweep:
+        since = sweep.get("since")
+    else:
+        since = None if cursor.key else datetime.now(timezone.utc) - initial_lookback
+    floor = cursor.closed_time or since
+    new_cases = {}
+    stats = {"pages": 0, "cases_seen": 0, "since": since, "next_page_token": None}
+    token = sweep.get("token")
+    if token:
+        logger.info("Continuing the previous SOAR poll from its last page")
+
+    while stats["pages"] < max_pages:
+        try:
+            cases, token = _cases_and_token(await list_cases(token))
+        except Exception as e:
+            if stats["pages"] or not sweep.get("token"):
+                raise
+            # An expired page token: read the range again from the top.
+            logger.warning(f"Could not continue the previous SOAR poll ({e}), starting from the first page")
+            sweep["token"] = token = None
+            continue
+        stats["pages"] += 1
+        stats["cases_seen"] += len(cases)
+
+        page_has_newer = False
+        for case in cases:
+            updated = _first_time(case, _UPDATED_TIME_FIELDS) or case_closed_time(case)
+            if updated is None or updated >= floor:
+                page_has_newer = True
+            closed = case_closed_time(case)
+            if not is_closed(case) or closed is None:
+                continue
+            if since is not None and closed < since:
+                continue
+            if cursor.is_new(case):
+                new_cases[case_id(case)] = case
+
+        # Cases are listed most recently updated first: once a whole page is
+        # older than the watermark, so is everything after it.
+        if not token or not page_has_newer:
+            break
+    else:
+        stats["next_page_token"] = token
+        logger.warning(f"Stopped polling SOAR cases after {max_pages} pages, "
+                       "the next poll continues from there")
+
+    ordered = sorted(new_cases.values(), key=case_key)
+    stats["new_cases"] = len(ordered)
+    return ordered, stats
+
+
+def tool_payload(response) -> Dict:
+    """Decodes an MCP tool response (CallToolResult, JSON text or dict)."""
+    if isinstance(response, dict):
+        return response
+    if getattr(response, "isError", False):
+        raise RuntimeError(f"SOAR tool call failed: {response.content}")
+    content = getattr(response, "content", None)
+    if content is not None:
+        response = "".join(getattr(part, "text", "") for part in content)
+    return json.loads(response) if response else {}
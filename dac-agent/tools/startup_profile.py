@@ -0,0 +1,149 @@
+"""Startup profiling: phase timings, an import-time tree and peak RSS.
+
+Only uses the standard library, so run_dac_agent.py can start it before the
+agent (and google.adk) are imported.
+
+The SOC manager has the same module (multi-agent/manager/utils/startup_profile.py).
+The two projects are run and deployed separately, so each keeps its own copy;
+tests/test_shared_utils.py checks that the code has not drifted apart.
+
+Usage:
+    profiler = StartupProfiler("dac-agent")
+    profiler.start()               # installs the import hook
+    with profiler.phase("import_agent"):
+        from agent import get_root_agent
+    report = profiler.report()     # JSON-serializable dict
+"""
+import builtins
+import contextlib
+import json
+import platform
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+def peak_rss_kb(children: bool = False):
+    """Returns the peak resident set size of this process (or its children) in KiB."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+    # ru_maxrss is in bytes on macOS and KiB elsewhere.
+    return usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+
+
+class StartupProfiler:
+    """Records named phases and the time spent importing each module."""
+
+    def __init__(self, entry_point: str, enabled: bool = True, min_import_ms: float = 1.0):
+        """Initializes the profiler.
+
+        Args:
+            entry_point: Name recorded in the report.
+            enabled: When False every method is a no-op, so call sites need no
+                conditionals.
+            min_import_ms: Imports faster than this (and without slower
+                children) are left out of the tree.
+        """
+        self.entry_point = entry_point
+        self.enabled = enabled
+        self.min_import_ms = min_import_ms
+        self._t0 = None
+        self._phases = []
+        self._depth = 0
+        self._import_root = {"module": "<root>", "ms": 0.0, "children": []}
+        self._import_stack = [self._import_root]
+        self._original_import = None
+        self.extra = {}
+
+    def start(self):
+        """Starts the clock and begins timing imports."""
+        if not self.enabled or self._t0 is not None:
+            return
+        self._t0 = time.perf_counter()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def stop_import_tracking(self):
+        """Restores the original `__import__`."""
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        # Already-imported absolute modules are the common case; keep it cheap.
+        if level == 0 and name in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+        label = name
+        if level:
+            package = (globals or {}).get("__package__") or ""
+            base = package.rsplit(".", level - 1)[0] if level > 1 else package
+            label = f"{base}.{name}" if name else base
+        node = {"module": label, "ms": 0.0, "children": []}
+        self._import_stack.append(node)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            node["ms"] = (time.perf_counter() - start) * 1000
+            self._import_stack.pop()
+            if node["ms"] >= self.min_import_ms or node["children"]:
+                self._import_stack[-1]["children"].append(node)
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Times a block of startup work. Phases may nest."""
+        if not self.enabled:
+            yield
+            return
+        if self._t0 is None:
+            self.start()
+        record = {"name": name, "depth": self._depth, "start_s": time.perf_counter() - self._t0}
+        self._phases.append(record)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            record["seconds"] = time.perf_counter() - self._t0 - record["start_s"]
+
+    def record_phase(self, name: str, seconds: float, depth: int = 1):
+        """Adds a phase measured elsewhere (e.g. per sub-agent init timings)."""
+        if self.enabled:
+            self._phases.append({"name": name, "depth": depth, "start_s": None, "seconds": seconds})
+
+    def report(self) -> dict:
+        """Returns the profile as a JSON-serializable dict."""
+        self.stop_import_tracking()
+        top_level = self._import_root["children"]
+        return {
+            "entry_point": self.entry_point,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "total_seconds": time.perf_counter() - self._t0 if self._t0 is not None else 0.0,
+            "phases": self._phases,
+            "imports": {
+                "total_ms": sum(node["ms"] for node in top_level),
+                "min_ms": self.min_import_ms,
+                "tree": top_level,
+            },
+            "peak_rss_kb": peak_rss_kb(),
+            "peak_rss_children_kb": peak_rss_kb(children=True),
+            **self.extra,
+        }
+
+    def write(self, output_path=None) -> dict:
+        """Writes the report as JSON to `output_path` (stdout if None) and returns it."""
+        report = self.report()
+        text = json.dumps(report, indent=2, default=str)
+        if output_path:
+            with open(output_path, "w") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return report
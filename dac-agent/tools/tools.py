@@ -1,4 +1,5 @@
-from datetime import datetime
+from datetime import date, datetime
+import asyncio
 import contextlib
 import os
 import re
@@ -8,6 +9,15 @@ from pathlib import Path
 from google.adk.tools.mcp_tool import MCPToolset, StdioConnectionParams
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioServerParameters
 
+try:
+    from .file_cache import cached_assembly, clear_file_cache, read_cached_file  # noqa: F401
+    from .rule_catalog import get_rule_catalog
+    from .rule_eval import _expiry, compile_rule, run_test_cases, rule_logic, split_exclusions
+except ImportError:
+    from tools.file_cache import cached_assembly, clear_file_cache, read_cached_file  # noqa: F401
+    from tools.rule_catalog import get_rule_catalog
+    from tools.rule_eval import _expiry, compile_rule, run_test_cases, rule_logic, split_exclusions
+
 TIMEOUT = 60
 
 
@@ -203,11 +213,19 @@ def create_github_pr(title: str, body: str, base_branch: str = "main") -> dict:
         }
 
 
-def validate_yaml_file(file_path: str) -> dict:
+def validate_yaml_file(file_path: str, run_tests: bool = False, as_of: str = None) -> dict:
     """Validates YAML syntax for detection rule files.
     
+    For rules with a logic.query, the query and exclusions are also parsed.
+    With run_tests, the rule's validation.test_cases are run as well, with
+    every exclusion applied, so the result does not depend on the day the
+    rule is validated. Exclusions whose `expires` date has passed (as of
+    as_of) are reported as warnings, not as validation errors.
+    
     Args:
         file_path: Path to the YAML file to validate
+        run_tests: Run the rule's embedded test cases (default: False)
+        as_of: Date (YYYY-MM-DD) exclusion expiry is reported for (default: today)
     
     Returns:
         dict: Validation result
@@ -216,13 +234,37 @@ def validate_yaml_file(file_path: str) -> dict:
         import yaml
         
         with open(file_path, 'r') as f:
-            yaml.safe_load(f)
+            rule = yaml.safe_load(f)
         
-        return {
+        result = {
             "valid": True,
             "file_path": file_path,
             "message": "YAML syntax is valid"
         }
+        if not (isinstance(rule, dict) and (rule.get("logic") or {}).get("query")):
+            return result
+        
+        compile_rule(rule)
+        _query, exclusions = rule_logic(rule)
+        _active, expired = split_exclusions(exclusions, _expiry(as_of) or datetime.now().date())
+        if expired:
+            result["expired_exclusions"] = expired
+            result["warnings"] = [
+                f"Exclusion expired on {exclusion['expires']}: {exclusion['condition']}" for exclusion in expired
+            ]
+        
+        if run_tests:
+            test_results = run_test_cases(rule, as_of=date.min)
+            result["test_results"] = test_results
+            if not test_results["passed"]:
+                result.update({
+                    "valid": False,
+                    "error": f"{test_results['failed']} of {test_results['total']} test cases failed",
+                    "message": f"Test cases failed in {file_path}"
+                })
+            else:
+                result["message"] = f"YAML syntax is valid and {test_results['total']} test cases passed"
+        return result
     except yaml.YAMLError as e:
         return {
             "valid": False,
@@ -249,35 +291,18 @@ def validate_yaml_file(file_path: str) -> dict:
 def find_rule_files(rule_pattern: str, search_dir: str = None) -> dict:
     """Searches for detection rule files matching a pattern.
     
+    Looks the pattern up in the rule catalog: exact rule ID or name first,
+    then tag, MITRE technique or data source, then fuzzy rule-name matches.
+    
     Args:
-        rule_pattern: Pattern to search for (rule name, ID, etc.)
+        rule_pattern: Pattern to search for (rule name, ID, tag, technique, etc.)
         search_dir: Directory to search in (default: rules/ directory)
     
     Returns:
         dict: Search results with matching files
     """
-    if search_dir is None:
-        # Default to rules directory in dac-agent directory
-        search_dir = os.path.join(os.path.dirname(__file__), "..", "rules")
-    
-    matching_files = []
-    
     try:
-        for root, _dirs, files in os.walk(search_dir):
-            for file in files:
-                if file.endswith(('.yaml', '.yml')):
-                    file_path = os.path.join(root, file)
-                    try:
-                        with open(file_path, 'r') as f:
-                            content = f.read()
-                            if rule_pattern.lower() in content.lower():
-                                matching_files.append({
-                                    "file_path": file_path,
-                                    "file_name": file,
-                                    "directory": root
-                                })
-                    except Exception:
-                        continue
+        matching_files = get_rule_catalog(search_dir).search(rule_pattern)
         
         return {
             "success": True,
@@ -295,10 +320,200 @@ def find_rule_files(rule_pattern: str, search_dir: str = None) -> dict:
         }
 
 
+async def _run_command_async(args: list, cwd: str = None) -> str:
+    """Runs a command in a subprocess without blocking the event loop.
+
+    Args:
+        args: Command and arguments.
+        cwd: Working directory (default: the current directory).
+
+    Returns:
+        str: The command's stdout.
+
+    Raises:
+        subprocess.CalledProcessError: If the command exits non-zero; stdout
+            and stderr are attached as text.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args, cwd=cwd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    stdout = stdout.decode(errors="replace")
+    stderr = stderr.decode(errors="replace")
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, args, output=stdout, stderr=stderr)
+    return stdout
+
+
+def _command_error(e: Exception) -> dict:
+    """Formats a failed command like the synchronous git/gh helpers do."""
+    return {
+        "success": False,
+        "error": str(e),
+        "stderr": getattr(e, "stderr", None) or "",
+        "stdout": getattr(e, "stdout", None) or "",
+    }
+
+
+async def git_create_branch_async(branch_name: str, base_branch: str = "main") -> dict:
+    """Async version of git_create_branch; runs git without blocking the event loop.
+
+    Args:
+        branch_name: Name of the new branch to create
+        base_branch: Base branch to create from (default: main)
+
+    Returns:
+        dict: Result of the Git operation
+    """
+    try:
+        await _run_command_async(["git", "fetch", "origin"])
+        await _run_command_async(["git", "checkout", base_branch])
+        await _run_command_async(["git", "pull", "origin", base_branch])
+        output = await _run_command_async(["git", "checkout", "-b", branch_name])
+
+        return {
+            "success": True,
+            "branch_name": branch_name,
+            "message": f"Created branch {branch_name} from {base_branch}",
+            "output": output
+        }
+    except (subprocess.CalledProcessError, OSError) as e:
+        return _command_error(e)
+
+
+async def git_commit_changes_async(file_paths: list, commit_message: str, cwd: str = None) -> dict:
+    """Async version of git_commit_changes.
+
+    Args:
+        file_paths: List of file paths to add and commit
+        commit_message: Commit message
+        cwd: Working tree to commit in (default: the current directory)
+
+    Returns:
+        dict: Result of the Git operation
+    """
+    try:
+        await _run_command_async(["git", "add", "--", *file_paths], cwd=cwd)
+        output = await _run_command_async(["git", "commit", "-m", commit_message], cwd=cwd)
+
+        return {
+            "success": True,
+            "message": f"Committed {len(file_paths)} files",
+            "files": file_paths,
+            "output": output
+        }
+    except (subprocess.CalledProcessError, OSError) as e:
+        return _command_error(e)
+
+
+async def git_push_branch_async(branch_name: str, cwd: str = None) -> dict:
+    """Async version of git_push_branch.
+
+    Args:
+        branch_name: Name of the branch to push
+        cwd: Working tree to push from (default: the current directory)
+
+    Returns:
+        dict: Result of the Git operation
+    """
+    try:
+        output = await _run_command_async(["git", "push", "-u", "origin", branch_name], cwd=cwd)
+
+        return {
+            "success": True,
+            "branch_name": branch_name,
+            "message": f"Pushed branch {branch_name} to origin",
+            "output": output
+        }
+    except (subprocess.CalledProcessError, OSError) as e:
+        return _command_error(e)
+
+
+async def create_github_pr_async(title: str, body: str, base_branch: str = "main", cwd: str = None) -> dict:
+    """Async version of create_github_pr.
+
+    Args:
+        title: PR title
+        body: PR description/body
+        base_branch: Target branch for the PR (default: main)
+        cwd: Working tree whose branch the PR is opened for (default: the
+            current directory)
+
+    Returns:
+        dict: Result of the PR creation
+    """
+    try:
+        output = await _run_command_async([
+            "gh", "pr", "create",
+            "--title", title,
+            "--body", body,
+            "--base", base_branch
+        ], cwd=cwd)
+        pr_url = output.strip()
+
+        return {
+            "success": True,
+            "pr_url": pr_url,
+            "title": title,
+            "message": f"Created PR: {pr_url}"
+        }
+    except (subprocess.CalledProcessError, OSError) as e:
+        return _command_error(e)
+
+
+async def write_report_async(report_name: str, report_contents: str):
+    """Async version of write_report; the file is written in a worker thread."""
+    return await asyncio.to_thread(write_report, report_name, report_contents)
+
+
+async def find_rule_files_async(rule_pattern: str, search_dir: str = None) -> dict:
+    """Async version of find_rule_files; the directory scan runs in a worker thread."""
+    return await asyncio.to_thread(find_rule_files, rule_pattern, search_dir)
+
+
+# Async counterparts of the synchronous tools, used by the workflow executor.
+ASYNC_TOOL_VARIANTS = {
+    git_create_branch: git_create_branch_async,
+    git_commit_changes: git_commit_changes_async,
+    git_push_branch: git_push_branch_async,
+    create_github_pr: create_github_pr_async,
+    write_report: write_report_async,
+    find_rule_files: find_rule_files_async,
+}
+
+
+def as_async_tool(tool):
+    """Returns an awaitable version of a DAC tool.
+
+    Coroutine functions are returned unchanged, tools with a native async
+    variant map to it, and anything else (e.g. a functools.partial of a sync
+    tool) runs in a worker thread so it does not block the event loop.
+
+    Args:
+        tool: A tool callable from get_dac_agent_tools() or a replacement.
+
+    Returns:
+        Callable: A coroutine function taking the same arguments.
+    """
+    if asyncio.iscoroutinefunction(tool):
+        return tool
+    if tool in ASYNC_TOOL_VARIANTS:
+        return ASYNC_TOOL_VARIANTS[tool]
+
+    async def run_in_thread(*args, **kwargs):
+        return await asyncio.to_thread(tool, *args, **kwargs)
+
+    return run_in_thread
+
+
 def load_persona_and_runbooks(persona_file_path: str, runbook_files: list, default_persona_description: str = "Default persona description.") -> str:
     """
     Loads persona description from a file and appends contents from runbook files.
 
+    Files are read through the SOC manager's process-wide cache
+    (multi-agent/manager/utils/file_cache.py), and the description is reused
+    while none of the files change on disk.
+
     Args:
         persona_file_path: Path to the persona file.
         runbook_files: A list of paths to runbook files.
@@ -307,22 +522,23 @@ def load_persona_and_runbooks(persona_file_path: str, runbook_files: list, defau
     Returns:
         A string containing the persona description and appended runbook contents.
     """
-    persona_description = ""
-    try:
-        with open(persona_file_path, 'r') as f:
-            persona_description = f.read()
-    except FileNotFoundError:
-        persona_description = default_persona_description
-        print(f"Warning: Persona file not found at {persona_file_path}. Using default description.")
-
-    for runbook_file in runbook_files:
+    def assemble():
+        persona_description = ""
         try:
-            with open(runbook_file, 'r') as f:
-                runbook_content = f.read()
-            persona_description += "\n\n" + runbook_content
+            persona_description = read_cached_file(persona_file_path)
         except FileNotFoundError:
-            print(f"Warning: Runbook file not found at {runbook_file}. Skipping.")
-    return persona_description
+            persona_description = default_persona_description
+            print(f"Warning: Persona file not found at {persona_file_path}. Using default description.")
+
+        for runbook_file in runbook_files:
+            try:
+                runbook_content = read_cached_file(runbook_file)
+                persona_description += "\n\n" + runbook_content
+            except FileNotFoundError:
+                print(f"Warning: Runbook file not found at {runbook_file}. Skipping.")
+        return persona_description
+
+    return cached_assembly([persona_file_path, *runbook_files], default_persona_description, assemble)
 
 
 async def get_dac_agent_tools():
@@ -0,0 +1,151 @@
+"""
+Isolated git worktrees for rule tuning branches.
+
+Instead of checking out and pulling in the operator's working tree for every
+case, the DAC workflow keeps one bare mirror of the rules repository's origin
+(inside the repository's git directory), fetches it at most once per workflow
+run and prepares every tuning branch in its own lightweight `git worktree`
+checkout. Branches can then be prepared in parallel without touching the
+operator's checkout or the network.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import shutil
+import tempfile
+
+try:
+    from .tools import _run_command_async
+except ImportError:
+    from tools.tools import _run_command_async
+
+logger = logging.getLogger(__name__)
+
+
+class WorktreeManager:
+    """Creates per-branch worktrees from a bare mirror of origin.
+
+    Attributes:
+        repo_dir: Top level of the operator's checkout (discovered from the
+            current directory when not given).
+        remote: Remote the mirror is cloned from and branches are pushed to.
+        mirror_dir: Location of the bare mirror (default:
+            <git dir>/dac-agent/mirror.git).
+        fetches: Number of fetches performed, for diagnostics.
+    """
+
+    def __init__(self, repo_dir: str = None, remote: str = "origin", mirror_dir: str = None):
+        self.repo_dir = repo_dir
+        self.remote = remote
+        self.mirror_dir = mirror_dir
+        self.fetches = 0
+        self._fetched = False
+        self._worktree_root = None
+        self._worktrees = {}
+        self._lock = asyncio.Lock()
+
+    def start_run(self) -> None:
+        """Allows the next worktree to fetch origin again (once per workflow run)."""
+        self._fetched = False
+
+    async def _git(self, *args, cwd: str = None) -> str:
+        return await _run_command_async(["git", *args], cwd=cwd)
+
+    async def _prepare(self) -> None:
+        """Locates the repository and creates or fetches the mirror (once per run)."""
+        if self.repo_dir is None:
+            self.repo_dir = (await self._git("rev-parse", "--show-toplevel")).strip()
+        if self.mirror_dir is None:
+            git_dir = (await self._git("rev-parse", "--git-common-dir", cwd=self.repo_dir)).strip()
+            self.mirror_dir = os.path.join(
+                os.path.abspath(os.path.join(self.repo_dir, git_dir)), "dac-agent", "mirror.git"
+            )
+
+        if not os.path.isdir(self.mirror_dir):
+            url = (await self._git("remote", "get-url", self.remote, cwd=self.repo_dir)).strip()
+            logger.info(f"Creating bare mirror of {url} in {self.mirror_dir}")
+            os.makedirs(os.path.dirname(self.mirror_dir), exist_ok=True)
+            await self._git("clone", "--bare", url, self.mirror_dir)
+            # A plain bare clone maps branches onto themselves; keep origin's
+            # branches as remote-tracking refs so local tuning branches never
+            # collide with them.
+            await self._git(
+                "config", f"remote.{self.remote}.fetch",
+                f"+refs/heads/*:refs/remotes/{self.remote}/*", cwd=self.mirror_dir
+            )
+            # Commit as the operator does in their checkout.
+            for key in ("user.name", "user.email"):
+                try:
+                    value = (await self._git("config", key, cwd=self.repo_dir)).strip()
+                except Exception:
+                    continue
+                await self._git("config", key, value, cwd=self.mirror_dir)
+            self._fetched = False
+
+        if not self._fetched:
+            await self._git("fetch", "--prune", self.remote, cwd=self.mirror_dir)
+            self.fetches += 1
+            self._fetched = True
+
+    async def add(self, branch_name: str, base_branch: str = "main") -> str:
+        """Creates a worktree with a new branch based on origin's base branch.
+
+        Args:
+            branch_name: Name of the branch to create (reset if it exists)
+            base_branch: Branch of origin to start from (default: main)
+
+        Returns:
+            str: Path of the new worktree
+        """
+        async with self._lock:
+            await self._prepare()
+            if self._worktree_root is None:
+                self._worktree_root = tempfile.mkdtemp(prefix="dac-worktrees-")
+            path = os.path.join(self._worktree_root, re.sub(r"[^A-Za-z0-9._-]", "_", branch_name))
+            await self._git(
+                "worktree", "add", "-B", branch_name, path, f"{self.remote}/{base_branch}",
+                cwd=self.mirror_dir
+            )
+            self._worktrees[path] = branch_name
+        logger.info(f"Prepared worktree for {branch_name} in {path}")
+        return path
+
+    def path_in(self, worktree: str, file_path: str) -> str:
+        """Maps a file of the operator's checkout to the same file in a worktree.
+
+        Args:
+            worktree: Path returned by add()
+            file_path: Path of a file inside repo_dir
+
+        Returns:
+            str: Path of that file inside the worktree
+        """
+        relative = os.path.relpath(os.path.realpath(file_path), os.path.realpath(self.repo_dir))
+        return os.path.join(worktree, relative)
+
+    async def remove(self, worktree: str) -> None:
+        """Removes a worktree and its local branch (pushed branches stay on origin)."""
+        async with self._lock:
+            branch_name = self._worktrees.pop(worktree, None)
+            try:
+                await self._git("worktree", "remove", "--force", worktree, cwd=self.mirror_dir)
+                if branch_name:
+                    await self._git("branch", "-D", branch_name, cwd=self.mirror_dir)
+            except Exception as e:
+                logger.warning(f"Failed to remove worktree {worktree}: {e}")
+                shutil.rmtree(worktree, ignore_errors=True)
+
+    async def cleanup(self) -> None:
+        """Removes every remaining worktree of this run."""
+        for worktree in list(self._worktrees):
+            await self.remove(worktree)
+        if self.mirror_dir and os.path.isdir(self.mirror_dir):
+            try:
+                await self._git("worktree", "prune", cwd=self.mirror_dir)
+            except Exception as e:
+                logger.warning(f"Failed to prune worktrees: {e}")
+        if self._worktree_root:
+            shutil.rmtree(self._worktree_root, ignore_errors=True)
+            self._worktree_root = None
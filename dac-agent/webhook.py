@@ -0,0 +1,294 @@
+"""
+Push-based intake of closed SOAR cases.
+
+CaseWebhookListener is an optional local HTTP endpoint that SOAR (or a relay
+in front of it) notifies when a case is closed:
+
+    POST /soar/case-closed      one raw SOAR case, {"case": {...}} or {"cases": [...]}
+    GET  /health                queue depth, counters and latency
+
+Closed false-positive cases are put on an asyncio queue. A free worker takes
+the cases that arrive within a short coalescing window (analysts often close
+several alerts of one rule together) and groups them by rule with
+DACWorkflowExecutor._batch_tuning_cases, so each rule gets one pull request
+within seconds of the analyst's decision instead of at the next poll. Polling keeps running as reconciliation: cases the
+listener missed (or dropped when its queue was full) are picked up by the
+next poll, and the processed-case ledger and the executor's in-flight set
+make sure a case is never processed twice.
+
+When a secret is configured, requests must carry an `X-DAC-Signature:
+sha256=<hex HMAC of the body>` header.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+try:
+    from .tools.soar_polling import is_closed
+except ImportError:
+    from tools.soar_polling import is_closed
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8787
+WEBHOOK_PATH = "/soar/case-closed"
+HEALTH_PATH = "/health"
+SIGNATURE_HEADER = "X-DAC-Signature"
+
+# Largest accepted notification body.
+MAX_BODY_BYTES = 1024 * 1024
+
+# Seconds a worker keeps taking cases off the queue after the first one, and
+# the most cases it takes, before processing them together.
+DEFAULT_COALESCE_SECONDS = 2.0
+MAX_COALESCED_CASES = 100
+
+
+def sign(body: bytes, secret: str) -> str:
+    """Returns the X-DAC-Signature header value for a request body."""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def _raw_cases(payload) -> List[Dict]:
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict) and isinstance(payload.get("cases"), list):
+        return payload["cases"]
+    if isinstance(payload, dict) and isinstance(payload.get("case"), dict):
+        return [payload["case"]]
+    return [payload] if isinstance(payload, dict) else []
+
+
+class CaseWebhookListener:
+    """Receives case-closed notifications and processes them from a queue.
+
+    Attributes:
+        executor: DACWorkflowExecutor the cases are processed with.
+        host: Interface to listen on (local only by default).
+        port: Port to listen on (0 picks a free one; the bound port is set
+            by start()).
+        secret: Shared secret for request signatures (None accepts unsigned
+            requests).
+        workers: Number of tuning batches processed at once.
+        coalesce_seconds: How long a worker collects cases before batching
+            them by rule (0 processes whatever is already queued).
+        stats: Counters of received, queued, ignored, duplicate, processed,
+            failed and rejected notifications.
+    """
+
+    def __init__(self, executor, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 secret: Optional[str] = None, workers: int = 1, queue_size: int = 1000,
+                 coalesce_seconds: float = DEFAULT_COALESCE_SECONDS):
+        self.executor = executor
+        self.host = host
+        self.port = port
+        self.secret = secret
+        self.workers = max(1, workers)
+        self.coalesce_seconds = max(0.0, coalesce_seconds)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.stats = {key: 0 for key in
+                      ("received", "queued", "ignored", "duplicates", "processed", "failed", "rejected")}
+        # Seconds from receipt of a notification to the end of its processing
+        self.latencies = deque(maxlen=200)
+        self._runner = None
+        self._worker_tasks = []
+        self._busy = set()
+        self._stopping = False
+        # One worker collects a window at a time, so cases closed together
+        # are not split between workers
+        self._collecting = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.workers)
+
+    async def start(self) -> None:
+        """Starts the HTTP server and the queue workers."""
+        app = web.Application(client_max_size=MAX_BODY_BYTES)
+        app.router.add_post(WEBHOOK_PATH, self._handle_case_closed)
+        app.router.add_get(HEALTH_PATH, self._handle_health)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        self._worker_tasks = [asyncio.create_task(self._consume()) for _ in range(self.workers)]
+        logger.info(f"Listening for SOAR case-closed notifications on http://{self.host}:{self.port}{WEBHOOK_PATH}")
+
+    async def stop(self, timeout: Optional[float] = None) -> None:
+        """Stops accepting notifications and lets cases being processed finish.
+
+        Queued cases that have not started are left to the next poll.
+
+        Args:
+            timeout: Seconds to wait for cases being processed (None waits
+                until they finish), after which they are cancelled.
+        """
+        self._stopping = True
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        for task in self._worker_tasks:
+            if task not in self._busy:
+                task.cancel()
+        busy = [task for task in self._worker_tasks if task in self._busy]
+        if busy:
+            logger.info(f"Waiting for {len(busy)} pushed cases to finish")
+            _, pending = await asyncio.wait(busy, timeout=timeout)
+            for task in pending:
+                task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        if not self.queue.empty():
+            logger.info(f"{self.queue.qsize()} queued cases left for the next poll")
+
+    # ------------------------------------------------------------------
+    # HTTP handlers
+    # ------------------------------------------------------------------
+
+    async def _handle_case_closed(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        if self.secret and not hmac.compare_digest(
+                request.headers.get(SIGNATURE_HEADER, ""), sign(body, self.secret)):
+            self.stats["rejected"] += 1
+            return web.json_response({"error": "invalid signature"}, status=401)
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self.stats["rejected"] += 1
+            return web.json_response({"error": "body is not JSON"}, status=400)
+
+        queued, ignored = [], []
+        for raw_case in _raw_cases(payload):
+            self.stats["received"] += 1
+            tuning_case = None
+            if isinstance(raw_case, dict) and (not raw_case.get("status") or is_closed(raw_case)):
+                tuning_case = self.executor._tuning_case(raw_case)
+            if tuning_case is None:
+                self.stats["ignored"] += 1
+                ignored.append(str(raw_case.get("id", "")) if isinstance(raw_case, dict) else "")
+                continue
+            try:
+                self.queue.put_nowait((tuning_case, time.monotonic()))
+            except asyncio.QueueFull:
+                # Backpressure: the sender retries, or the next poll catches up.
+                return web.json_response(
+                    {"error": "queue full", "queued": queued}, status=503, headers={"Retry-After": "30"}
+                )
+            self.stats["queued"] += 1
+            queued.append(tuning_case["id"])
+
+        return web.json_response({"queued": queued, "ignored": ignored}, status=202)
+
+    async def _handle_health(self, request: web.Request) -> web.Response:
+        return web.json_response(self.health())
+
+    def health(self) -> Dict:
+        """Returns queue depth, counters and processing latency."""
+        latencies = sorted(self.latencies)
+        return {
+            "queue": self.queue.qsize(),
+            "processing": len(self._busy),
+            "stats": dict(self.stats),
+            "latency_seconds": {
+                "count": len(latencies),
+                "p50": latencies[len(latencies) // 2] if latencies else None,
+                "max": latencies[-1] if latencies else None,
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Queue workers
+    # ------------------------------------------------------------------
+
+    async def _consume(self) -> None:
+        task = asyncio.current_task()
+        while not self._stopping:
+            items = []
+            try:
+                async with self._collecting:
+                    items.append(await self.queue.get())
+                    self._busy.add(task)
+                    await self._collect(items)
+                await self._process(items)
+            finally:
+                self._busy.discard(task)
+                for _ in items:
+                    self.queue.task_done()
+
+    async def _collect(self, items: List[Tuple[Dict, float]]) -> None:
+        """Adds the cases queued within the coalescing window to items."""
+        deadline = time.monotonic() + self.coalesce_seconds
+        while len(items) < MAX_COALESCED_CASES and not self._stopping:
+            if not self.queue.empty():
+                items.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                return
+            try:
+                items.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                return
+
+    async def _process(self, items: List[Tuple[Dict, float]]) -> None:
+        executor = self.executor
+        received = {}
+        for tuning_case, received_at in items:
+            received.setdefault(tuning_case["id"], received_at)
+        # Claim before the ledger lookup so a concurrent poll cannot take the
+        # cases in between
+        claimed = executor._claim_cases([tuning_case for tuning_case, _ in items])
+        if len(claimed) < len(items):
+            self.stats["duplicates"] += len(items) - len(claimed)
+            in_progress = {str(tuning_case["id"]) for tuning_case, _ in items} - {str(case["id"]) for case in claimed}
+            if in_progress:
+                logger.info(f"Cases already in progress: {', '.join(sorted(in_progress))}")
+        try:
+            try:
+                done = await asyncio.to_thread(executor.ledger.done, [case["id"] for case in claimed])
+                if done:
+                    self.stats["duplicates"] += len(done)
+                    logger.info(f"Cases already processed: {', '.join(sorted(done))}")
+                cases = [case for case in claimed if str(case["id"]) not in done]
+                if not cases:
+                    return
+                if executor.worktrees:
+                    # Base the branches on origin as it is now, not at the last poll
+                    executor.worktrees.start_run()
+                batches = await executor._batch_tuning_cases(cases)
+            except Exception as e:
+                logger.error(f"Failed to process pushed cases: {e}")
+                self.stats["failed"] += len(claimed)
+                return
+            await asyncio.gather(*(self._process_batch(batch, received) for batch in batches))
+        finally:
+            executor._release_cases(claimed)
+
+    async def _process_batch(self, batch: Dict, received: Dict[str, float]) -> None:
+        cases = batch["cases"]
+        case_ids = ", ".join(str(case["id"]) for case in cases)
+        async with self._slots:
+            try:
+                result = await self.executor._process_and_record(cases, batch["rule_files"])
+            except Exception as e:
+                logger.error(f"Failed to process pushed cases {case_ids}: {e}")
+                self.stats["failed"] += len(cases)
+                return
+
+        now = time.monotonic()
+        self.latencies.extend(now - received[case["id"]] for case in cases)
+        if result.get("rule_tuned") or result.get("no_change"):
+            self.stats["processed"] += len(cases)
+        else:
+            self.stats["failed"] += len(cases)
+        logger.info(
+            f"Pushed cases {case_ids} processed in {self.latencies[-1]:.1f}s: "
+            f"{result.get('pr_urls') or result.get('error')}"
+        )
@@ -6,35 +6,108 @@ implementing the steps outlined in detection_as_code_rule_tuning.md.
 """
 
 import asyncio
+import contextlib
+import copy
+import hashlib
 import logging
+import os
 import re
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import yaml
 
+try:
+    from .tools.case_ledger import CaseLedger
+    from .tools.rule_catalog import rule_file_written
+    from .tools.rule_eval import run_test_cases
+    from .tools.rule_query import add_exclusions, exclusion_from_conditions, parse_query, to_query
+    from .tools.soar_polling import CaseCursor, case_id, fetch_closed_cases, tool_payload
+    from .tools.tools import as_async_tool
+    from .tools.worktrees import WorktreeManager
+except ImportError:
+    from tools.case_ledger import CaseLedger
+    from tools.rule_catalog import rule_file_written
+    from tools.rule_eval import run_test_cases
+    from tools.rule_query import add_exclusions, exclusion_from_conditions, parse_query, to_query
+    from tools.soar_polling import CaseCursor, case_id, fetch_closed_cases, tool_payload
+    from tools.tools import as_async_tool
+    from tools.worktrees import WorktreeManager
+
 logger = logging.getLogger(__name__)
 
+# Root causes of closed SOAR cases that call for rule tuning
+TUNING_ROOT_CAUSES = ("normal_behavior", "false_positive", "authorized_activity")
+
+
+class _RuleDumper(yaml.SafeDumper):
+    """Writes multi-line strings (rule queries) as literal blocks."""
+
+
+def _represent_str(dumper, value):
+    style = "|" if "\n" in value else None
+    return dumper.represent_scalar("tag:yaml.org,2002:str", value, style=style)
+
+
+_RuleDumper.add_representer(str, _represent_str)
+
 
 class DACWorkflowExecutor:
     """Executes the Detection-as-Code rule tuning workflow autonomously."""
     
-    def __init__(self, agent_tools):
+    def __init__(self, agent_tools, max_concurrency: int = 1, use_worktrees: bool = True,
+                 worktrees: Optional[WorktreeManager] = None, replay_events: Optional[List[str]] = None,
+                 case_cursor: Optional[CaseCursor] = None, ledger: Optional[CaseLedger] = None):
         """Initialize the workflow executor with agent tools.
         
+        The file, git and GitHub tools are converted to their async variants
+        (see as_async_tool) so the workflow never blocks the event loop.
+        
         Args:
             agent_tools: Tuple of initialized MCP toolsets and custom tools
+            max_concurrency: Number of tuning cases processed at once
+                (1 processes them one after another)
+            use_worktrees: Prepare each branch in its own git worktree of a
+                bare mirror instead of checking it out in the current
+                working tree
+            worktrees: Worktree manager to use (default: one for the
+                repository containing the current directory)
+            replay_events: Exported event files (JSON Lines / Parquet) or
+                directories to replay each rule change over, to measure
+                its impact
+            case_cursor: Watermark of the newest SOAR case handled (default:
+                the one persisted in .cache/soar_cursor.json)
+            ledger: Record of processed cases (default: the SQLite ledger in
+                .cache/case_ledger.sqlite3)
         """
+        self.max_concurrency = max(1, max_concurrency)
+        self.worktrees = worktrees or (WorktreeManager() if use_worktrees else None)
+        self.replay_events = replay_events
+        self.case_cursor = case_cursor or CaseCursor()
+        self.ledger = ledger if ledger is not None else CaseLedger()
+        # IDs of cases being processed, so a case pushed by the webhook
+        # listener while it is also polled is only processed once
+        self._in_flight = set()
+        # Cases returned by the last poll, oldest first, and its statistics
+        # (None if the poll failed)
+        self._polled_cases: List[Dict] = []
+        self._poll_stats: Optional[Dict] = None
+        self._soar_tools = {}
+        # Cases tuning the same rule file are serialized behind its lock.
+        self._rule_locks: Dict[str, asyncio.Lock] = {}
+        # Without worktrees every branch is checked out in the shared working
+        # tree, so branches must be prepared one at a time.
+        self._workspace_lock = asyncio.Lock()
         self.soar_toolset = agent_tools[0]
         self.siem_toolset = agent_tools[1] 
         self.gti_toolset = agent_tools[2]
         self.get_current_time = agent_tools[3]
-        self.write_report = agent_tools[4]
-        self.git_create_branch = agent_tools[5]
-        self.git_commit_changes = agent_tools[6]
-        self.git_push_branch = agent_tools[7]
-        self.create_github_pr = agent_tools[8]
-        self.validate_yaml_file = agent_tools[9]
-        self.find_rule_files = agent_tools[10]
+        self.write_report = as_async_tool(agent_tools[4])
+        self.git_create_branch = as_async_tool(agent_tools[5])
+        self.git_commit_changes = as_async_tool(agent_tools[6])
+        self.git_push_branch = as_async_tool(agent_tools[7])
+        self.create_github_pr = as_async_tool(agent_tools[8])
+        self.validate_yaml_file = as_async_tool(agent_tools[9])
+        self.find_rule_files = as_async_tool(agent_tools[10])
     
     async def execute_full_workflow(self) -> Dict:
         """Execute the complete DAC workflow autonomously.
@@ -48,33 +121,86 @@ class DACWorkflowExecutor:
             "cases_processed": 0,
             "rules_tuned": 0,
             "prs_created": 0,
+            "cases_skipped": 0,
             "errors": []
         }
         
+        if self.worktrees:
+            self.worktrees.start_run()
+        
+        claimed = []
         try:
             # Step 1: Monitor SOAR cases for tuning opportunities
+            self._polled_cases, self._poll_stats = [], None
             tuning_cases = await self._monitor_soar_cases()
             workflow_results["cases_found"] = len(tuning_cases)
             
+            # Leave cases the webhook listener is processing to it; they are
+            # polled again (and found in the ledger) on the next run
+            claimed = self._claim_cases(tuning_cases)
+            held_ids = {str(case.get("id")) for case in tuning_cases} - {str(case.get("id")) for case in claimed}
+            if held_ids:
+                logger.info(f"Leaving {len(held_ids)} cases already in progress: {', '.join(sorted(held_ids))}")
+            
+            # Skip cases already turned into a pull request
+            done = await asyncio.to_thread(self.ledger.done, [case.get("id") for case in claimed])
+            tuning_cases = claimed
+            if done:
+                logger.info(f"Skipping {len(done)} already processed cases: {', '.join(sorted(done))}")
+                tuning_cases = [case for case in tuning_cases if str(case.get("id")) not in done]
+                workflow_results["cases_skipped"] = len(done)
+            
             if not tuning_cases:
                 logger.info("No cases requiring rule tuning found")
+                self._advance_cursor(held_ids)
                 return workflow_results
             
-            # Process each case
-            for case in tuning_cases:
-                try:
-                    case_result = await self._process_tuning_case(case)
-                    workflow_results["cases_processed"] += 1
-                    
-                    if case_result.get("rule_tuned"):
-                        workflow_results["rules_tuned"] += 1
-                    
-                    if case_result.get("pr_created"):
-                        workflow_results["prs_created"] += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error processing case {case.get('id', 'unknown')}: {e}")
-                    workflow_results["errors"].append(f"Case {case.get('id')}: {str(e)}")
+            # Group cases tuning the same rule into one change
+            batches = await self._batch_tuning_cases(tuning_cases)
+            workflow_results["batches"] = len(batches)
+            
+            # Process the batches, up to max_concurrency at a time
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            
+            async def process(batch):
+                async with semaphore:
+                    return await self._process_and_record(batch["cases"], batch["rule_files"])
+            
+            batch_results = await asyncio.gather(
+                *(process(batch) for batch in batches), return_exceptions=True
+            )
+            
+            failed_ids = set()
+            for batch, batch_result in zip(batches, batch_results):
+                case_ids = ", ".join(str(case.get("id")) for case in batch["cases"])
+                if isinstance(batch_result, Exception):
+                    logger.error(f"Error processing cases {case_ids}: {batch_result}")
+                    workflow_results["errors"].append(f"Cases {case_ids}: {str(batch_result)}")
+                    failed_ids.update(str(case.get("id")) for case in batch["cases"])
+                    continue
+                if isinstance(batch_result, BaseException):
+                    raise batch_result
+                
+                workflow_results["cases_processed"] += len(batch["cases"])
+                
+                if self._outcome(batch_result) == "failed":
+                    failed_ids.update(str(case.get("id")) for case in batch["cases"])
+                
+                if batch_result.get("rule_tuned"):
+                    workflow_results["rules_tuned"] += 1
+                
+                if batch_result.get("pr_created"):
+                    workflow_results["prs_created"] += 1
+            
+            # Cases that failed or raised (or were in progress elsewhere) are
+            # polled again on the next run, unless they have failed too often
+            given_up = await asyncio.to_thread(self.ledger.done, failed_ids)
+            if given_up:
+                logger.warning(
+                    f"Not retrying cases that failed {self.ledger.max_attempts} times in a row: "
+                    f"{', '.join(sorted(given_up))} (--forget-cases retries them)"
+                )
+            self._advance_cursor(held_ids | (failed_ids - set(given_up)))
             
             # Generate summary report
             await self._generate_workflow_report(workflow_results)
@@ -82,6 +208,11 @@ class DACWorkflowExecutor:
         except Exception as e:
             logger.error(f"Workflow execution failed: {e}")
             workflow_results["errors"].append(f"Workflow failure: {str(e)}")
+        finally:
+            self._release_cases(claimed)
+            # Worktrees of cases still processed for the webhook listener stay
+            if self.worktrees and not self._in_flight:
+                await self.worktrees.cleanup()
         
         workflow_results["end_time"] = self.get_current_time()["current_time"]
         return workflow_results
@@ -89,35 +220,32 @@ class DACWorkflowExecutor:
     async def _monitor_soar_cases(self) -> List[Dict]:
         """Monitor SOAR cases for tuning opportunities.
         
+        Only cases closed since the stored watermark are fetched (see
+        soar_polling.fetch_closed_cases); execute_full_workflow advances the
+        watermark once they have been processed.
+        
         Returns:
             List[Dict]: Cases that indicate rule tuning is needed
         """
         logger.info("Monitoring SOAR cases for tuning opportunities")
         
-        # Search criteria for cases requiring tuning
-        search_criteria = {
-            "status": "closed",
-            "root_cause": ["normal_behavior", "false_positive", "authorized_activity"],
-            "has_analyst_comments": True,
-            "time_range": "last_7_days"
-        }
-        
-        # Use SOAR MCP server to search for relevant cases
         try:
-            # This would use the actual SOAR toolset methods
-            # For now, returning sample data structure
+            list_cases = await self._soar_tool("list_cases")
+            
+            async def fetch_page(page_token: Optional[str]) -> Dict:
+                args = {"next_page_token": page_token} if page_token else {}
+                return tool_payload(await list_cases.run_async(args=args, tool_context=None))
+            
+            self._polled_cases, stats = await fetch_closed_cases(fetch_page, self.case_cursor)
+            self._poll_stats = stats
+            logger.info(
+                f"Polled {stats['pages']} pages of SOAR cases ({stats['cases_seen']} cases), "
+                f"{stats['new_cases']} closed since the last run"
+            )
+            
             tuning_cases = [
-                {
-                    "id": "4232",
-                    "rule_name": "Remote Monitoring Management Tools Execution",
-                    "analyst_comment": "This case was a false positive. User jack.torrance is authorized to execute ScreenConnect in our environment. Rule should be tuned to exclude events where user.name = 'jack.torrance' AND host.name = 'desktop-7xl2kp3'.",
-                    "host_name": "desktop-7xl2kp3",
-                    "user_name": "jack.torrance",
-                    "process_name": "ScreenConnect.exe",
-                    "exclusion_type": "user_host_combination"
-                }
+                tuning_case for tuning_case in map(self._tuning_case, self._polled_cases) if tuning_case
             ]
-            
             logger.info(f"Found {len(tuning_cases)} cases requiring rule tuning")
             return tuning_cases
             
@@ -125,6 +253,91 @@ class DACWorkflowExecutor:
             logger.error(f"Failed to search SOAR cases: {e}")
             return []
     
+    def _advance_cursor(self, failed_ids: set) -> None:
+        """Move the SOAR watermark over the cases of the last poll.
+        
+        Nothing moves if the poll failed. A poll cut off by the page limit
+        only records where the next poll continues (see CaseCursor.advance).
+        """
+        if self._poll_stats is None:
+            return
+        self.case_cursor.advance(
+            self._polled_cases, failed_ids,
+            next_page_token=self._poll_stats["next_page_token"], since=self._poll_stats["since"]
+        )
+    
+    async def _soar_tool(self, tool_name: str):
+        """Return a tool of the SOAR toolset by name."""
+        if tool_name not in self._soar_tools:
+            for tool in await self.soar_toolset.get_tools():
+                self._soar_tools[tool.name] = tool
+        if tool_name not in self._soar_tools:
+            raise RuntimeError(f"SOAR toolset has no {tool_name} tool")
+        return self._soar_tools[tool_name]
+    
+    @staticmethod
+    def _tuning_case(case: Dict) -> Optional[Dict]:
+        """Convert a closed SOAR case into a tuning case.
+        
+        Args:
+            case: Raw SOAR case
+            
+        Returns:
+            Optional[Dict]: Tuning case, or None if the case was not closed
+            as a false positive with analyst comments
+        """
+        def first(*keys):
+            return next((case[key] for key in keys if case.get(key)), None)
+        
+        root_cause = str(first("rootCause", "root_cause", "closeReason") or "").lower().replace(" ", "_")
+        comment = first("analyst_comment", "closeComment", "comment")
+        if root_cause not in TUNING_ROOT_CAUSES or not comment:
+            return None
+        
+        tuning_case = {
+            "id": case_id(case),
+            "rule_name": first("rule_name", "ruleName", "title", "displayName"),
+            "analyst_comment": comment,
+            "host_name": first("host_name", "hostName"),
+            "user_name": first("user_name", "userName"),
+            "process_name": first("process_name", "processName"),
+        }
+        tuning_case["exclusion_type"] = first("exclusion_type", "exclusionType") or (
+            "user_host_combination" if tuning_case["user_name"] and tuning_case["host_name"] else "general"
+        )
+        return tuning_case
+    
+    async def _batch_tuning_cases(self, cases: List[Dict]) -> List[Dict]:
+        """Group tuning cases by the rule files they resolve to.
+        
+        Cases asking for exclusions on the same rule are applied in a single
+        modification, commit and pull request instead of one per case.
+        
+        Args:
+            cases: SOAR cases returned by _monitor_soar_cases
+            
+        Returns:
+            List[Dict]: Batches of {"rule_files": [...], "cases": [...]}, in
+            order of first appearance; cases whose rule was not found form
+            batches of their own
+        """
+        batches = {}
+        rule_files_by_pattern = {}
+        
+        for case in cases:
+            rule_pattern = case.get("rule_name", "")
+            if rule_pattern not in rule_files_by_pattern:
+                rule_files_by_pattern[rule_pattern] = await self._locate_rule_files(
+                    {"rule_pattern": rule_pattern}
+                )
+            rule_files = rule_files_by_pattern[rule_pattern]
+            
+            key = tuple(sorted(rule_files)) if rule_files else ("unresolved", id(case))
+            batches.setdefault(key, {"rule_files": rule_files, "cases": []})["cases"].append(case)
+        
+        logger.info(f"Grouped {len(cases)} cases into {len(batches)} tuning batches")
+        return list(batches.values())
+    
     async def _process_tuning_case(self, case: Dict) -> Dict:
         """Process a single SOAR case for rule tuning.
         
@@ -134,51 +347,202 @@ class DACWorkflowExecutor:
         Returns:
             Dict: Results of processing this case
         """
-        case_id = case.get("id", "unknown")
-        logger.info(f"Processing tuning case {case_id}")
+        result = await self._process_and_record([case])
+        result["case_id"] = case.get("id", "unknown")
+        return result
+    
+    def _claim_cases(self, cases: List[Dict]) -> List[Dict]:
+        """Mark cases as being processed.
+        
+        Args:
+            cases: Tuning cases
+            
+        Returns:
+            List[Dict]: The cases that were not already being processed
+        """
+        claimed = []
+        for case in cases:
+            case_key = str(case.get("id"))
+            if case_key not in self._in_flight:
+                self._in_flight.add(case_key)
+                claimed.append(case)
+        return claimed
+    
+    def _release_cases(self, cases: List[Dict]) -> None:
+        """Unmark cases claimed with _claim_cases."""
+        self._in_flight.difference_update(str(case.get("id")) for case in cases)
+    
+    async def _process_and_record(self, cases: List[Dict], rule_files: Optional[List[str]] = None) -> Dict:
+        """Process a batch of cases and record its outcome in the ledger.
+        
+        Args:
+            cases: SOAR cases containing tuning requirements
+            rule_files: Rule files the cases resolve to
+            
+        Returns:
+            Dict: Results of processing these cases
+        """
+        try:
+            result = await self._process_tuning_batch(cases, rule_files)
+        except Exception as e:
+            # Counted like a failed outcome, so a case that always raises is
+            # not retried forever
+            await asyncio.to_thread(self._record_outcome, cases, {"error": str(e)})
+            raise
+        await asyncio.to_thread(self._record_outcome, cases, result)
+        return result
+    
+    @staticmethod
+    def _outcome(result: Dict) -> str:
+        """Return the ledger outcome of a batch result."""
+        if result.get("pr_created"):
+            return "pr_created"
+        if result.get("rule_tuned"):
+            return "pushed"
+        if result.get("no_change"):
+            return "no_change"
+        return "failed"
+    
+    def _record_outcome(self, cases: List[Dict], result: Dict) -> None:
+        """Record the outcome of a batch for each of its cases."""
+        outcome = self._outcome(result)
+        for case in cases:
+            self.ledger.record(
+                case.get("id", "unknown"),
+                outcome,
+                branch=result.get("branch_name"),
+                pr_url=result["pr_urls"][0] if result.get("pr_urls") else None,
+                rule_file=result.get("rule_file"),
+                rule_version=result.get("rule_version"),
+                content_hash=result.get("content_hash"),
+                error=result.get("error")
+            )
+    
+    async def _process_tuning_batch(self, cases: List[Dict], rule_files: Optional[List[str]] = None) -> Dict:
+        """Process SOAR cases tuning the same rule as one change.
+        
+        Args:
+            cases: SOAR cases containing tuning requirements
+            rule_files: Rule files the cases resolve to (located from the
+                first case when not given)
+            
+        Returns:
+            Dict: Results of processing these cases
+        """
+        case_ids = [case.get("id", "unknown") for case in cases]
+        logger.info(f"Processing tuning cases {', '.join(map(str, case_ids))}")
         
         result = {
-            "case_id": case_id,
+            "case_ids": case_ids,
             "rule_tuned": False,
             "pr_created": False,
+            "pr_urls": [],
             "error": None
         }
         
         try:
             # Step 2: Extract tuning requirements
-            tuning_requirements = self._extract_tuning_requirements(case)
+            tuning_requirements = [self._extract_tuning_requirements(case) for case in cases]
             
             # Step 3: Locate rule files
-            rule_files = await self._locate_rule_files(tuning_requirements)
+            if rule_files is None:
+                rule_files = await self._locate_rule_files(tuning_requirements[0])
             
             if not rule_files:
-                result["error"] = f"No rule files found for: {tuning_requirements.get('rule_pattern')}"
+                result["error"] = f"No rule files found for: {tuning_requirements[0].get('rule_pattern')}"
                 return result
             
-            # Step 4: Generate rule modifications
-            for rule_file in rule_files:
-                modification_result = await self._generate_rule_modification(
-                    rule_file, tuning_requirements
-                )
+            branch_name = self._branch_name(cases)
+            async with contextlib.AsyncExitStack() as stack:
+                # Lock in a fixed order so batches sharing rule files cannot deadlock
+                for rule_file in sorted(set(rule_files), key=os.path.realpath):
+                    await stack.enter_async_context(self._rule_lock(rule_file))
+                workdir = await stack.enter_async_context(self._branch_workspace(branch_name))
+                
+                # Step 4: Generate rule modifications
+                modification_results = []
+                for rule_file in rule_files:
+                    modification_result = await self._generate_rule_modification(
+                        self._workspace_path(rule_file, workdir), tuning_requirements
+                    )
+                    if modification_result["success"]:
+                        if not modification_results:
+                            result["rule_file"] = rule_file
+                            result["rule_version"] = modification_result.get("rule_version")
+                            result["content_hash"] = modification_result.get("content_hash")
+                        modification_results.append(modification_result)
+                    else:
+                        result["error"] = modification_result.get("error")
+                        result["no_change"] = modification_result.get("no_change", False)
                 
-                if modification_result["success"]:
-                    # Step 5: Create branch and commit changes
+                if modification_results:
+                    # Step 5: Commit changes and open the pull request
                     git_result = await self._create_git_workflow(
-                        rule_file, case, modification_result
+                        branch_name, cases, modification_results, workdir
                     )
                     
                     if git_result["success"]:
                         result["rule_tuned"] = True
+                        result["branch_name"] = branch_name
                         result["pr_created"] = git_result.get("pr_created", False)
+                        if git_result.get("pr_url"):
+                            result["pr_urls"].append(git_result["pr_url"])
                     else:
                         result["error"] = git_result.get("error")
                 
         except Exception as e:
-            logger.error(f"Error processing case {case_id}: {e}")
+            logger.error(f"Error processing cases {', '.join(map(str, case_ids))}: {e}")
             result["error"] = str(e)
         
         return result
     
+    @contextlib.asynccontextmanager
+    async def _branch_workspace(self, branch_name: str):
+        """Create a branch from main and yield the directory to prepare it in.
+        
+        With worktrees the branch gets its own checkout, removed afterwards;
+        otherwise it is checked out in the current working tree (None).
+        
+        Args:
+            branch_name: Name of the branch to create
+        """
+        if self.worktrees is None:
+            async with self._workspace_lock:
+                branch_result = await self.git_create_branch(branch_name)
+                if not branch_result["success"]:
+                    raise RuntimeError(f"Failed to create branch: {branch_result['error']}")
+                yield None
+            return
+        
+        try:
+            worktree = await self.worktrees.add(branch_name)
+        except Exception as e:
+            raise RuntimeError(f"Failed to create branch: {e}") from e
+        try:
+            yield worktree
+        finally:
+            await self.worktrees.remove(worktree)
+    
+    def _workspace_path(self, rule_file_path: str, workdir: Optional[str]) -> str:
+        """Return the path of a located rule file inside the branch workspace."""
+        if workdir is None:
+            return rule_file_path
+        return self.worktrees.path_in(workdir, rule_file_path)
+    
+    def _rule_lock(self, rule_file_path: str) -> asyncio.Lock:
+        """Return the lock serializing modifications of a rule file.
+        
+        Args:
+            rule_file_path: Path to the rule file
+            
+        Returns:
+            asyncio.Lock: Lock shared by every case tuning this file
+        """
+        key = os.path.realpath(rule_file_path)
+        if key not in self._rule_locks:
+            self._rule_locks[key] = asyncio.Lock()
+        return self._rule_locks[key]
+    
     def _extract_tuning_requirements(self, case: Dict) -> Dict:
         """Extract tuning requirements from SOAR case analyst comments.
         
@@ -234,7 +598,7 @@ class DACWorkflowExecutor:
         rule_pattern = requirements.get("rule_pattern", "")
         
         # Search for rule files
-        search_result = self.find_rule_files(rule_pattern)
+        search_result = await self.find_rule_files(rule_pattern)
         
         if search_result["success"] and search_result["count"] > 0:
             rule_files = [match["file_path"] for match in search_result["matches"]]
@@ -244,12 +608,19 @@ class DACWorkflowExecutor:
             logger.warning(f"No rule files found for pattern: {rule_pattern}")
             return []
     
-    async def _generate_rule_modification(self, rule_file_path: str, requirements: Dict) -> Dict:
+    async def _generate_rule_modification(self, rule_file_path: str, requirements_list: List[Dict]) -> Dict:
         """Generate rule modifications based on tuning requirements.
         
+        Every case's exclusion is added in one modification. The query is
+        parsed and the exclusions merged into its NOT clause structurally, so
+        duplicate exclusions, or ones already covered by a broader
+        exclusion, are not added again. The rule's embedded test cases are
+        run before and after the change; a change that makes a passing test
+        case fail is rejected.
+        
         Args:
             rule_file_path: Path to the rule file to modify
-            requirements: Tuning requirements
+            requirements_list: Tuning requirements, one per case
             
         Returns:
             Dict: Result of rule modification
@@ -258,34 +629,30 @@ class DACWorkflowExecutor:
         
         try:
             # Read current rule file
-            with open(rule_file_path, 'r') as f:
-                rule_data = yaml.safe_load(f)
+            rule_data = await asyncio.to_thread(self._load_rule_file, rule_file_path)
+            original_rule = copy.deepcopy(rule_data)
+            baseline_results = run_test_cases(rule_data)
             
             # Generate exclusion logic based on requirements
-            exclusion_conditions = []
-            for condition in requirements.get("conditions", []):
-                exclusion_conditions.append(
-                    f"{condition['field']} {condition['operator']} \"{condition['value']}\""
-                )
+            exclusions = [
+                exclusion_from_conditions(requirements["conditions"])
+                for requirements in requirements_list if requirements.get("conditions")
+            ]
             
-            if exclusion_conditions:
-                # Add NOT clause to existing query
-                current_query = rule_data.get("logic", {}).get("query", "")
-                exclusion_clause = " AND ".join(exclusion_conditions)
-                
-                # Insert NOT clause into query
-                if "NOT (" in current_query:
-                    # Add to existing NOT clause
-                    modified_query = current_query.replace(
-                        "NOT (",
-                        f"NOT (\n      ({exclusion_clause}) OR\n      ("
-                    ) + "\n    )"
-                else:
-                    # Add new NOT clause
-                    modified_query = f"{current_query} AND\n    NOT ({exclusion_clause})"
-                
-                rule_data["logic"]["query"] = modified_query
-                
+            # Merge the exclusions into the query's NOT clause
+            current_query = rule_data.get("logic", {}).get("query", "")
+            modified_query, added = add_exclusions(parse_query(current_query), exclusions)
+            if exclusions and not added:
+                return {
+                    "success": False,
+                    "error": "Rule already excludes the requested conditions",
+                    "no_change": True
+                }
+            
+            rule_data["logic"]["query"] = to_query(modified_query)
+            exclusion_clause = " OR ".join(to_query(exclusion, pretty=False) for exclusion in added)
+            
+            if added:
                 # Update metadata
                 rule_data["metadata"]["last_modified"] = datetime.now().strftime("%Y-%m-%d")
                 if "version" in rule_data["metadata"]:
@@ -294,22 +661,43 @@ class DACWorkflowExecutor:
                         minor_version = int(version_parts[1]) + 1
                         rule_data["metadata"]["version"] = f"{version_parts[0]}.{minor_version}"
             
-            # Validate YAML syntax
-            validation_result = self.validate_yaml_file(rule_file_path)
+            # Run the test cases against the modified rule. Cases that already
+            # failed (e.g. an expired exclusion) are reported, not blocking.
+            test_results = run_test_cases(rule_data)
+            regressions = [
+                after["description"]
+                for before, after in zip(baseline_results["results"], test_results["results"])
+                if before["passed"] and not after["passed"]
+            ]
+            if regressions:
+                return {
+                    "success": False,
+                    "error": f"Tuning breaks test cases: {'; '.join(regressions)}",
+                    "test_results": test_results
+                }
+            
+            impact = await self._estimate_impact(original_rule, rule_data) if added else None
+            
+            # Write the modified rule back, then validate what was written
+            original_content = await asyncio.to_thread(self._read_rule_text, rule_file_path)
+            content = await asyncio.to_thread(self._dump_rule_file, rule_file_path, rule_data)
+            validation_result = await self.validate_yaml_file(rule_file_path, run_tests=False)
             if not validation_result["valid"]:
+                await asyncio.to_thread(self._write_rule_text, rule_file_path, original_content)
                 return {
                     "success": False,
                     "error": f"YAML validation failed: {validation_result['error']}"
                 }
             
-            # Write modified rule back to file
-            with open(rule_file_path, 'w') as f:
-                yaml.dump(rule_data, f, default_flow_style=False, indent=2)
-            
             return {
                 "success": True,
                 "modified_file": rule_file_path,
-                "exclusion_added": exclusion_clause if exclusion_conditions else None
+                "exclusion_added": exclusion_clause or None,
+                "validation": validation_result,
+                "test_results": test_results,
+                "impact": impact,
+                "rule_version": str(rule_data.get("metadata", {}).get("version", "")) or None,
+                "content_hash": hashlib.sha256(content.encode()).hexdigest()
             }
             
         except Exception as e:
@@ -319,35 +707,83 @@ class DACWorkflowExecutor:
                 "error": str(e)
             }
     
-    async def _create_git_workflow(self, rule_file_path: str, case: Dict, modification_result: Dict) -> Dict:
-        """Create Git branch, commit changes, and create pull request.
+    async def _estimate_impact(self, original_rule: Dict, modified_rule: Dict) -> Optional[Dict]:
+        """Replay both rule versions over the configured historical events.
         
         Args:
-            rule_file_path: Path to modified rule file
-            case: Original SOAR case data
-            modification_result: Result of rule modification
+            original_rule: Rule before the modification
+            modified_rule: Rule after the modification
             
         Returns:
-            Dict: Result of Git workflow operations
+            Optional[Dict]: Replay report (see rule_replay.replay) with a
+            one-line summary, None when no events are configured or the
+            replay failed
         """
-        case_id = case.get("id", "unknown")
-        rule_name = case.get("rule_name", "rule").lower().replace(" ", "-")
-        branch_name = f"tune/{rule_name}-case-{case_id}"
+        if not self.replay_events:
+            return None
+        try:
+            # pandas/pyarrow are only loaded when a replay is configured
+            try:
+                from .tools.rule_replay import format_impact, replay
+            except ImportError:
+                from tools.rule_replay import format_impact, replay
+            impact = await asyncio.to_thread(replay, original_rule, modified_rule, self.replay_events)
+        except Exception as e:
+            logger.warning(f"Historical replay failed: {e}")
+            return None
+        impact["summary"] = format_impact(impact)
+        logger.info(impact["summary"])
+        return impact
+    
+    @staticmethod
+    def _load_rule_file(rule_file_path: str) -> Dict:
+        """Read and parse a YAML rule file."""
+        with open(rule_file_path, 'r') as f:
+            return yaml.safe_load(f)
+    
+    @staticmethod
+    def _read_rule_text(rule_file_path: str) -> str:
+        """Read a rule file's raw text."""
+        with open(rule_file_path, 'r') as f:
+            return f.read()
+    
+    @staticmethod
+    def _write_rule_text(rule_file_path: str, content: str) -> None:
+        """Write raw text back to a rule file (restores a rejected change)."""
+        with open(rule_file_path, 'w') as f:
+            f.write(content)
+        rule_file_written(rule_file_path)
+    
+    @staticmethod
+    def _dump_rule_file(rule_file_path: str, rule_data: Dict) -> str:
+        """Write a rule back to its YAML file and return the written content."""
+        content = yaml.dump(rule_data, Dumper=_RuleDumper, default_flow_style=False, indent=2)
+        with open(rule_file_path, 'w') as f:
+            f.write(content)
+        rule_file_written(rule_file_path)
+        return content
+    
+    async def _create_git_workflow(self, branch_name: str, cases: List[Dict], modification_results: List[Dict],
+                                   workdir: Optional[str] = None) -> Dict:
+        """Commit the modified rules, push the branch and create a pull request.
         
+        Args:
+            branch_name: Branch prepared by _branch_workspace
+            cases: Original SOAR case data of every case in the change
+            modification_results: Results of the rule modifications
+            workdir: Worktree of the branch (None for the current directory)
+            
+        Returns:
+            Dict: Result of Git workflow operations
+        """
         logger.info(f"Creating Git workflow for branch: {branch_name}")
+        location = {"cwd": workdir} if workdir else {}
         
         try:
-            # Create feature branch
-            branch_result = self.git_create_branch(branch_name)
-            if not branch_result["success"]:
-                return {
-                    "success": False,
-                    "error": f"Failed to create branch: {branch_result['error']}"
-                }
-            
             # Commit changes
-            commit_message = self._generate_commit_message(case, modification_result)
-            commit_result = self.git_commit_changes([rule_file_path], commit_message)
+            rule_file_paths = [result["modified_file"] for result in modification_results]
+            commit_message = self._generate_commit_message(cases, modification_results[0])
+            commit_result = await self.git_commit_changes(rule_file_paths, commit_message, **location)
             if not commit_result["success"]:
                 return {
                     "success": False,
@@ -355,7 +791,7 @@ class DACWorkflowExecutor:
                 }
             
             # Push branch
-            push_result = self.git_push_branch(branch_name)
+            push_result = await self.git_push_branch(branch_name, **location)
             if not push_result["success"]:
                 return {
                     "success": False,
@@ -363,8 +799,8 @@ class DACWorkflowExecutor:
                 }
             
             # Create pull request
-            pr_title, pr_body = self._generate_pr_content(case, modification_result)
-            pr_result = self.create_github_pr(pr_title, pr_body)
+            pr_title, pr_body = self._generate_pr_content(cases, modification_results[0])
+            pr_result = await self.create_github_pr(pr_title, pr_body, **location)
             
             return {
                 "success": True,
@@ -381,57 +817,118 @@ class DACWorkflowExecutor:
                 "error": str(e)
             }
     
-    def _generate_commit_message(self, case: Dict, modification_result: Dict) -> str:
+    def _branch_name(self, cases: List[Dict]) -> str:
+        """Generate the tuning branch name for a set of cases.
+        
+        Args:
+            cases: SOAR case data
+            
+        Returns:
+            str: Branch name
+        """
+        case_ids = [str(case.get("id", "unknown")) for case in cases]
+        rule_name = cases[0].get("rule_name", "rule").lower().replace(" ", "-")
+        
+        if len(case_ids) == 1:
+            return f"tune/{rule_name}-case-{case_ids[0]}"
+        if len(case_ids) <= 5:
+            return f"tune/{rule_name}-cases-{'-'.join(case_ids)}"
+        return f"tune/{rule_name}-cases-{case_ids[0]}-plus-{len(case_ids) - 1}"
+    
+    def _generate_commit_message(self, cases: List[Dict], modification_result: Dict) -> str:
         """Generate descriptive commit message for rule tuning.
         
         Args:
-            case: SOAR case data
+            cases: SOAR case data of every case in the change
             modification_result: Rule modification details
             
         Returns:
             str: Formatted commit message
         """
-        case_id = case.get("id", "unknown")
-        rule_name = case.get("rule_name", "Detection Rule")
+        case_refs = ", ".join(f"#{case.get('id', 'unknown')}" for case in cases)
+        rule_name = cases[0].get("rule_name", "Detection Rule")
+        plural = "s" if len(cases) > 1 else ""
         
-        message = f"Tune {rule_name} based on case #{case_id} feedback\n\n"
+        message = f"Tune {rule_name} based on case{plural} {case_refs} feedback\n\n"
         
-        if case.get("user_name") and case.get("host_name"):
-            message += f"- Added exclusion for authorized user: {case['user_name']}\n"
-            message += f"- Excluded host: {case['host_name']}\n"
+        exclusion_lines = []
+        for case in cases:
+            if case.get("user_name") and case.get("host_name"):
+                for line in (f"- Added exclusion for authorized user: {case['user_name']}\n",
+                             f"- Excluded host: {case['host_name']}\n"):
+                    if line not in exclusion_lines:
+                        exclusion_lines.append(line)
+        message += "".join(exclusion_lines)
         
         message += f"- Reduces false positives for legitimate operations\n"
-        message += f"- SOAR case: #{case_id}\n"
+        message += f"- SOAR case{plural}: {case_refs}\n"
         
-        if case.get("analyst_comment"):
-            message += f"\nAnalyst feedback:\n{case['analyst_comment'][:200]}..."
+        for case in cases:
+            if case.get("analyst_comment"):
+                source = f" (case #{case.get('id', 'unknown')})" if plural else ""
+                message += f"\nAnalyst feedback{source}:\n{case['analyst_comment'][:200]}..."
         
         return message
     
-    def _generate_pr_content(self, case: Dict, modification_result: Dict) -> Tuple[str, str]:
+    def _generate_pr_content(self, cases: List[Dict], modification_result: Dict) -> Tuple[str, str]:
         """Generate pull request title and body.
         
         Args:
-            case: SOAR case data
+            cases: SOAR case data of every case in the change
             modification_result: Rule modification details
             
         Returns:
             Tuple[str, str]: PR title and body
         """
-        case_id = case.get("id", "unknown")
-        rule_name = case.get("rule_name", "Detection Rule")
+        case_refs = ", ".join(f"#{case.get('id', 'unknown')}" for case in cases)
+        rule_name = cases[0].get("rule_name", "Detection Rule")
         
-        title = f"Tune {rule_name} - Case #{case_id} False Positive"
+        if len(cases) == 1:
+            title = f"Tune {rule_name} - Case {case_refs} False Positive"
+            summary = f"SOAR case {case_refs}"
+        else:
+            title = f"Tune {rule_name} - {len(cases)} False Positive Cases"
+            summary = f"{len(cases)} SOAR cases ({case_refs})"
+        
+        case_details = "\n\n".join(
+            f"""- **Case ID**: #{case.get('id', 'unknown')}
+- **Rule**: {rule_name}
+- **Root Cause**: {case.get('exclusion_type', 'false_positive')}"""
+            for case in cases
+        )
+        analyst_feedback = "\n".join(
+            f"Case #{case.get('id', 'unknown')}: {case.get('analyst_comment', 'No additional comments')}"
+            if len(cases) > 1 else case.get('analyst_comment', 'No additional comments')
+            for case in cases
+        )
+        validation = modification_result.get("validation") or {}
+        syntax_check = "x" if validation.get("valid") else " "
+        test_results = modification_result.get("test_results")
+        if test_results:
+            passing = test_results["total"] - test_results["failed"]
+            check = "x" if test_results["passed"] else " "
+            test_line = f"- [{check}] Embedded test cases: {passing}/{test_results['total']} passing"
+        else:
+            test_line = "- [ ] Embedded test cases run"
+        impact = modification_result.get("impact")
+        if impact:
+            impact_check = "x"
+            expected_impact = f"""- {impact['summary']}
+- Improved analyst efficiency
+- Maintained security coverage"""
+        else:
+            impact_check = " "
+            expected_impact = """- Reduction in false positive alerts
+- Improved analyst efficiency
+- Maintained security coverage"""
         
         body = f"""## Summary
-- Tunes detection rule based on SOAR case #{case_id} analyst feedback
+- Tunes detection rule based on {summary} analyst feedback
 - Adds exclusion for authorized user/host combination
 - Reduces false positives while maintaining detection effectiveness
 
 ## SOAR Case Details
-- **Case ID**: #{case_id}
-- **Rule**: {rule_name}
-- **Root Cause**: {case.get('exclusion_type', 'false_positive')}
+{case_details}
 
 ## Changes Made
 - Added exclusion conditions to rule logic
@@ -446,20 +943,19 @@ class DACWorkflowExecutor:
 - [ ] Includes proper documentation
 
 ## Test Plan
-- [ ] Rule syntax validation passed
+- [{syntax_check}] Rule syntax validation passed
+{test_line}
 - [ ] Logic review completed
-- [ ] Historical impact assessment
+- [{impact_check}] Historical impact assessment
 - [ ] False positive verification
 
 ## Analyst Feedback
 ```
-{case.get('analyst_comment', 'No additional comments')}
+{analyst_feedback}
 ```
 
 ## Expected Impact
-- Reduction in false positive alerts
-- Improved analyst efficiency
-- Maintained security coverage
+{expected_impact}
 
 ---
 *This PR was generated automatically by the DAC Agent based on SOAR case analysis.*
@@ -483,6 +979,8 @@ class DACWorkflowExecutor:
 ## Summary
 - **Cases Found**: {results.get('cases_found', 0)}
 - **Cases Processed**: {results.get('cases_processed', 0)}
+- **Cases Skipped (already processed)**: {results.get('cases_skipped', 0)}
+- **Tuning Batches**: {results.get('batches', 0)}
 - **Rules Tuned**: {results.get('rules_tuned', 0)}
 - **Pull Requests Created**: {results.get('prs_created', 0)}
 
@@ -511,5 +1009,5 @@ class DACWorkflowExecutor:
 *Report generated automatically by DAC Agent*
 """
         
-        self.write_report(report_name, report_content)
+        await self.write_report(report_name, report_content)
         logger.info(f"Workflow report generated: {report_name}")
\ No newline at end of file
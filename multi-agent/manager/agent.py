@@ -1,6 +1,7 @@
 import asyncio
 import logging
-from pathlib import Path
+import os
+import time
 
 from google.adk.agents import Agent
 
@@ -12,11 +13,82 @@ from .sub_agents.soc_analyst_tier3 import agent as soc_analyst_tier3_agent_modul
 from .sub_agents.incident_responder import agent as incident_responder_agent_module
 from .sub_agents.detection_engineer import agent as detection_engineer_agent_module
 
-from .tools.tools import get_current_time, write_report, get_agent_tools, load_persona_and_runbooks
+from .tools.tools import get_current_time, write_report, get_agent_tools
+from .tools.runbooks import RULES_BANK_DIR, get_runbook, list_runbooks, load_persona_with_runbook_toc
+from .tools.search_index import search_rules_bank
+from .utils.tool_filter import filter_tools_for_agent
 
 # Set the root logger to output debug messages
 logging.basicConfig(level=logging.ERROR)
 
+logger = logging.getLogger(__name__)
+# The root logger only passes errors; the init timings below are INFO and
+# would otherwise never be shown (MANAGER_LOG_LEVEL=WARNING hides them).
+logger.setLevel(os.environ.get("MANAGER_LOG_LEVEL", "INFO").upper())
+
+# Sub-agents in the order they are registered with the manager.
+SUB_AGENT_MODULES = (
+    ("soc_analyst_tier1", soc_analyst_tier1_agent_module),
+    ("soc_analyst_tier2", soc_analyst_tier2_agent_module),
+    ("cti_researcher", cti_researcher_agent_module),
+    ("threat_hunter", threat_hunter_agent_module),
+    ("soc_analyst_tier3", soc_analyst_tier3_agent_module),
+    ("incident_responder", incident_responder_agent_module),
+    ("detection_engineer", detection_engineer_agent_module),
+)
+
+# "concurrent" (default) builds all sub-agents at once; "sequential" restores
+# the one-at-a-time behaviour, which is easier to read in tracebacks.
+INIT_MODE = os.environ.get("MANAGER_INIT_MODE", "concurrent").lower()
+
+# Give each sub-agent only the MCP tools allowed for it in
+# config/tool_agent_mapping.yaml, instead of every SIEM/SOAR/GTI tool.
+TOOL_FILTERING = os.environ.get("MANAGER_TOOL_FILTERING", "true").lower() in ("1", "true", "yes")
+
+# Per-agent initialization timings (seconds) from the most recent manager init.
+last_init_timings = {}
+
+
+async def _timed(name, coro):
+    """Awaits `coro` and records how long it took under `name` in last_init_timings."""
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        last_init_timings[name] = time.perf_counter() - start
+
+
+async def initialize_sub_agents(shared_tools, shared_exit_stack, mode=None):
+    """Initializes all manager sub-agents using the shared tools.
+
+    Args:
+        shared_tools (tuple): The pre-initialized MCP toolsets and built-in tools.
+            Unless TOOL_FILTERING is off, each sub-agent receives only its
+            allowed tools (see utils/tool_filter.py).
+        shared_exit_stack (contextlib.AsyncExitStack): The shared exit stack.
+        mode (str, optional): "concurrent" or "sequential". Defaults to INIT_MODE.
+
+    Returns:
+        list: The initialized sub-agent instances, in SUB_AGENT_MODULES order.
+    """
+    mode = (mode or INIT_MODE).lower()
+
+    def agent_tools(name):
+        return filter_tools_for_agent(name, shared_tools) if TOOL_FILTERING else shared_tools
+
+    if mode == "sequential":
+        results = []
+        for name, module in SUB_AGENT_MODULES:
+            results.append(await _timed(name, module.initialize(agent_tools(name), shared_exit_stack)))
+    else:
+        # Each initialize() offloads its persona/runbook reads to a worker thread,
+        # so gathering them lets the file I/O overlap instead of adding up.
+        results = await asyncio.gather(*(
+            _timed(name, module.initialize(agent_tools(name), shared_exit_stack))
+            for name, module in SUB_AGENT_MODULES
+        ))
+    return [agent_instance for agent_instance, _ in results]
+
 
 # This function will perform the actual asynchronous initialization of the manager Agent
 async def initialize_actual_manager_agent():
@@ -32,51 +104,61 @@ async def initialize_actual_manager_agent():
     Returns:
         Agent: The fully configured and initialized Manager Agent instance.
     """
+    last_init_timings.clear()
+    init_start = time.perf_counter()
+
     # Call get_agent_tools once
-    shared_tools, shared_exit_stack = await get_agent_tools()
+    shared_tools, shared_exit_stack = await _timed("shared_tools", get_agent_tools())
 
-    # Initialize sub-agents that require async initialization first, passing shared tools and exit_stack
-    initialized_soc_analyst_tier1, _ = await soc_analyst_tier1_agent_module.initialize(shared_tools, shared_exit_stack)
-    initialized_soc_analyst_tier2, _ = await soc_analyst_tier2_agent_module.initialize(shared_tools, shared_exit_stack)
-    initialized_cti_researcher, _ = await cti_researcher_agent_module.initialize(shared_tools, shared_exit_stack)
-    initialized_threat_hunter, _ = await threat_hunter_agent_module.initialize(shared_tools, shared_exit_stack)
-    initialized_soc_analyst_tier3, _ = await soc_analyst_tier3_agent_module.initialize(shared_tools, shared_exit_stack)
-    initialized_incident_responder, _ = await incident_responder_agent_module.initialize(shared_tools, shared_exit_stack)
-    initialized_detection_engineer, _ = await detection_engineer_agent_module.initialize(shared_tools, shared_exit_stack)
+    # Every agent can pull runbooks on demand instead of carrying them all in context.
+    shared_tools = (*shared_tools, list_runbooks, get_runbook, search_rules_bank)
 
     # The shared_exit_stack will manage all resources. Individual stacks from sub-agents are not needed here.
-    BASE_DIR = Path(__file__).resolve().parent
-    persona_file_path = (BASE_DIR / "../../../adk_runbooks/rules-bank/personas/soc_manager.md").resolve()
-    runbook_files = [
+    persona_file_path = RULES_BANK_DIR / "personas" / "soc_manager.md"
+    # The manager's description carries only a table of contents of these;
+    # the full text is fetched with get_runbook when an IRP is invoked.
+    runbook_ids = [
         # Guidelines
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/guidelines/report_writing.md").resolve(),
+        "run_books/guidelines/report_writing",
         # IRPs
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/irps/compromised_user_account_response.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/irps/phishing_response.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/irps/ransomware_response.md").resolve(),
+        "run_books/irps/compromised_user_account_response",
+        "run_books/irps/malware_incident_response",
+        "run_books/irps/phishing_response",
+        "run_books/irps/ransomware_response",
         # Runbooks
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/triage_alerts.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/prioritize_and_investigate_a_case.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/close_duplicate_or_similar_cases.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/basic_ioc_enrichment.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/suspicious_login_triage.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/investgate_a_case_w_external_tools.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/ioc_containment.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/basic_endpoint_triage_isolation.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/deep_dive_ioc_analysis.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/malware_triage.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/guided_ttp_hunt_credential_access.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/lateral_movement_hunt_psexec_wmi.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/advanced_threat_hunting.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/detection_rule_validation_tuning.md").resolve(),
-        (BASE_DIR / "../../../adk_runbooks/rules-bank/run_books/create_an_investigation_report.md").resolve(),
-
+        "run_books/triage_alerts",
+        "run_books/prioritize_and_investigate_a_case",
+        "run_books/close_duplicate_or_similar_cases",
+        "run_books/basic_ioc_enrichment",
+        "run_books/suspicious_login_triage",
+        "run_books/investigate_a_case_w_external_tools",
+        "run_books/ioc_containment",
+        "run_books/basic_endpoint_triage_isolation",
+        "run_books/deep_dive_ioc_analysis",
+        "run_books/malware_triage",
+        "run_books/guided_ttp_hunt_credential_access",
+        "run_books/lateral_movement_hunt_psexec_wmi",
+        "run_books/advanced_threat_hunting",
+        "run_books/detection_rule_validation_tuning",
+        "run_books/create_an_investigation_report",
     ]
 
-    persona_description = load_persona_and_runbooks(
-        persona_file_path,
-        runbook_files,
-        default_persona_description="SOC Manager: Responsible for delegating to other agents and writing reports."
+    # Load the manager persona while the sub-agents are being built.
+    persona_description, sub_agents = await asyncio.gather(
+        _timed("manager_persona", asyncio.to_thread(
+            load_persona_with_runbook_toc,
+            persona_file_path,
+            runbook_ids,
+            default_persona_description="SOC Manager: Responsible for delegating to other agents and writing reports."
+        )),
+        initialize_sub_agents(shared_tools, shared_exit_stack),
+    )
+    last_init_timings["total"] = time.perf_counter() - init_start
+    logger.info(
+        "Manager initialized in %.3fs (%s mode): %s",
+        last_init_timings["total"],
+        INIT_MODE,
+        ", ".join(f"{name}={seconds:.3f}s" for name, seconds in last_init_timings.items()),
     )
 
     return Agent(
@@ -90,7 +172,7 @@ async def initialize_actual_manager_agent():
 
         **Incident Response Plan (IRP) Execution:**
         When an IRP is invoked (e.g., "Start Malware IRP for CASE_ID 123"):
-        1.  Your **first priority** is to understand the active IRP. The IRP details, including phases, steps, and responsible personas, are part of your contextual description.
+        1.  Your **first priority** is to understand the active IRP. Your contextual description lists the available IRPs and runbooks; load the active IRP with `get_runbook` (e.g., `get_runbook("run_books/irps/malware_incident_response")`) to see its phases, steps, and responsible personas. Fetch a single `section` when you only need one phase.
         2.  You **MUST** meticulously follow the IRP. For each step, identify the `**Responsible Persona(s):**` as specified in the IRP.
         3.  Delegate tasks **strictly according to these IRP assignments**. For example, if the IRP says "SOC Analyst T1" is responsible for initial triage, you delegate that to the `soc_analyst_tier1` sub-agent.
         4.  Ensure that control returns to you after a sub-agent completes its delegated IRP task. You will then consult the IRP for the next step and delegate to the next responsible persona.
@@ -111,21 +193,18 @@ async def initialize_actual_manager_agent():
         You have direct access to these tools for oversight and reporting:
         - get_current_time
         - write_report
+        - list_runbooks / get_runbook: Browse and load IRPs, runbooks, and guidelines on demand
+        - search_rules_bank: Ranked full-text search across all personas, runbooks, tool references, and detection use cases
 
         Always aim for clear, coordinated, and efficient execution of security operations, leveraging your sub-agents effectively according to their roles and the active IRP.
         """,
-        sub_agents=[
-            initialized_soc_analyst_tier1,
-            initialized_soc_analyst_tier2,
-            initialized_cti_researcher,
-            initialized_threat_hunter,
-            initialized_soc_analyst_tier3,
-            initialized_incident_responder,
-            initialized_detection_engineer,
-        ],
+        sub_agents=sub_agents,
         tools=[
             get_current_time,
             write_report,
+            list_runbooks,
+            get_runbook,
+            search_rules_bank,
         ],
     )
 
@@ -0,0 +1 @@
+"""Declarative agent configuration (tool-to-agent mapping)."""
@@ -0,0 +1,71 @@
+"""Loads the declarative agent configuration in this directory."""
+import os
+import threading
+from pathlib import Path
+
+import yaml
+
+CONFIG_DIR = Path(__file__).resolve().parent
+TOOL_AGENT_MAPPING_PATH = Path(os.environ.get(
+    "MANAGER_TOOL_MAPPING", CONFIG_DIR / "tool_agent_mapping.yaml"
+))
+
+_mapping_cache = {}
+_mapping_lock = threading.Lock()
+
+
+def load_tool_agent_mapping(path=TOOL_AGENT_MAPPING_PATH) -> dict:
+  """Loads (and caches) the tool-to-agent mapping.
+
+  Args:
+      path: Path to tool_agent_mapping.yaml.
+
+  Returns:
+      dict: The parsed mapping, or an empty dict if the file does not exist.
+  """
+  path = Path(path)
+  try:
+    mtime = path.stat().st_mtime_ns
+  except FileNotFoundError:
+    print(f"Warning: Tool-agent mapping not found at {path}. Agents get all tools.")
+    return {}
+  with _mapping_lock:
+    cached = _mapping_cache.get(path)
+    if cached and cached[0] == mtime:
+      return cached[1]
+  with open(path, "r") as f:
+    mapping = yaml.safe_load(f) or {}
+  with _mapping_lock:
+    _mapping_cache[path] = (mtime, mapping)
+  return mapping
+
+
+def get_agent_tool_allowlist(agent_name: str, mapping=None):
+  """Returns the MCP tools an agent may use, per toolset.
+
+  Args:
+      agent_name: The sub-agent name, e.g. "incident_responder".
+      mapping: A parsed tool-agent mapping. Defaults to load_tool_agent_mapping().
+
+  Returns:
+      dict | None: None if the agent is not in the mapping (no filtering).
+          Otherwise maps each toolset name to None (every tool) or a frozenset
+          of tool names; toolsets that are absent are not given to the agent.
+  """
+  if mapping is None:
+    mapping = load_tool_agent_mapping()
+  allowlist = {}
+  for toolset, entry in (mapping.get("toolset_mappings") or {}).items():
+    if agent_name in (entry or {}).get("agents", []):
+      allowlist[toolset] = None
+  for toolset, tools in (mapping.get("tool_mappings") or {}).items():
+    if toolset in allowlist and allowlist[toolset] is None:
+      continue
+    names = {
+        tool_name for tool_name, entry in (tools or {}).items()
+        if agent_name in (entry or {}).get("primary_agents", [])
+        or agent_name in (entry or {}).get("secondary_agents", [])
+    }
+    if names:
+      allowlist[toolset] = frozenset(names)
+  return allowlist or None
@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 from google.adk.agents import Agent
 
@@ -83,5 +84,5 @@ async def initialize(shared_tools, shared_exit_stack):
     Raises:
         Exception: Propagates any exceptions encountered during agent creation.
     """
-    agent_instance = get_agent(shared_tools, shared_exit_stack) # Call synchronous get_agent
+    agent_instance = await asyncio.to_thread(get_agent, shared_tools, shared_exit_stack) # Build off the event loop (file I/O)
     return agent_instance, shared_exit_stack # Return agent and the shared_exit_stack
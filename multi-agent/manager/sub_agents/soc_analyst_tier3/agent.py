@@ -1,3 +1,4 @@
+import asyncio
 from pathlib import Path
 from google.adk.agents import Agent
 
@@ -71,7 +72,7 @@ async def initialize(shared_tools, shared_exit_stack):
         Exception: Propagates any exceptions encountered during agent creation.
     """
     try:
-      agent_instance = get_agent(shared_tools, shared_exit_stack) # Call synchronous get_agent
+      agent_instance = await asyncio.to_thread(get_agent, shared_tools, shared_exit_stack) # Build off the event loop (file I/O)
       return agent_instance, shared_exit_stack # Return agent and the shared_exit_stack
     except Exception as e:
       # Log the error or handle it appropriately
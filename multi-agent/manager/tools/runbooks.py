@@ -0,0 +1,238 @@
+"""On-demand runbook retrieval for the manager and its sub-agents.
+
+Instead of appending every runbook to an agent's description, agents carry a
+compact table of contents and call `get_runbook` to pull in the runbook (or a
+single section of it) they actually need for the current step.
+"""
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .tools import load_persona_and_runbooks, read_cached_file
+
+RULES_BANK_DIR = Path(__file__).resolve().parents[3] / "rules-bank"
+
+# Directories (relative to rules-bank) that are indexed. common_steps lives
+# under run_books and is picked up by the recursive walk.
+RUNBOOK_ROOTS = ("run_books", "atomic_runbooks")
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+
+@dataclass
+class RunbookSection:
+  """A heading within a runbook and the character span it covers."""
+  heading: str
+  level: int
+  start: int
+  end: int
+
+
+@dataclass
+class RunbookEntry:
+  """A single indexed runbook file."""
+  runbook_id: str
+  path: str
+  title: str
+  sections: list = field(default_factory=list)
+
+
+def parse_markdown_sections(text: str) -> list:
+  """Splits markdown text into heading-delimited sections.
+
+  Headings inside fenced code blocks are ignored. Each section spans from its
+  heading up to the next heading of the same or a higher level, so a section
+  includes its own sub-sections.
+
+  Args:
+      text: The markdown document.
+
+  Returns:
+      list[RunbookSection]: Sections in document order.
+  """
+  headings = []
+  offset = 0
+  in_fence = False
+  for line in text.splitlines(keepends=True):
+    stripped = line.strip()
+    if stripped.startswith("```") or stripped.startswith("~~~"):
+      in_fence = not in_fence
+    elif not in_fence:
+      match = _HEADING_RE.match(stripped)
+      if match:
+        headings.append((len(match.group(1)), match.group(2), offset))
+    offset += len(line)
+
+  sections = []
+  for i, (level, heading, start) in enumerate(headings):
+    end = len(text)
+    for next_level, _, next_start in headings[i + 1:]:
+      if next_level <= level:
+        end = next_start
+        break
+    sections.append(RunbookSection(heading=heading, level=level, start=start, end=end))
+  return sections
+
+
+class RunbookIndex:
+  """An index of runbook files by id, file name and title."""
+
+  def __init__(self, rules_bank_dir=RULES_BANK_DIR, roots=RUNBOOK_ROOTS):
+    self.rules_bank_dir = Path(rules_bank_dir)
+    self.entries = {}
+    self._aliases = {}
+    for root in roots:
+      self._index_tree(self.rules_bank_dir / root)
+
+  def _index_tree(self, root: Path):
+    for dirpath, _dirs, files in os.walk(root):
+      for file_name in sorted(files):
+        # index.md files are Sphinx toctrees, not runbooks.
+        if not file_name.endswith(".md") or file_name == "index.md":
+          continue
+        path = Path(dirpath) / file_name
+        runbook_id = path.relative_to(self.rules_bank_dir).with_suffix("").as_posix()
+        text = read_cached_file(path)
+        sections = parse_markdown_sections(text)
+        title = sections[0].heading if sections else path.stem.replace("_", " ")
+        self.entries[runbook_id] = RunbookEntry(
+            runbook_id=runbook_id, path=str(path), title=title, sections=sections,
+        )
+        for alias in (runbook_id, path.stem, title):
+          self._aliases.setdefault(alias.lower(), runbook_id)
+
+  def resolve(self, name: str):
+    """Finds a runbook by id, file name (with or without .md) or title.
+
+    Args:
+        name: The runbook id, file stem or title. Case-insensitive.
+
+    Returns:
+        RunbookEntry | None: The matching runbook, if any.
+    """
+    key = name.strip().lower()
+    if key.endswith(".md"):
+      key = key[:-3]
+    runbook_id = self._aliases.get(key) or self._aliases.get(key.rsplit("/", 1)[-1])
+    return self.entries.get(runbook_id) if runbook_id else None
+
+  def table_of_contents(self, runbook_ids=None) -> str:
+    """Renders a compact markdown list of runbooks.
+
+    Args:
+        runbook_ids: Optional list of ids (or names) to include, in order.
+            Defaults to every indexed runbook.
+
+    Returns:
+        str: One line per runbook: its id and title.
+    """
+    if runbook_ids is None:
+      entries = list(self.entries.values())
+    else:
+      entries = [entry for entry in map(self.resolve, runbook_ids) if entry]
+    return "\n".join(f"- `{entry.runbook_id}`: {entry.title}" for entry in entries)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_runbook_index(refresh: bool = False) -> RunbookIndex:
+  """Returns the process-wide runbook index, building it on first use."""
+  global _index
+  with _index_lock:
+    if _index is None or refresh:
+      _index = RunbookIndex()
+    return _index
+
+
+def load_persona_with_runbook_toc(persona_file_path, runbook_ids: list, default_persona_description: str = "Default persona description.") -> str:
+  """Loads a persona and appends a table of contents of its runbooks.
+
+  This is the on-demand counterpart of `load_persona_and_runbooks`: the agent
+  sees which runbooks are relevant to it and fetches them with `get_runbook`.
+
+  Args:
+      persona_file_path: Path to the persona file.
+      runbook_ids: Runbook ids (or names) to list in the table of contents.
+      default_persona_description: Default description if persona file is not found.
+
+  Returns:
+      str: The persona description followed by the runbook table of contents.
+  """
+  persona_description = load_persona_and_runbooks(
+      persona_file_path, [], default_persona_description=default_persona_description
+  )
+  toc = get_runbook_index().table_of_contents(runbook_ids)
+  return (
+      f"{persona_description}\n\n## Available Runbooks\n\n"
+      "Load a runbook with `get_runbook(runbook_id)` (optionally with a `section` "
+      "heading) when you need its procedure. Use `list_runbooks` to see the full "
+      f"catalog.\n\n{toc}"
+  )
+
+
+def list_runbooks(category: str = "") -> dict:
+  """Lists the available runbooks, IRPs, atomic runbooks and common steps.
+
+  Args:
+      category (str): Optional filter on the runbook id prefix, e.g. "run_books/irps",
+          "atomic_runbooks/hash" or "run_books/common_steps". Empty for all.
+
+  Returns:
+      dict: "runbooks", a list of {"runbook_id", "title"} entries, and "count".
+  """
+  index = get_runbook_index()
+  prefix = category.strip().strip("/")
+  runbooks = [
+      {"runbook_id": entry.runbook_id, "title": entry.title}
+      for entry in index.entries.values()
+      if not prefix or entry.runbook_id.startswith(prefix)
+  ]
+  return {"runbooks": runbooks, "count": len(runbooks)}
+
+
+def get_runbook(runbook_id: str, section: str = "") -> dict:
+  """Fetches the contents of a runbook, or just one section of it.
+
+  Args:
+      runbook_id (str): The runbook id from the table of contents (e.g.
+          "run_books/irps/phishing_response"), its file name, or its title.
+      section (str): Optional heading (or part of one) to return only that
+          section and its sub-sections, e.g. "Containment".
+
+  Returns:
+      dict: "runbook_id", "title" and "content" on success. If the runbook or
+          section is not found, "error" plus the available choices.
+  """
+  index = get_runbook_index()
+  entry = index.resolve(runbook_id)
+  if entry is None:
+    return {
+        "error": f"Runbook '{runbook_id}' not found.",
+        "available_runbooks": sorted(index.entries),
+    }
+
+  text = read_cached_file(entry.path)
+  if not section:
+    return {"runbook_id": entry.runbook_id, "title": entry.title, "content": text}
+
+  # The cached spans may be stale if the file changed since indexing.
+  sections = parse_markdown_sections(text)
+  wanted = section.strip().lower()
+  match = next((s for s in sections if s.heading.lower() == wanted), None)
+  if match is None:
+    match = next((s for s in sections if wanted in s.heading.lower()), None)
+  if match is None:
+    return {
+        "error": f"Section '{section}' not found in runbook '{entry.runbook_id}'.",
+        "available_sections": [s.heading for s in sections],
+    }
+  return {
+      "runbook_id": entry.runbook_id,
+      "title": entry.title,
+      "section": match.heading,
+      "content": text[match.start:match.end],
+  }
@@ -0,0 +1,401 @@
+"""BM25 full-text search over the rules-bank markdown.
+
+The index is built offline (or on first use when missing or stale) into a
+single binary file and memory-mapped at load time, so queries only touch the
+postings of the query terms.
+
+Every markdown file under rules-bank (personas, runbooks, tool references,
+detection use cases, ...) is split into heading-delimited sections, and each
+section is indexed as its own document so results point at the relevant part
+of a file rather than the whole file.
+
+File layout (integers are little-endian):
+    8 bytes   magic (b"RBBM25\\x00\\x02")
+    8 bytes   uint64 length of the JSON header
+    N bytes   UTF-8 JSON header: fingerprint, BM25 parameters, the indexed
+              file paths and the section and term counts
+    padding   to a 4-byte boundary
+    uint32    section table, (file, start, end, length) per section
+    uint32    heading offsets, one per section plus an end offset
+    uint32    term offsets, one per term plus an end offset
+    uint32    term table, (postings offset, document frequency) per term
+    uint32    postings, (section id, term frequency) pairs
+    bytes     UTF-8 headings
+    bytes     UTF-8 terms, in sorted order
+
+Only the small header is parsed at load time; terms are looked up by binary
+search over the memory-mapped term table.
+
+Usage:
+    python -m manager.tools.search_index build
+    python -m manager.tools.search_index query "isolate endpoint" -k 5
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from .runbooks import RULES_BANK_DIR, parse_markdown_sections
+from .tools import read_cached_file
+
+INDEX_PATH = Path(os.environ.get(
+    "RULES_BANK_INDEX_PATH",
+    Path(__file__).resolve().parents[2] / ".cache" / "rules_bank.bm25",
+))
+
+_MAGIC = b"RBBM25\x00\x02"
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9_]*")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have if in into is it its of on or "
+    "that the their this to was were will with".split()
+)
+# Directories that hold build assets rather than content.
+_EXCLUDED_DIRS = {"_static", "_build"}
+
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: str) -> list:
+  """Lowercases and splits text into index terms, dropping stopwords."""
+  return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def _iter_markdown_files(rules_bank_dir: Path):
+  for dirpath, dirs, files in os.walk(rules_bank_dir):
+    dirs[:] = sorted(d for d in dirs if d not in _EXCLUDED_DIRS)
+    for file_name in sorted(files):
+      if file_name.endswith(".md"):
+        yield Path(dirpath) / file_name
+
+
+def corpus_fingerprint(rules_bank_dir=RULES_BANK_DIR) -> str:
+  """Hashes the path, mtime and size of every indexed file.
+
+  Used to tell whether a persisted index is still current without reading
+  any file contents.
+  """
+  rules_bank_dir = Path(rules_bank_dir)
+  digest = hashlib.sha256()
+  for path in _iter_markdown_files(rules_bank_dir):
+    stat = path.stat()
+    digest.update(f"{path.relative_to(rules_bank_dir)}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+  return digest.hexdigest()
+
+
+def _leaf_sections(text: str):
+  """Yields non-overlapping (heading, start, end) spans, one per heading.
+
+  Text before the first heading (or a file without headings) becomes a span
+  with an empty heading.
+  """
+  sections = parse_markdown_sections(text)
+  starts = [s.start for s in sections] + [len(text)]
+  if not sections or sections[0].start > 0:
+    yield "", 0, starts[0]
+  for i, section in enumerate(sections):
+    yield section.heading, section.start, starts[i + 1]
+
+
+def build_index(index_path=INDEX_PATH, rules_bank_dir=RULES_BANK_DIR) -> dict:
+  """Builds the BM25 index over rules-bank and writes it to `index_path`.
+
+  Args:
+      index_path: Where to write the index file.
+      rules_bank_dir: Root of the rules-bank to index.
+
+  Returns:
+      dict: Build statistics ("sections", "terms", "files", "seconds", "path").
+  """
+  start_time = time.perf_counter()
+  rules_bank_dir = Path(rules_bank_dir)
+  fingerprint = corpus_fingerprint(rules_bank_dir)
+
+  files = []
+  sections = array("I")
+  headings = []
+  postings = defaultdict(list)
+  for path in _iter_markdown_files(rules_bank_dir):
+    # Read the same way section() reads it, so the character offsets agree.
+    text = read_cached_file(path)
+    file_id = len(files)
+    files.append(path.relative_to(rules_bank_dir).as_posix())
+    for heading, start, end in _leaf_sections(text):
+      # The file name and heading are indexed with the body so that queries
+      # like "phishing response" hit the obvious section first.
+      terms = tokenize(f"{path.stem.replace('_', ' ')} {heading} {text[start:end]}")
+      if not terms:
+        continue
+      doc_id = len(headings)
+      sections.extend((file_id, start, end, len(terms)))
+      headings.append(heading)
+      for term, tf in Counter(terms).items():
+        postings[term].append((doc_id, tf))
+
+  vocabulary = sorted(postings, key=lambda term: term.encode("utf-8"))
+  heading_offsets, heading_bytes = _string_table(headings)
+  term_offsets, term_bytes = _string_table(vocabulary)
+  term_table = array("I")
+  data = array("I")
+  for term in vocabulary:
+    term_table.extend((len(data) // 2, len(postings[term])))
+    for doc_id, tf in postings[term]:
+      data.extend((doc_id, tf))
+  tables = sections + heading_offsets + term_offsets + term_table + data
+  if sys.byteorder != "little":
+    tables.byteswap()
+
+  total_length = sum(sections[3::4])
+  header = json.dumps({
+      "fingerprint": fingerprint,
+      "k1": K1,
+      "b": B,
+      "avgdl": total_length / len(headings) if headings else 0.0,
+      "files": files,
+      "sections": len(headings),
+      "terms": len(vocabulary),
+      "postings": len(data) // 2,
+  }, separators=(",", ":")).encode("utf-8")
+  padding = b"\x00" * (-(len(_MAGIC) + 8 + len(header)) % 4)
+
+  index_path = Path(index_path)
+  index_path.parent.mkdir(parents=True, exist_ok=True)
+  tmp_path = index_path.with_suffix(index_path.suffix + ".tmp")
+  with open(tmp_path, "wb") as f:
+    f.write(_MAGIC)
+    f.write(struct.pack("<Q", len(header)))
+    f.write(header)
+    f.write(padding)
+    f.write(tables.tobytes())
+    f.write(heading_bytes)
+    f.write(term_bytes)
+  os.replace(tmp_path, index_path)
+
+  return {
+      "path": str(index_path),
+      "files": len(files),
+      "sections": len(headings),
+      "terms": len(vocabulary),
+      "seconds": time.perf_counter() - start_time,
+  }
+
+
+def _string_table(strings) -> tuple:
+  """Encodes strings as UTF-8 into one blob plus n + 1 offsets into it."""
+  offsets = array("I", [0])
+  blob = bytearray()
+  for string in strings:
+    blob += string.encode("utf-8")
+    offsets.append(len(blob))
+  return offsets, bytes(blob)
+
+
+class SearchIndex:
+  """A read-only, memory-mapped BM25 index produced by `build_index`."""
+
+  def __init__(self, index_path=INDEX_PATH, rules_bank_dir=RULES_BANK_DIR):
+    self.index_path = Path(index_path)
+    self.rules_bank_dir = Path(rules_bank_dir)
+    with open(self.index_path, "rb") as f:
+      self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if self._mmap[:len(_MAGIC)] != _MAGIC:
+      self._mmap.close()
+      raise ValueError(f"{self.index_path} is not a rules-bank search index")
+    (header_length,) = struct.unpack_from("<Q", self._mmap, len(_MAGIC))
+    header_start = len(_MAGIC) + 8
+    header = json.loads(self._mmap[header_start:header_start + header_length].decode("utf-8"))
+    tables_start = header_start + header_length
+    tables_start += -tables_start % 4
+
+    self.fingerprint = header["fingerprint"]
+    self.k1 = header["k1"]
+    self.b = header["b"]
+    self.avgdl = header["avgdl"] or 1.0
+    self.files = header["files"]
+    self.n_docs = header["sections"]
+    self.n_terms = header["terms"]
+
+    n_docs, n_terms = self.n_docs, self.n_terms
+    tables_length = 4 * n_docs + (n_docs + 1) + (n_terms + 1) + 2 * n_terms + 2 * header["postings"]
+    if sys.byteorder == "little":
+      self._tables = memoryview(self._mmap)[tables_start:tables_start + 4 * tables_length].cast("I")
+    else:  # pragma: no cover - big-endian hosts copy and swap once.
+      self._tables = array("I", self._mmap[tables_start:tables_start + 4 * tables_length])
+      self._tables.byteswap()
+    tables = self._tables
+    self._sections = tables[:4 * n_docs]
+    tables = tables[4 * n_docs:]
+    self._heading_offsets = tables[:n_docs + 1]
+    tables = tables[n_docs + 1:]
+    self._term_offsets = tables[:n_terms + 1]
+    tables = tables[n_terms + 1:]
+    self._term_table = tables[:2 * n_terms]
+    self._postings = tables[2 * n_terms:]
+    self._headings_start = tables_start + 4 * tables_length
+    self._terms_start = self._headings_start + self._heading_offsets[n_docs]
+
+  def close(self):
+    """Releases the memory map."""
+    if isinstance(self._tables, memoryview):
+      for view in (self._sections, self._heading_offsets, self._term_offsets,
+                   self._term_table, self._postings, self._tables):
+        view.release()
+    self._mmap.close()
+
+  def _term(self, i: int) -> bytes:
+    start = self._terms_start + self._term_offsets[i]
+    return self._mmap[start:self._terms_start + self._term_offsets[i + 1]]
+
+  def lookup(self, term: str):
+    """Returns the (postings offset, document frequency) of a term, or None."""
+    key = term.encode("utf-8")
+    lo, hi = 0, self.n_terms
+    while lo < hi:
+      mid = (lo + hi) // 2
+      if self._term(mid) < key:
+        lo = mid + 1
+      else:
+        hi = mid
+    if lo == self.n_terms or self._term(lo) != key:
+      return None
+    return self._term_table[2 * lo], self._term_table[2 * lo + 1]
+
+  def search(self, query: str, max_results: int = 5) -> list:
+    """Ranks indexed sections against `query` with BM25.
+
+    Args:
+        query: Free-text query.
+        max_results: Maximum number of sections to return.
+
+    Returns:
+        list[tuple[float, int]]: (score, section id) pairs, best first.
+    """
+    n_docs = self.n_docs
+    scores = defaultdict(float)
+    for term in set(tokenize(query)):
+      entry = self.lookup(term)
+      if entry is None:
+        continue
+      offset, df = entry
+      idf = math.log((n_docs - df + 0.5) / (df + 0.5) + 1.0)
+      for i in range(2 * offset, 2 * (offset + df), 2):
+        doc_id = self._postings[i]
+        tf = self._postings[i + 1]
+        length_norm = 1 - self.b + self.b * self._sections[4 * doc_id + 3] / self.avgdl
+        scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * length_norm)
+    return heapq.nlargest(max_results, ((score, doc_id) for doc_id, score in scores.items()))
+
+  def section(self, doc_id: int) -> dict:
+    """Returns the location and text of an indexed section."""
+    file_id, start, end = (self._sections[4 * doc_id + i] for i in range(3))
+    path = self.files[file_id]
+    heading = self._mmap[self._headings_start + self._heading_offsets[doc_id]:
+                         self._headings_start + self._heading_offsets[doc_id + 1]].decode("utf-8")
+    text = read_cached_file(self.rules_bank_dir / path)
+    return {"path": path, "heading": heading, "content": text[start:end]}
+
+
+# How often (seconds) a loaded index re-checks the corpus for changes.
+STALENESS_CHECK_INTERVAL = 5.0
+
+_index = None
+_index_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+  """Returns the process-wide search index, (re)building it if it is stale."""
+  global _index, _index_checked_at
+  with _index_lock:
+    now = time.monotonic()
+    if _index is not None and now - _index_checked_at < STALENESS_CHECK_INTERVAL:
+      return _index
+    _index_checked_at = now
+    fingerprint = corpus_fingerprint()
+    if _index is not None and _index.fingerprint == fingerprint:
+      return _index
+    if _index is not None:
+      _index.close()
+      _index = None
+    try:
+      _index = SearchIndex()
+    except (FileNotFoundError, ValueError):
+      _index = None
+    if _index is None or _index.fingerprint != fingerprint:
+      if _index is not None:
+        _index.close()
+      build_index()
+      _index = SearchIndex()
+    return _index
+
+
+def search_rules_bank(query: str, max_results: int = 5, full_sections: bool = False) -> dict:
+  """Searches all rules-bank documentation and returns the best-matching sections.
+
+  Covers personas, runbooks, IRPs, atomic runbooks, MCP tool references,
+  detection use cases and guidelines. Use it to locate the right procedure,
+  then fetch the whole runbook with `get_runbook` if needed.
+
+  Args:
+      query (str): Free-text query, e.g. "isolate endpoint crowdstrike" or
+          "GTI collection IOC hunt".
+      max_results (int): Maximum number of sections to return (default 5).
+      full_sections (bool): Return the full section text instead of a
+          500-character snippet.
+
+  Returns:
+      dict: "results", a ranked list of {"path", "heading", "score", "content"},
+          and "count".
+  """
+  index = get_search_index()
+  results = []
+  for score, doc_id in index.search(query, max_results=max_results):
+    section = index.section(doc_id)
+    if not full_sections and len(section["content"]) > 500:
+      section["content"] = section["content"][:500] + "..."
+    section["score"] = round(score, 4)
+    results.append(section)
+  return {"query": query, "results": results, "count": len(results)}
+
+
+def main(argv=None):
+  """Command-line entry point for building and querying the index."""
+  parser = argparse.ArgumentParser(description="BM25 search over the rules-bank")
+  subparsers = parser.add_subparsers(dest="command", required=True)
+  subparsers.add_parser("build", help="(Re)build the on-disk index")
+  query_parser = subparsers.add_parser("query", help="Search the index")
+  query_parser.add_argument("query", help="Free-text query")
+  query_parser.add_argument("-k", "--max-results", type=int, default=5)
+  query_parser.add_argument("--json", action="store_true", help="Print results as JSON")
+  args = parser.parse_args(argv)
+
+  if args.command == "build":
+    stats = build_index()
+    print(f"Indexed {stats['sections']} sections from {stats['files']} files "
+          f"({stats['terms']} terms) in {stats['seconds']:.3f}s -> {stats['path']}")
+    return
+
+  start = time.perf_counter()
+  response = search_rules_bank(args.query, max_results=args.max_results)
+  elapsed_ms = (time.perf_counter() - start) * 1000
+  if args.json:
+    print(json.dumps(response, indent=2))
+    return
+  for rank, result in enumerate(response["results"], 1):
+    print(f"{rank}. [{result['score']:.2f}] {result['path']} :: {result['heading'] or '(top)'}")
+  print(f"{response['count']} results in {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+  main()
@@ -1,12 +1,21 @@
 from datetime import datetime
+import asyncio
 import contextlib
+import json
 import os
 import re
 from pathlib import Path
 
-from google.adk.tools.mcp_tool import MCPToolset, StdioConnectionParams
+from google.adk.tools.mcp_tool import StdioConnectionParams
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioServerParameters
 
+from ..utils.file_cache import cached_assembly, clear_file_cache, read_cached_file  # noqa: F401
+from ..utils.mcp_pool import PooledMCPToolset
+from ..utils.rate_limit import ToolsetLimiter
+from ..utils.singleflight import SingleFlight
+from ..utils.tool_cache import ToolResultCache
+from ..utils.tool_manifest import DEFAULT_MANIFEST_DIR, ToolManifestCache
+
 TIMEOUT = 60
 
 
@@ -65,6 +74,9 @@ def load_persona_and_runbooks(persona_file_path: str, runbook_files: list, defau
   """
   Loads persona description from a file and appends contents from runbook files.
 
+  Files are read through the process-wide cache (utils/file_cache.py), and the
+  description is reused while none of the files change on disk.
+
   Args:
       persona_file_path: Path to the persona file.
       runbook_files: A list of paths to runbook files.
@@ -73,48 +85,93 @@ def load_persona_and_runbooks(persona_file_path: str, runbook_files: list, defau
   Returns:
       A string containing the persona description and appended runbook contents.
   """
-  persona_description = ""
-  try:
-    with open(persona_file_path, 'r') as f:
-      persona_description = f.read()
-  except FileNotFoundError:
-    persona_description = default_persona_description
-    print(f"Warning: Persona file not found at {persona_file_path}. Using default description.")
-
-  for runbook_file in runbook_files:
+  def assemble():
+    persona_description = ""
     try:
-      with open(runbook_file, 'r') as f:
-        runbook_content = f.read()
-      persona_description += "\n\n" + runbook_content
+      persona_description = read_cached_file(persona_file_path)
     except FileNotFoundError:
-      print(f"Warning: Runbook file not found at {runbook_file}. Skipping.")
-  return persona_description
+      persona_description = default_persona_description
+      print(f"Warning: Persona file not found at {persona_file_path}. Using default description.")
 
-async def get_agent_tools():
-  """Initializes and returns MCP toolsets for SIEM, SOAR, and GTI functionalities.
+    for runbook_file in runbook_files:
+      try:
+        runbook_content = read_cached_file(runbook_file)
+        persona_description += "\n\n" + runbook_content
+      except FileNotFoundError:
+        print(f"Warning: Runbook file not found at {runbook_file}. Skipping.")
+    return persona_description
 
-  This function sets up connections to locally running MCP servers specified by
-  their command-line arguments. It manages the lifecycle of these connections
-  using an AsyncExitStack.
+  return cached_assembly([persona_file_path, *runbook_files], default_persona_description, assemble)
 
-  Assumes that the necessary MCP servers (SecOps, SecOps-SOAR, GTI) can be
-  started using the `uv run` commands with paths and environment files
-  as defined within this function.
+
+# Number of warm server processes kept per MCP toolset, and how often (seconds)
+# the pool pings them to replace crashed or hung servers.
+MCP_POOL_SIZE = int(os.environ.get("MCP_POOL_SIZE", "1"))
+MCP_HEALTH_CHECK_INTERVAL = float(os.environ.get("MCP_HEALTH_CHECK_INTERVAL", "30"))
+# "lazy" (default) launches a toolset's servers the first time one of its tools
+# is listed or invoked; "warm" launches every toolset during initialization.
+MCP_START_MODE = os.environ.get("MCP_START_MODE", "lazy").lower()
+# Maximum number of cached read-only tool results shared by all toolsets
+# (0 disables the cache). Per-tool TTLs live in utils/tool_cache.py.
+MCP_RESULT_CACHE_SIZE = int(os.environ.get("MCP_RESULT_CACHE_SIZE", "1024"))
+
+tool_result_cache = ToolResultCache(max_entries=MCP_RESULT_CACHE_SIZE) if MCP_RESULT_CACHE_SIZE > 0 else None
+# Coalesce concurrent identical read-only calls from different agents/cases.
+MCP_COALESCE_CALLS = os.environ.get("MCP_COALESCE_CALLS", "true").lower() in ("1", "true", "yes")
+
+tool_single_flight = SingleFlight() if MCP_COALESCE_CALLS else None
+
+# Per-toolset (and per-tool) limits on concurrent calls and requests per second,
+# kept under the vendor quotas; see utils/rate_limit.py for the format. Set
+# MCP_RATE_LIMITS to a JSON file with the same structure to override them.
+DEFAULT_MCP_RATE_LIMITS = {
+  "secops": {
+    "max_concurrency": 8,
+    "rate": 10,
+    "tools": {
+      "search_security_events": {"max_concurrency": 2, "rate": 1},
+    },
+  },
+  "secops_soar": {"max_concurrency": 8, "rate": 10},
+  "gti": {"max_concurrency": 4, "rate": 4},
+}
+
+
+# Cache each server's tool listing on disk (under MCP_TOOL_MANIFEST_DIR) so agents
+# get their tool schemas without waiting for the servers to start. Entries are
+# invalidated when the server's code or lockfile changes.
+MCP_TOOL_MANIFEST_CACHE = os.environ.get("MCP_TOOL_MANIFEST_CACHE", "true").lower() in ("1", "true", "yes")
+MCP_TOOL_MANIFEST_DIR = os.environ.get("MCP_TOOL_MANIFEST_DIR", str(DEFAULT_MANIFEST_DIR))
+
+tool_manifest_cache = ToolManifestCache(MCP_TOOL_MANIFEST_DIR) if MCP_TOOL_MANIFEST_CACHE else None
+
+
+def load_rate_limits() -> dict:
+  """Returns the MCP rate-limit config from MCP_RATE_LIMITS or the defaults."""
+  limits_file = os.environ.get("MCP_RATE_LIMITS")
+  if not limits_file:
+    return DEFAULT_MCP_RATE_LIMITS
+  try:
+    with open(limits_file, "r") as f:
+      return json.load(f)
+  except (OSError, ValueError) as e:
+    print(f"Warning: Could not load MCP rate limits from {limits_file}: {e}. Using defaults.")
+    return DEFAULT_MCP_RATE_LIMITS
+
+
+def get_mcp_connection_params() -> dict:
+  """Returns the stdio connection parameters for each MCP security server.
 
   Returns:
-      tuple: A tuple containing:
-          - tuple: A combined tuple of all initialized MCP toolsets and built-in tools.
-          - contextlib.AsyncExitStack: The exit stack managing the MCP server connections.
+      dict: Maps the toolset name ("secops", "secops_soar", "gti") to the
+          StdioConnectionParams used to launch one server process.
   """
-  common_exit_stack = contextlib.AsyncExitStack()
-  
   # Get the base path of the project (adk_runbooks directory)
   base_path = Path(__file__).resolve().parent.parent.parent.parent
   mcp_security_path = base_path / "external" / "mcp-security"
 
-  # Create MCPToolset instances using the new constructor
-  siem_toolset = MCPToolset(
-    connection_params=StdioConnectionParams(
+  return {
+    "secops": StdioConnectionParams(
       server_params=StdioServerParameters(
         command='uv',
         args=[
@@ -127,11 +184,8 @@ async def get_agent_tools():
           ],
         ),
       timeout=TIMEOUT,
-    )
-  )
-
-  soar_toolset = MCPToolset(
-    connection_params=StdioConnectionParams(
+    ),
+    "secops_soar": StdioConnectionParams(
       server_params=StdioServerParameters(
         command='uv',
         args=[
@@ -145,12 +199,9 @@ async def get_agent_tools():
             "CSV,GoogleChronicle,Siemplify,SiemplifyUtilities"
           ],
         ),
-    timeout=TIMEOUT,
-    )
-  )
-
-  gti_toolset = MCPToolset(
-    connection_params=StdioConnectionParams(
+      timeout=TIMEOUT,
+    ),
+    "gti": StdioConnectionParams(
       server_params=StdioServerParameters(
         command='uv',
         args=[
@@ -163,19 +214,58 @@ async def get_agent_tools():
             "server.py"
           ],
         ),
-    timeout=TIMEOUT,
+      timeout=TIMEOUT,
+    ),
+  }
+
+
+async def get_agent_tools():
+  """Initializes and returns MCP toolsets for SIEM, SOAR, and GTI functionalities.
+
+  Each toolset is a PooledMCPToolset over the servers defined in
+  get_mcp_connection_params, configured by the MCP_* settings above (pool
+  size, start mode, result cache, call coalescing, rate limits and tool
+  manifest cache). It manages the lifecycle of the pools using an
+  AsyncExitStack.
+
+  Assumes that the necessary MCP servers (SecOps, SecOps-SOAR, GTI) can be
+  started using the `uv run` commands with paths and environment files
+  as defined in get_mcp_connection_params.
+
+  Returns:
+      tuple: A tuple containing:
+          - tuple: A combined tuple of all initialized MCP toolsets and built-in tools.
+          - contextlib.AsyncExitStack: The exit stack managing the MCP server connections.
+  """
+  common_exit_stack = contextlib.AsyncExitStack()
+  rate_limits = load_rate_limits()
+
+  toolsets = {
+    name: PooledMCPToolset(
+      name=name,
+      connection_params=connection_params,
+      pool_size=MCP_POOL_SIZE,
+      health_check_interval=MCP_HEALTH_CHECK_INTERVAL,
+      result_cache=tool_result_cache,
+      single_flight=tool_single_flight,
+      limiter=ToolsetLimiter.from_config(rate_limits.get(name)),
+      manifest_cache=tool_manifest_cache,
     )
-  )
+    for name, connection_params in get_mcp_connection_params().items()
+  }
 
   # Register toolsets for cleanup
-  common_exit_stack.push_async_callback(siem_toolset.close)
-  common_exit_stack.push_async_callback(soar_toolset.close)
-  common_exit_stack.push_async_callback(gti_toolset.close)
+  for toolset in toolsets.values():
+    common_exit_stack.push_async_callback(toolset.close)
+
+  if MCP_START_MODE == "warm":
+    # Warm every pool up front so tool calls never pay the `uv run` spawn cost.
+    await asyncio.gather(*(toolset.start() for toolset in toolsets.values()))
 
   return (
-      siem_toolset,
-      soar_toolset,
-      gti_toolset,
+      toolsets["secops"],
+      toolsets["secops_soar"],
+      toolsets["gti"],
       write_report,
       get_current_time,
   ), common_exit_stack
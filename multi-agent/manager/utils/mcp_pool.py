@@ -0,0 +1,466 @@
+"""Warm, health-checked pools of MCP server processes.
+
+`PooledMCPToolset` is a drop-in replacement for ADK's `MCPToolset`. Instead of
+one lazily spawned server it keeps `pool_size` server processes running,
+pings them periodically and replaces any that crash or stop answering. The
+`MCPTool`s it hands to agents route every call to the least-busy healthy
+server, so a single hung process does not stall the agents using that toolset.
+
+Pools can be started eagerly with `start()` (warm) or left alone, in which case
+the servers are launched the first time one of the toolset's tools is listed
+or invoked, and the launch time is recorded in `stats()`.
+
+Each server's stdio transport is opened and closed inside its own long-lived
+task; the MCP client's anyio cancel scopes must be exited by the task that
+entered them, which is also why members are never closed from the health
+checker directly.
+"""
+import asyncio
+import logging
+import sys
+import time
+from typing import List, Optional, TextIO, Union
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset, ToolPredicate
+from google.adk.tools.mcp_tool.mcp_session_manager import MCPSessionManager
+from google.adk.tools.mcp_tool.mcp_tool import MCPTool
+
+from .rate_limit import ToolsetLimiter
+from .singleflight import SingleFlight
+from .tool_cache import READ_ONLY_TOOLS, ToolResultCache, tool_call_key
+from .tool_manifest import ToolManifestCache, server_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+class MCPPoolUnavailableError(RuntimeError):
+  """Raised when no server in a pool can be started."""
+
+
+class _PoolMember:
+  """A single MCP server process owned by a pool."""
+
+  def __init__(self, pool_name: str, member_id: int, connection_params, errlog: TextIO):
+    self.pool_name = pool_name
+    self.member_id = member_id
+    self._connection_params = connection_params
+    self._errlog = errlog
+    self.session = None
+    self.in_flight = 0
+    self.healthy = False
+    self.started_at = None
+    self.startup_seconds = None
+    self._task = None
+    self._stop = None
+
+  @property
+  def label(self) -> str:
+    return f"{self.pool_name}[{self.member_id}]"
+
+  async def start(self, timeout: float):
+    """Spawns the server and waits for the MCP handshake to complete."""
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    self._stop = asyncio.Event()
+    start = time.perf_counter()
+    self._task = asyncio.create_task(self._run(ready), name=f"mcp-pool-{self.label}")
+    try:
+      self.session = await asyncio.wait_for(asyncio.shield(ready), timeout)
+    except BaseException:
+      await self.stop()
+      raise
+    self.startup_seconds = time.perf_counter() - start
+    self.started_at = time.time()
+    self.healthy = True
+
+  async def _run(self, ready: asyncio.Future):
+    session_manager = MCPSessionManager(
+        connection_params=self._connection_params, errlog=self._errlog,
+    )
+    try:
+      ready.set_result(await session_manager.create_session())
+      await self._stop.wait()
+    except asyncio.CancelledError:
+      if not ready.done():
+        ready.cancel()
+      raise
+    except Exception as e:
+      if not ready.done():
+        ready.set_exception(e)
+      else:
+        logger.warning("MCP server %s exited: %s", self.label, e)
+    finally:
+      self.healthy = False
+      await session_manager.close()
+
+  async def ping(self, timeout: float) -> bool:
+    """Returns True if the server answers an MCP ping within `timeout`."""
+    if not self.healthy or self.session is None:
+      return False
+    try:
+      await asyncio.wait_for(self.session.send_ping(), timeout)
+      return True
+    except Exception:
+      return False
+
+  async def stop(self, timeout: float = 5.0):
+    """Closes the session and terminates the server process."""
+    self.healthy = False
+    self.session = None
+    if self._task is None:
+      return
+    self._stop.set()
+    try:
+      await asyncio.wait_for(asyncio.shield(self._task), timeout)
+    except (asyncio.TimeoutError, Exception):
+      # A hung server that ignores the shutdown gets its owner task cancelled.
+      self._task.cancel()
+      try:
+        await self._task
+      except BaseException:
+        pass
+    self._task = None
+
+
+class _PooledSession:
+  """The session object MCPTools see; routes each tool call through the pool.
+
+  A server is only chosen when a call is actually dispatched, so calls
+  answered from the pool's result cache never touch (or launch) a server.
+  """
+
+  def __init__(self, pool: "PooledMCPToolset"):
+    self._pool = pool
+
+  async def call_tool(self, name: str, arguments=None, **kwargs):
+    return await self._pool.call_tool(name, arguments, **kwargs)
+
+  def __getattr__(self, attr):
+    member = self._pool._pick_member()
+    if member is None:
+      raise AttributeError(attr)
+    return getattr(member.session, attr)
+
+
+class _PoolSessionManager:
+  """The session manager given to MCPTools; hands out pooled sessions.
+
+  MCPTool calls `close()` followed by `create_session()` when it sees a closed
+  transport, so `close()` here triggers a health check of the pool instead of
+  shutting it down.
+  """
+
+  def __init__(self, pool: "PooledMCPToolset"):
+    self._pool = pool
+
+  async def create_session(self, headers=None):
+    return _PooledSession(self._pool)
+
+  async def close(self):
+    await self._pool.check_health()
+
+
+class PooledMCPToolset(BaseToolset):
+  """An MCP toolset backed by a pool of warm, health-checked server processes."""
+
+  def __init__(
+      self,
+      *,
+      name: str,
+      connection_params,
+      pool_size: int = 1,
+      health_check_interval: float = 30.0,
+      ping_timeout: float = 5.0,
+      startup_timeout: float = 120.0,
+      tool_filter: Optional[Union[ToolPredicate, List[str]]] = None,
+      result_cache: Optional[ToolResultCache] = None,
+      single_flight: Optional[SingleFlight] = None,
+      idempotent_tools=READ_ONLY_TOOLS,
+      limiter: Optional[ToolsetLimiter] = None,
+      manifest_cache: Optional[ToolManifestCache] = None,
+      errlog: TextIO = sys.stderr,
+  ):
+    """Initializes the pool. No servers are started until `start()`.
+
+    Args:
+        name: Short name used in logs and stats (e.g. "secops").
+        connection_params: ADK connection params for one server process.
+        pool_size: Number of server processes to keep running.
+        health_check_interval: Seconds between background health checks.
+            0 disables the background checker.
+        ping_timeout: Seconds a server has to answer a ping.
+        startup_timeout: Seconds a server has to complete the MCP handshake.
+        tool_filter: Optional tool names or predicate, as for MCPToolset.
+        result_cache: Optional ToolResultCache for read-only tool results.
+            May be shared between toolsets; keys include the toolset name.
+        single_flight: Optional SingleFlight that coalesces concurrent
+            identical calls to idempotent tools onto one upstream request.
+        idempotent_tools: Tool names that are safe to coalesce.
+        limiter: Optional ToolsetLimiter bounding concurrent calls and
+            requests per second; calls over the limit queue for a slot.
+        manifest_cache: Optional ToolManifestCache. When it holds a current
+            listing for this server, get_tools() answers from disk and the
+            servers are launched in the background.
+        errlog: Stream that receives the servers' stderr.
+    """
+    super().__init__(tool_filter=tool_filter)
+    self.name = name
+    self._connection_params = connection_params
+    self.pool_size = max(1, pool_size)
+    self.health_check_interval = health_check_interval
+    self.ping_timeout = ping_timeout
+    self.startup_timeout = startup_timeout
+    self._errlog = errlog
+    self.result_cache = result_cache
+    self.single_flight = single_flight
+    self.idempotent_tools = frozenset(idempotent_tools)
+    self.limiter = limiter
+    self.manifest_cache = manifest_cache
+    self._members = []
+    self._next_member_id = 0
+    self._session_manager = _PoolSessionManager(self)
+    self._lock = asyncio.Lock()
+    self._started = False
+    self._closed = False
+    self._health_task = None
+    self._tool_listing = None
+    self._listing_lock = asyncio.Lock()
+    self._fingerprint = None
+    self._refresh_task = None
+    self.tool_listing_source = None
+    self.restarts = 0
+    self.failed_starts = 0
+    self.launch_seconds = None
+    self.launched_on_demand = False
+
+  @property
+  def started(self) -> bool:
+    """Whether the pool's servers have been launched."""
+    return self._started
+
+  async def start(self, on_demand: bool = False):
+    """Starts the pool's servers concurrently and the background health checker.
+
+    Servers that fail to start are logged and retried by the health checker;
+    this method never raises for individual server failures.
+
+    Args:
+        on_demand: Set when the launch is triggered by first use rather than
+            an explicit warm-up; recorded in stats().
+    """
+    async with self._lock:
+      if self._started or self._closed:
+        return
+      self._started = True
+      launch_start = time.perf_counter()
+      await asyncio.gather(*(self._add_member() for _ in range(self.pool_size)))
+      self.launch_seconds = time.perf_counter() - launch_start
+      self.launched_on_demand = on_demand
+      logger.info(
+          "MCP pool %s launched %sin %.2fs",
+          self.name, "on first use " if on_demand else "", self.launch_seconds,
+      )
+      if self.health_check_interval > 0:
+        self._health_task = asyncio.create_task(
+            self._health_loop(), name=f"mcp-pool-{self.name}-health"
+        )
+
+  async def _add_member(self) -> Optional[_PoolMember]:
+    member = _PoolMember(self.name, self._next_member_id, self._connection_params, self._errlog)
+    self._next_member_id += 1
+    try:
+      await member.start(self.startup_timeout)
+    except Exception as e:
+      self.failed_starts += 1
+      logger.warning("MCP server %s failed to start: %s", member.label, e)
+      return None
+    logger.info("MCP server %s ready in %.2fs", member.label, member.startup_seconds)
+    self._members.append(member)
+    return member
+
+  async def _replace_member(self, member: _PoolMember):
+    if member in self._members:
+      self._members.remove(member)
+    logger.warning("Replacing unhealthy MCP server %s", member.label)
+    self.restarts += 1
+    await member.stop()
+    await self._add_member()
+
+  async def check_health(self):
+    """Pings every server, replaces dead ones and tops the pool back up."""
+    async with self._lock:
+      if self._closed:
+        return
+      results = await asyncio.gather(*(m.ping(self.ping_timeout) for m in self._members))
+      dead = [m for m, ok in zip(self._members, results) if not ok]
+      for member in dead:
+        await self._replace_member(member)
+      missing = self.pool_size - len(self._members)
+      if missing > 0:
+        await asyncio.gather(*(self._add_member() for _ in range(missing)))
+
+  async def _health_loop(self):
+    while not self._closed:
+      await asyncio.sleep(self.health_check_interval)
+      try:
+        await self.check_health()
+      except Exception as e:
+        logger.error("Health check for MCP pool %s failed: %s", self.name, e)
+
+  def _pick_member(self) -> Optional[_PoolMember]:
+    healthy = [m for m in self._members if m.healthy]
+    return min(healthy, key=lambda m: m.in_flight) if healthy else None
+
+  async def acquire(self) -> _PoolMember:
+    """Returns the least-busy healthy server in the pool, starting it if needed.
+
+    Raises:
+        MCPPoolUnavailableError: If no server is healthy and none can be started.
+    """
+    if not self._started:
+      await self.start(on_demand=True)
+    member = self._pick_member()
+    if member is None:
+      await self.check_health()
+      member = self._pick_member()
+      if member is None:
+        raise MCPPoolUnavailableError(f"No healthy MCP server available for {self.name}")
+    return member
+
+  async def call_tool(self, name: str, arguments=None, **kwargs):
+    """Calls a tool on one of the pool's servers.
+
+    Results of cacheable read-only tools are served from and stored in the
+    result cache (error results are never cached), and concurrent identical
+    calls to idempotent tools share a single upstream request.
+    """
+    key = tool_call_key(self.name, name, arguments)
+    cache = self.result_cache
+    use_cache = cache is not None and cache.is_cacheable(name)
+    if use_cache:
+      hit, result = cache.get(key)
+      if hit:
+        return result
+
+    async def fetch():
+      result = await self._dispatch(name, arguments, **kwargs)
+      if use_cache and not getattr(result, "isError", False):
+        cache.put(key, result)
+      return result
+
+    if self.single_flight is not None and name in self.idempotent_tools:
+      return await self.single_flight.do(key, fetch)
+    return await fetch()
+
+  async def _dispatch(self, name: str, arguments, **kwargs):
+    if self.limiter is None:
+      return await self._send(name, arguments, **kwargs)
+    async with self.limiter.slot(name):
+      return await self._send(name, arguments, **kwargs)
+
+  async def _send(self, name: str, arguments, **kwargs):
+    member = await self.acquire()
+    member.in_flight += 1
+    try:
+      return await member.session.call_tool(name, arguments=arguments, **kwargs)
+    except Exception:
+      # The server may have died or hung; let the next health check decide.
+      if not await member.ping(self.ping_timeout):
+        member.healthy = False
+      raise
+    finally:
+      member.in_flight -= 1
+
+  async def get_tools(
+      self,
+      readonly_context: Optional[ReadonlyContext] = None,
+  ) -> List[BaseTool]:
+    """Returns the server's tools, bound to this pool.
+
+    The tool listing is fetched once and reused; every returned MCPTool
+    dispatches its calls through the pool. With a manifest cache, a listing
+    saved by an earlier run of the same server version is returned right
+    away while the servers start in the background.
+    """
+    if self._tool_listing is None:
+      await self._load_tool_listing()
+    tools = []
+    for mcp_tool in self._tool_listing:
+      tool = MCPTool(mcp_tool=mcp_tool, mcp_session_manager=self._session_manager)
+      if self._is_tool_selected(tool, readonly_context):
+        tools.append(tool)
+    return tools
+
+  async def _load_tool_listing(self):
+    async with self._listing_lock:
+      if self._tool_listing is not None:
+        return
+      if self.manifest_cache is not None:
+        self._fingerprint = await asyncio.to_thread(server_fingerprint, self._connection_params)
+        cached = await asyncio.to_thread(self.manifest_cache.load, self.name, self._fingerprint)
+        if cached is not None:
+          self._tool_listing = cached
+          self.tool_listing_source = "manifest"
+          self._refresh_task = asyncio.create_task(
+              self._refresh_tool_listing(), name=f"mcp-pool-{self.name}-listing"
+          )
+          return
+      await self._refresh_tool_listing()
+
+  async def _refresh_tool_listing(self):
+    """Lists the tools from a live server and updates the manifest cache."""
+    try:
+      member = await self.acquire()
+      tools = (await member.session.list_tools()).tools
+    except Exception as e:
+      if self._tool_listing is None:
+        raise
+      logger.warning("Could not refresh the tool listing of MCP pool %s: %s", self.name, e)
+      return
+    if self.tool_listing_source == "manifest" and tools != self._tool_listing:
+      logger.info("Tool listing of MCP pool %s changed since it was cached", self.name)
+    self._tool_listing = tools
+    self.tool_listing_source = "server"
+    if self.manifest_cache is not None:
+      try:
+        if self._fingerprint is None:
+          self._fingerprint = await asyncio.to_thread(server_fingerprint, self._connection_params)
+        await asyncio.to_thread(self.manifest_cache.save, self.name, self._fingerprint, tools)
+      except OSError as e:
+        logger.warning("Could not save the tool manifest of MCP pool %s: %s", self.name, e)
+
+  def stats(self) -> dict:
+    """Returns a snapshot of the pool's state for logging and diagnostics."""
+    return {
+        "name": self.name,
+        "pool_size": self.pool_size,
+        "started": self._started,
+        "launch_seconds": self.launch_seconds,
+        "launched_on_demand": self.launched_on_demand,
+        "healthy": sum(1 for m in self._members if m.healthy),
+        "in_flight": sum(m.in_flight for m in self._members),
+        "restarts": self.restarts,
+        "failed_starts": self.failed_starts,
+        "startup_seconds": [m.startup_seconds for m in self._members],
+        "result_cache": self.result_cache.stats() if self.result_cache else None,
+        "single_flight": self.single_flight.stats() if self.single_flight else None,
+        "limits": self.limiter.stats() if self.limiter else None,
+        "tool_listing_source": self.tool_listing_source,
+    }
+
+  async def close(self) -> None:
+    """Stops the health checker and every server process in the pool."""
+    self._closed = True
+    if self._refresh_task is not None and not self._refresh_task.done():
+      self._refresh_task.cancel()
+    if self._health_task is not None:
+      self._health_task.cancel()
+      try:
+        await self._health_task
+      except BaseException:
+        pass
+      self._health_task = None
+    members, self._members = self._members, []
+    await asyncio.gather(*(m.stop() for m in members), return_exceptions=True)
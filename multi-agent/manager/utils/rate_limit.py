@@ -0,0 +1,163 @@
+"""Concurrency limits and token-bucket rate limiting for MCP tool calls.
+
+SIEM searches and GTI lookups are subject to vendor quotas. Without a limit,
+parallel agents burst past them, get throttled and pile up until calls hit the
+toolset TIMEOUT. Calls that exceed a limit here wait in a FIFO queue instead,
+so throughput degrades smoothly under load and the time spent queueing is
+visible in the stats.
+
+Limits are configured per toolset, with optional overrides per tool:
+
+    {
+      "secops": {
+        "max_concurrency": 8, "rate": 10, "burst": 10,
+        "tools": {"search_security_events": {"max_concurrency": 2, "rate": 1}}
+      },
+      "gti": {"rate": 4}
+    }
+
+`rate` is in requests per second; 0 (or missing) means unlimited.
+"""
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Limit:
+  """Limits applied to one toolset or one tool. 0 means unlimited."""
+  max_concurrency: int = 0
+  rate: float = 0.0
+  burst: float = 0.0
+
+  @classmethod
+  def from_config(cls, config: dict) -> "Limit":
+    return cls(
+        max_concurrency=int(config.get("max_concurrency", 0)),
+        rate=float(config.get("rate", 0.0)),
+        burst=float(config.get("burst", 0.0)),
+    )
+
+
+class TokenBucket:
+  """An asyncio token bucket; waiters are served in FIFO order.
+
+  The bucket holds up to `burst` tokens (default: one second's worth, at
+  least 1) and refills continuously at `rate` tokens per second.
+  """
+
+  def __init__(self, rate: float, burst: float = 0.0, clock=time.monotonic):
+    self.rate = rate
+    self.capacity = burst if burst > 0 else max(1.0, rate)
+    self._tokens = self.capacity
+    self._clock = clock
+    self._updated = clock()
+    self._lock = asyncio.Lock()
+
+  def _refill(self):
+    now = self._clock()
+    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+    self._updated = now
+
+  async def acquire(self, tokens: float = 1.0):
+    """Waits until `tokens` are available and takes them."""
+    # Holding the lock while sleeping keeps later callers queued behind the
+    # one at the head, which is what makes the bucket FIFO.
+    async with self._lock:
+      self._refill()
+      while self._tokens < tokens:
+        await asyncio.sleep((tokens - self._tokens) / self.rate)
+        self._refill()
+      self._tokens -= tokens
+
+
+class CallLimiter:
+  """Applies one Limit and records how long callers queue for it."""
+
+  def __init__(self, limit: Limit):
+    self.limit = limit
+    self._semaphore = asyncio.Semaphore(limit.max_concurrency) if limit.max_concurrency > 0 else None
+    self._bucket = TokenBucket(limit.rate, limit.burst) if limit.rate > 0 else None
+    self.calls = 0
+    self.queued_calls = 0
+    self.waiting = 0
+    self.total_wait_seconds = 0.0
+    self.max_wait_seconds = 0.0
+
+  @contextlib.asynccontextmanager
+  async def slot(self):
+    """Holds a concurrency slot (and one rate token) for the duration of a call."""
+    start = time.monotonic()
+    self.waiting += 1
+    acquired = False
+    try:
+      if self._semaphore is not None:
+        await self._semaphore.acquire()
+        acquired = True
+      if self._bucket is not None:
+        await self._bucket.acquire()
+    except BaseException:
+      if acquired:
+        self._semaphore.release()
+      raise
+    finally:
+      self.waiting -= 1
+    wait = time.monotonic() - start
+    self.calls += 1
+    if wait > 0.001:
+      self.queued_calls += 1
+    self.total_wait_seconds += wait
+    self.max_wait_seconds = max(self.max_wait_seconds, wait)
+    try:
+      yield
+    finally:
+      if self._semaphore is not None:
+        self._semaphore.release()
+
+  def stats(self) -> dict:
+    return {
+        "max_concurrency": self.limit.max_concurrency,
+        "rate": self.limit.rate,
+        "calls": self.calls,
+        "queued_calls": self.queued_calls,
+        "waiting": self.waiting,
+        "avg_wait_seconds": self.total_wait_seconds / self.calls if self.calls else 0.0,
+        "max_wait_seconds": self.max_wait_seconds,
+    }
+
+
+class ToolsetLimiter:
+  """Per-toolset limits plus optional per-tool overrides."""
+
+  def __init__(self, toolset_limit: Optional[Limit] = None, tool_limits: Optional[dict] = None):
+    self._toolset = CallLimiter(toolset_limit) if toolset_limit else None
+    self._tools = {name: CallLimiter(limit) for name, limit in (tool_limits or {}).items()}
+
+  @classmethod
+  def from_config(cls, config: Optional[dict]) -> Optional["ToolsetLimiter"]:
+    """Builds a limiter from one toolset's config entry (None if unlimited)."""
+    if not config:
+      return None
+    tool_limits = {name: Limit.from_config(c) for name, c in config.get("tools", {}).items()}
+    return cls(Limit.from_config(config), tool_limits)
+
+  @contextlib.asynccontextmanager
+  async def slot(self, tool_name: str):
+    """Waits for the tool's limit, then the toolset's, and holds both."""
+    # The narrower per-tool limit is taken first so a queue of slow searches
+    # does not sit on toolset-wide slots other tools could be using.
+    async with contextlib.AsyncExitStack() as stack:
+      tool_limiter = self._tools.get(tool_name)
+      if tool_limiter is not None:
+        await stack.enter_async_context(tool_limiter.slot())
+      if self._toolset is not None:
+        await stack.enter_async_context(self._toolset.slot())
+      yield
+
+  def stats(self) -> dict:
+    return {
+        "toolset": self._toolset.stats() if self._toolset else None,
+        "tools": {name: limiter.stats() for name, limiter in self._tools.items()},
+    }
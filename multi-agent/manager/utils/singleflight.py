@@ -0,0 +1,56 @@
+"""Single-flight coalescing of concurrent identical calls.
+
+When several sub-agents (or parallel cases) ask for the same IOC enrichment at
+the same moment, only the first call goes upstream; the others await the same
+result instead of sending duplicate requests over the stdio pipe.
+"""
+import asyncio
+
+
+class SingleFlight:
+  """Coalesces concurrent calls that share a key onto one in-flight task."""
+
+  def __init__(self):
+    self._in_flight = {}
+    self.calls = 0
+    self.coalesced = 0
+
+  async def do(self, key, fn):
+    """Runs `fn()` for `key`, or joins the call already in flight for it.
+
+    The upstream call runs in its own task, so a caller that is cancelled
+    (e.g. the agent that happened to start it) does not cancel the call for
+    the others waiting on it. Exceptions are propagated to every waiter.
+
+    Args:
+        key: Hashable identity of the call, e.g. from `tool_call_key`.
+        fn: Zero-argument coroutine function performing the call.
+
+    Returns:
+        The result of the (possibly shared) call.
+    """
+    self.calls += 1
+    task = self._in_flight.get(key)
+    if task is None:
+      task = asyncio.ensure_future(fn())
+      self._in_flight[key] = task
+      task.add_done_callback(lambda t: self._finish(key, t))
+    else:
+      self.coalesced += 1
+    return await asyncio.shield(task)
+
+  def _finish(self, key, task):
+    if self._in_flight.get(key) is task:
+      del self._in_flight[key]
+    # Mark the exception as retrieved even if every waiter was cancelled.
+    if not task.cancelled():
+      task.exception()
+
+  def stats(self) -> dict:
+    """Returns how many calls were made, coalesced and sent upstream."""
+    return {
+        "calls": self.calls,
+        "coalesced": self.coalesced,
+        "upstream": self.calls - self.coalesced,
+        "in_flight": len(self._in_flight),
+    }
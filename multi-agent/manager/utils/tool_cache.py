@@ -0,0 +1,166 @@
+"""TTL + LRU cache for the results of idempotent MCP tool calls.
+
+Tier 1/2, the CTI researcher and the threat hunter share the same SIEM and GTI
+toolsets and routinely repeat identical lookups within a case (the GTI report
+for the same hash, the same entity lookup in Chronicle, ...). Only tools on the
+read-only allowlist are cached; anything that changes state (commenting on a
+case, updating an alert, ...) always goes to the server.
+"""
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+# Read-only tools that are safe to cache, with their TTL in seconds. Threat
+# intelligence reports change slowly; SIEM/SOAR lookups reflect live data and
+# get much shorter lifetimes.
+DEFAULT_CACHEABLE_TOOLS = {
+    # GTI
+    "get_file_report": 3600,
+    "get_domain_report": 3600,
+    "get_ip_address_report": 3600,
+    "get_url_report": 3600,
+    "get_collection_report": 3600,
+    "get_file_behavior_summary": 3600,
+    "get_collection_mitre_tree": 3600,
+    "get_collection_timeline_events": 3600,
+    "get_entities_related_to_a_file": 1800,
+    "get_entities_related_to_a_domain": 1800,
+    "get_entities_related_to_an_ip_address": 1800,
+    "get_entities_related_to_an_url": 1800,
+    "get_entities_related_to_a_collection": 1800,
+    "search_threats": 900,
+    "search_threat_actors": 900,
+    "search_malware_families": 900,
+    "search_campaigns": 900,
+    "search_iocs": 900,
+    # SecOps (SIEM)
+    "lookup_entity": 300,
+    "get_threat_intel": 900,
+    "get_ioc_matches": 300,
+    "list_security_rules": 300,
+    "search_security_rules": 300,
+    "get_rule_detections": 120,
+    "get_security_alerts": 60,
+    "get_security_alert_by_id": 60,
+    "search_security_events": 60,
+    # SOAR
+    "get_case_full_details": 60,
+    "list_cases": 30,
+    "list_alerts_by_case": 60,
+    "list_alert_group_identifiers_by_case": 60,
+    "list_events_by_alert": 60,
+    "get_entities_by_alert_group_identifiers": 60,
+    "get_entity_details": 120,
+    "search_entity": 120,
+}
+
+# Tools with no side effects; concurrent identical calls to them may share one
+# upstream request (see singleflight.py).
+READ_ONLY_TOOLS = frozenset(DEFAULT_CACHEABLE_TOOLS)
+
+
+def normalize_arguments(arguments) -> str:
+  """Returns a canonical string for tool arguments.
+
+  Keys are sorted, None-valued keys are dropped and surrounding whitespace is
+  stripped from strings, so semantically identical calls share a key.
+  """
+  def _normalize(value):
+    if isinstance(value, dict):
+      return {k: _normalize(v) for k, v in sorted(value.items()) if v is not None}
+    if isinstance(value, (list, tuple)):
+      return [_normalize(v) for v in value]
+    if isinstance(value, str):
+      return value.strip()
+    return value
+
+  return json.dumps(_normalize(arguments or {}), sort_keys=True, separators=(",", ":"), default=str)
+
+
+def tool_call_key(namespace: str, tool_name: str, arguments) -> tuple:
+  """Builds the identity of a tool call: (toolset, tool, normalized arguments)."""
+  return (namespace, tool_name, normalize_arguments(arguments))
+
+
+class ToolResultCache:
+  """A size-bounded LRU cache of tool results with per-tool TTLs.
+
+  Thread-safe; shared by every toolset in the process.
+  """
+
+  def __init__(self, max_entries: int = 1024, cacheable_tools=None, clock=time.monotonic):
+    """Initializes the cache.
+
+    Args:
+        max_entries: Maximum number of cached results before LRU eviction.
+        cacheable_tools: Mapping of tool name to TTL in seconds. Tools not in
+            the mapping are never cached. Defaults to DEFAULT_CACHEABLE_TOOLS.
+        clock: Monotonic time source, in seconds.
+    """
+    self.max_entries = max_entries
+    self.cacheable_tools = dict(DEFAULT_CACHEABLE_TOOLS if cacheable_tools is None else cacheable_tools)
+    self._clock = clock
+    self._entries = OrderedDict()
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.expirations = 0
+    self._per_tool = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+  def is_cacheable(self, tool_name: str) -> bool:
+    return self.cacheable_tools.get(tool_name, 0) > 0
+
+  def get(self, key: tuple):
+    """Looks up a cached result.
+
+    Returns:
+        tuple[bool, Any]: (True, result) on a hit, (False, None) otherwise.
+    """
+    tool_name = key[1]
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is not None:
+        expires_at, value = entry
+        if expires_at > self._clock():
+          self._entries.move_to_end(key)
+          self.hits += 1
+          self._per_tool[tool_name]["hits"] += 1
+          return True, value
+        del self._entries[key]
+        self.expirations += 1
+      self.misses += 1
+      self._per_tool[tool_name]["misses"] += 1
+      return False, None
+
+  def put(self, key: tuple, value):
+    """Stores a result under `key` if its tool is cacheable."""
+    ttl = self.cacheable_tools.get(key[1], 0)
+    if ttl <= 0:
+      return
+    with self._lock:
+      self._entries[key] = (self._clock() + ttl, value)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+        self.evictions += 1
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+
+  def stats(self) -> dict:
+    """Returns hit/miss counters overall and per tool."""
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+          "entries": len(self._entries),
+          "max_entries": self.max_entries,
+          "hits": self.hits,
+          "misses": self.misses,
+          "hit_rate": self.hits / lookups if lookups else 0.0,
+          "evictions": self.evictions,
+          "expirations": self.expirations,
+          "by_tool": {name: dict(counts) for name, counts in self._per_tool.items()},
+      }
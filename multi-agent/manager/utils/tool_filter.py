@@ -0,0 +1,156 @@
+"""Per-agent views of the shared MCP toolsets.
+
+Every tool an agent holds has its schema sent with each model request. The
+shared SIEM, SOAR and GTI toolsets expose far more tools than most sub-agents
+use, so each sub-agent gets views that only list the tools allowed for it in
+config/tool_agent_mapping.yaml. The views share the underlying pools, caches
+and limits; a toolset an agent is not allowed to use is dropped entirely and
+never launched on its behalf.
+"""
+import json
+import logging
+from typing import List, Optional
+
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+
+from ..config.config_loader import get_agent_tool_allowlist
+
+logger = logging.getLogger(__name__)
+
+# Per-agent, per-toolset schema sizes recorded the first time an agent lists a
+# toolset: {agent: {toolset: {"tools", "allowed_tools", "tokens", "allowed_tokens"}}}.
+schema_token_usage = {}
+# Toolsets dropped for each agent, and the full schema size of each toolset
+# once any view has listed it, so dropped toolsets count towards the savings.
+dropped_toolsets = {}
+_toolset_tokens = {}
+
+
+def estimate_schema_tokens(tool: BaseTool) -> int:
+  """Roughly estimates the prompt tokens of a tool's declaration (~4 chars/token)."""
+  declaration = tool._get_declaration()
+  if declaration is None:
+    return 0
+  text = json.dumps(declaration.model_dump(exclude_none=True), separators=(",", ":"), default=str)
+  return len(text) // 4 + 1
+
+
+class AgentToolsetView(BaseToolset):
+  """A filtered view of a shared toolset for one agent. Closing it is a no-op."""
+
+  def __init__(self, toolset: BaseToolset, agent_name: str, toolset_name: str, tool_names):
+    super().__init__(tool_filter=sorted(tool_names))
+    self.toolset = toolset
+    self.agent_name = agent_name
+    self.toolset_name = toolset_name
+
+  async def get_tools(
+      self,
+      readonly_context: Optional[ReadonlyContext] = None,
+  ) -> List[BaseTool]:
+    all_tools = await self.toolset.get_tools(readonly_context)
+    tools = [tool for tool in all_tools if self._is_tool_selected(tool, readonly_context)]
+    usage = schema_token_usage.setdefault(self.agent_name, {})
+    if self.toolset_name not in usage:
+      tokens = {tool.name: estimate_schema_tokens(tool) for tool in all_tools}
+      usage[self.toolset_name] = {
+          "tools": len(all_tools),
+          "allowed_tools": len(tools),
+          "tokens": sum(tokens.values()),
+          "allowed_tokens": sum(tokens[tool.name] for tool in tools),
+      }
+      _toolset_tokens[self.toolset_name] = usage[self.toolset_name]["tokens"]
+      logger.info(
+          "%s: %s exposes %d/%d tools (~%d of ~%d schema tokens)",
+          self.agent_name, self.toolset_name, len(tools), len(all_tools),
+          usage[self.toolset_name]["allowed_tokens"], usage[self.toolset_name]["tokens"],
+      )
+    return tools
+
+  async def close(self) -> None:
+    # The shared toolset is owned (and closed) by the manager's exit stack.
+    pass
+
+
+def filter_tools_for_agent(agent_name: str, tools, mapping=None) -> tuple:
+  """Restricts the shared toolsets to the tools allowed for `agent_name`.
+
+  Plain function tools are passed through unchanged. Toolsets without a
+  `name` (i.e. not created by get_agent_tools) are passed through unfiltered.
+
+  Args:
+      agent_name: The sub-agent name used in tool_agent_mapping.yaml.
+      tools: The shared tools tuple.
+      mapping: Optional parsed mapping (defaults to the config file).
+
+  Returns:
+      tuple: The tools to give to the agent's `Agent(tools=...)`.
+  """
+  allowlist = get_agent_tool_allowlist(agent_name, mapping)
+  if allowlist is None:
+    return tuple(tools)
+  filtered = []
+  for tool in tools:
+    toolset_name = getattr(tool, "name", None) if isinstance(tool, BaseToolset) else None
+    if toolset_name is None:
+      filtered.append(tool)
+    elif toolset_name not in allowlist:
+      dropped_toolsets.setdefault(agent_name, set()).add(toolset_name)
+    elif allowlist[toolset_name] is None:
+      filtered.append(tool)
+    else:
+      filtered.append(AgentToolsetView(tool, agent_name, toolset_name, allowlist[toolset_name]))
+  return tuple(filtered)
+
+
+def schema_token_report() -> dict:
+  """Summarizes, per agent, the tool schema tokens saved by filtering.
+
+  Schemas come from the running servers, so a toolset only counts once some
+  filtered agent has listed it; dropped toolsets count as fully saved.
+  """
+  report = {}
+  for agent_name in sorted(set(schema_token_usage) | set(dropped_toolsets)):
+    toolsets = dict(schema_token_usage.get(agent_name, {}))
+    for toolset_name in dropped_toolsets.get(agent_name, ()):
+      if toolset_name in _toolset_tokens:
+        toolsets[toolset_name] = {
+            "tools": None,
+            "allowed_tools": 0,
+            "tokens": _toolset_tokens[toolset_name],
+            "allowed_tokens": 0,
+        }
+    total = sum(t["tokens"] for t in toolsets.values())
+    allowed = sum(t["allowed_tokens"] for t in toolsets.values())
+    report[agent_name] = {
+        "toolsets": toolsets,
+        "tokens": total,
+        "allowed_tokens": allowed,
+        "saved_tokens": total - allowed,
+        "saved_fraction": (total - allowed) / total if total else 0.0,
+    }
+  return report
+
+
+async def measure_schema_savings(tools, agent_names, mapping=None) -> dict:
+  """Lists every toolset through each agent's filter and returns the report.
+
+  This launches the toolsets' servers if they are not running yet.
+
+  Args:
+      tools: The shared tools tuple from get_agent_tools().
+      agent_names: Sub-agent names to measure.
+      mapping: Optional parsed mapping (defaults to the config file).
+  """
+  # List the unfiltered toolsets first so dropped toolsets have known sizes.
+  for tool in tools:
+    if isinstance(tool, BaseToolset) and getattr(tool, "name", None):
+      all_tools = await tool.get_tools()
+      _toolset_tokens[tool.name] = sum(estimate_schema_tokens(t) for t in all_tools)
+  for agent_name in agent_names:
+    for tool in filter_tools_for_agent(agent_name, tools, mapping):
+      if isinstance(tool, AgentToolsetView):
+        await tool.get_tools()
+  return schema_token_report()
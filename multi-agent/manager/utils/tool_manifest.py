@@ -0,0 +1,126 @@
+"""On-disk cache of MCP server tool listings.
+
+Listing a server's tools requires launching it (`uv run ...`) and completing
+the MCP handshake, which dominates cold-start time. The listing only changes
+when the server changes, so it is saved to disk keyed by the server command
+and a fingerprint of its project: the contents of pyproject.toml / uv.lock
+plus the path, size and mtime of every source file. Editing, upgrading or
+re-locking the server therefore invalidates the cached listing automatically.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from mcp.types import Tool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MANIFEST_DIR = Path(__file__).resolve().parents[2] / ".cache" / "mcp_tools"
+
+# Files whose contents pin the server's version and dependencies.
+_LOCK_FILES = ("pyproject.toml", "uv.lock", "requirements.txt", "package.json", "package-lock.json")
+_SOURCE_SUFFIXES = (".py", ".js", ".ts")
+_SKIPPED_DIRS = {".venv", "venv", "__pycache__", ".git", "node_modules", ".pytest_cache"}
+
+
+def _server_directory(server_params) -> Optional[Path]:
+  """Finds the server's project directory from its launch arguments."""
+  args = list(getattr(server_params, "args", None) or [])
+  if "--directory" in args:
+    index = args.index("--directory")
+    if index + 1 < len(args):
+      return Path(args[index + 1])
+  cwd = getattr(server_params, "cwd", None)
+  return Path(cwd) if cwd else None
+
+
+def server_fingerprint(connection_params) -> str:
+  """Hashes what determines a server's tool listing.
+
+  Args:
+      connection_params: ADK connection params (with `server_params`).
+
+  Returns:
+      str: Hex digest of the launch command and the server project's lock
+          files and source file metadata.
+  """
+  server_params = getattr(connection_params, "server_params", connection_params)
+  digest = hashlib.sha256()
+  digest.update(json.dumps(
+      [getattr(server_params, "command", ""), list(getattr(server_params, "args", None) or [])]
+  ).encode())
+  directory = _server_directory(server_params)
+  if directory is None or not directory.is_dir():
+    return digest.hexdigest()
+
+  # Walk up to the project root (where the lock file usually lives).
+  for parent in (directory, *directory.parents[:2]):
+    for name in _LOCK_FILES:
+      lock_file = parent / name
+      if lock_file.is_file():
+        digest.update(f"{lock_file}\n".encode())
+        digest.update(lock_file.read_bytes())
+  for dirpath, dirs, files in os.walk(directory):
+    dirs[:] = sorted(d for d in dirs if d not in _SKIPPED_DIRS)
+    for file_name in sorted(files):
+      if file_name.endswith(_SOURCE_SUFFIXES):
+        stat = os.stat(os.path.join(dirpath, file_name))
+        digest.update(f"{dirpath}/{file_name}:{stat.st_mtime_ns}:{stat.st_size}\n".encode())
+  return digest.hexdigest()
+
+
+class ToolManifestCache:
+  """Stores tool listings as JSON files, one per (toolset, fingerprint)."""
+
+  def __init__(self, directory=DEFAULT_MANIFEST_DIR):
+    self.directory = Path(directory)
+    self._lock = threading.Lock()
+
+  def _path(self, name: str) -> Path:
+    return self.directory / f"{name}.json"
+
+  def load(self, name: str, fingerprint: str):
+    """Returns the cached tool listing, or None if missing or stale.
+
+    Args:
+        name: The toolset name.
+        fingerprint: The current server_fingerprint().
+
+    Returns:
+        list[mcp.types.Tool] | None
+    """
+    path = self._path(name)
+    try:
+      with open(path, "r") as f:
+        manifest = json.load(f)
+    except FileNotFoundError:
+      return None
+    except (OSError, ValueError) as e:
+      logger.warning("Ignoring unreadable tool manifest %s: %s", path, e)
+      return None
+    if manifest.get("fingerprint") != fingerprint:
+      logger.info("Tool manifest for %s is stale (server changed)", name)
+      return None
+    try:
+      return [Tool.model_validate(tool) for tool in manifest["tools"]]
+    except Exception as e:
+      logger.warning("Ignoring invalid tool manifest %s: %s", path, e)
+      return None
+
+  def save(self, name: str, fingerprint: str, tools) -> None:
+    """Writes a tool listing for `name` atomically."""
+    path = self._path(name)
+    manifest = {
+        "fingerprint": fingerprint,
+        "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+    }
+    with self._lock:
+      path.parent.mkdir(parents=True, exist_ok=True)
+      tmp_path = path.with_suffix(".json.tmp")
+      with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+      os.replace(tmp_path, path)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Startup profiler for the SOC manager agent.
+
+Imports the manager package, initializes the manager and its sub-agents and
+(optionally) brings up every MCP toolset, then prints a JSON report with a
+phase-by-phase timing breakdown, the import-time tree and peak RSS:
+
+    python profile_startup.py [--output startup.json] [--no-connect]
+
+The profiler is loaded by path and started before anything else is imported,
+so the cost of importing google.adk and the manager package is captured.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BASE_DIR))
+
+# Loaded by path: importing it as manager.utils.startup_profile would import
+# the whole manager package before the profiler could start.
+_spec = importlib.util.spec_from_file_location(
+    "startup_profile", BASE_DIR / "manager" / "utils" / "startup_profile.py"
+)
+startup_profile = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(startup_profile)
+
+
+def _pools_of(agent):
+    """Collects the distinct MCP pools used by the manager's sub-agents."""
+    from manager.utils.mcp_pool import PooledMCPToolset
+
+    pools = {}
+    for sub_agent in agent.sub_agents:
+        for tool in sub_agent.tools:
+            toolset = getattr(tool, "toolset", tool)  # unwrap per-agent views
+            if isinstance(toolset, PooledMCPToolset):
+                pools[toolset.name] = toolset
+    return list(pools.values())
+
+
+async def _connect(profiler, pool):
+    """Launches a pool (spawn + MCP handshake) and lists its tools."""
+    start = time.perf_counter()
+    error = None
+    try:
+        await pool.start()
+        await pool.get_tools()
+    except Exception as e:
+        error = str(e)
+    profiler.record_phase(f"mcp_connect:{pool.name}", time.perf_counter() - start)
+    return error
+
+
+async def profile_manager_startup(profiler, connect=True):
+    """Runs the manager's startup under the profiler."""
+    with profiler.phase("import_manager"):
+        from manager import agent as manager_agent
+
+    with profiler.phase("initialize_manager"):
+        agent = await manager_agent.initialize_actual_manager_agent()
+    for name, seconds in manager_agent.last_init_timings.items():
+        profiler.record_phase(f"initialize_manager:{name}", seconds)
+
+    pools = _pools_of(agent)
+    try:
+        if connect:
+            with profiler.phase("mcp_connect"):
+                errors = await asyncio.gather(*(_connect(profiler, pool) for pool in pools))
+            profiler.extra["mcp_errors"] = {
+                pool.name: error for pool, error in zip(pools, errors) if error
+            }
+        # Per server: startup_seconds covers the `uv run` spawn and the MCP handshake.
+        profiler.extra["mcp"] = [pool.stats() for pool in pools]
+    finally:
+        with profiler.phase("shutdown"):
+            for pool in pools:
+                await pool.close()
+
+
+def main():
+    """Main entry point for manager startup profiling."""
+    parser = argparse.ArgumentParser(description="SOC manager startup profiler")
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    parser.add_argument(
+        '--no-connect',
+        action='store_true',
+        help='Do not launch the MCP servers (profile imports and agent construction only)'
+    )
+    parser.add_argument(
+        '--min-import-ms',
+        type=float,
+        default=1.0,
+        help='Leave imports faster than this out of the import tree'
+    )
+    args = parser.parse_args()
+
+    profiler = startup_profile.StartupProfiler("multi-agent/manager", min_import_ms=args.min_import_ms)
+    profiler.start()
+    asyncio.run(profile_manager_startup(profiler, connect=not args.no_connect))
+    profiler.write(args.output)
+
+
+if __name__ == "__main__":
+    main()
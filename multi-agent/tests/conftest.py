@@ -0,0 +1,5 @@
+"""Makes the manager package importable as it is from the multi-agent directory."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,123 @@
+"""Tests for PooledMCPToolset with fake server processes."""
+import asyncio
+
+import pytest
+
+from manager.utils import mcp_pool
+from manager.utils.mcp_pool import MCPPoolUnavailableError, PooledMCPToolset
+from manager.utils.singleflight import SingleFlight
+from manager.utils.tool_cache import ToolResultCache
+
+
+class FakeSession:
+
+  def __init__(self, member):
+    self.member = member
+
+  async def call_tool(self, name, arguments=None, **kwargs):
+    self.member.calls += 1
+    await asyncio.sleep(0.01)
+    return {"member": self.member.member_id, "tool": name}
+
+
+class FakeMember:
+  """Stands in for _PoolMember: no process, health controlled by the test."""
+
+  fail_start = False
+
+  def __init__(self, pool_name, member_id, connection_params, errlog):
+    self.member_id = member_id
+    self.label = f"{pool_name}[{member_id}]"
+    self.in_flight = 0
+    self.calls = 0
+    self.healthy = False
+    self.stopped = False
+    self.startup_seconds = 0.0
+    self.session = None
+
+  async def start(self, timeout):
+    if FakeMember.fail_start:
+      raise RuntimeError("uv run failed")
+    self.healthy = True
+    self.session = FakeSession(self)
+
+  async def ping(self, timeout):
+    return self.healthy
+
+  async def stop(self, timeout=5.0):
+    self.healthy = False
+    self.stopped = True
+
+
+@pytest.fixture
+def fake_members(monkeypatch):
+  monkeypatch.setattr(mcp_pool, "_PoolMember", FakeMember)
+  monkeypatch.setattr(FakeMember, "fail_start", False)
+
+
+def make_pool(**kwargs):
+  return PooledMCPToolset(name="gti", connection_params=None, health_check_interval=0, **kwargs)
+
+
+def test_health_check_replaces_dead_servers(fake_members):
+  async def scenario():
+    pool = make_pool(pool_size=2)
+    await pool.start()
+    dead = pool._members[0]
+    dead.healthy = False
+    await pool.check_health()
+    members = list(pool._members)
+    await pool.close()
+    return pool, dead, members
+
+  pool, dead, members = asyncio.run(scenario())
+  assert dead.stopped and dead not in members
+  assert [member.member_id for member in members] == [1, 2]
+  assert pool.restarts == 1
+
+
+def test_calls_go_to_a_healthy_server(fake_members):
+  async def scenario():
+    pool = make_pool(pool_size=2)
+    await pool.start()
+    pool._members[0].healthy = False
+    results = [await pool.call_tool("get_file_report", {"hash": str(n)}) for n in range(3)]
+    await pool.close()
+    return results
+
+  assert {result["member"] for result in asyncio.run(scenario())} == {1}
+
+
+def test_pool_without_servers_raises(fake_members, monkeypatch):
+  monkeypatch.setattr(FakeMember, "fail_start", True)
+
+  async def scenario():
+    pool = make_pool()
+    try:
+      with pytest.raises(MCPPoolUnavailableError):
+        await pool.call_tool("get_file_report", {})
+    finally:
+      await pool.close()
+    return pool.failed_starts
+
+  assert asyncio.run(scenario()) >= 2
+
+
+def test_identical_read_only_calls_are_cached_and_coalesced(fake_members):
+  async def scenario():
+    pool = make_pool(result_cache=ToolResultCache(), single_flight=SingleFlight())
+    await pool.start()
+    concurrent = await asyncio.gather(*(pool.call_tool("get_file_report", {"hash": "abc"}) for _ in range(4)))
+    cached = await pool.call_tool("get_file_report", {"hash": " abc "})
+    writes = [await pool.call_tool("post_case_comment", {"case_id": 1}) for _ in range(2)]
+    calls = pool._members[0].calls
+    stats = pool.stats()
+    await pool.close()
+    return concurrent, cached, writes, calls, stats
+
+  concurrent, cached, writes, calls, stats = asyncio.run(scenario())
+  assert cached == concurrent[0]
+  # One upstream call for the lookups, one per write.
+  assert calls == 3
+  assert stats["single_flight"]["coalesced"] == 3
+  assert stats["result_cache"]["hits"] == 1
@@ -0,0 +1,67 @@
+"""Tests for the MCP call limiter and token bucket."""
+import asyncio
+import time
+
+from manager.utils.rate_limit import CallLimiter, Limit, TokenBucket, ToolsetLimiter
+
+
+def test_token_bucket_makes_callers_wait_for_tokens():
+  async def scenario():
+    bucket = TokenBucket(rate=20, burst=1)
+    start = time.monotonic()
+    for _ in range(4):
+      await bucket.acquire()
+    return time.monotonic() - start
+
+  # One token is available immediately, the other three arrive 50 ms apart.
+  assert asyncio.run(scenario()) >= 0.14
+
+
+def test_concurrency_limit_queues_calls():
+  async def scenario():
+    limiter = CallLimiter(Limit(max_concurrency=2))
+    running = peak = 0
+
+    async def call():
+      nonlocal running, peak
+      async with limiter.slot():
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    await asyncio.gather(*(call() for _ in range(6)))
+    return peak, limiter.stats()
+
+  peak, stats = asyncio.run(scenario())
+  assert peak == 2
+  assert stats["calls"] == 6
+  assert stats["queued_calls"] >= 4
+  assert stats["max_wait_seconds"] >= 0.03
+  assert stats["waiting"] == 0
+
+
+def test_cancelled_waiter_releases_nothing_it_did_not_hold():
+  async def scenario():
+    limiter = CallLimiter(Limit(max_concurrency=1))
+    async with limiter.slot():
+      waiter = asyncio.ensure_future(limiter.slot().__aenter__())
+      await asyncio.sleep(0.01)
+      waiter.cancel()
+      await asyncio.gather(waiter, return_exceptions=True)
+    # The slot is free again: this does not block.
+    async with limiter.slot():
+      pass
+    return limiter.stats()["waiting"]
+
+  assert asyncio.run(asyncio.wait_for(scenario(), 1)) == 0
+
+
+def test_toolset_limiter_from_config():
+  assert ToolsetLimiter.from_config(None) is None
+  limiter = ToolsetLimiter.from_config(
+      {"max_concurrency": 8, "rate": 10, "tools": {"search_security_events": {"max_concurrency": 2, "rate": 1}}}
+  )
+  stats = limiter.stats()
+  assert stats["toolset"]["max_concurrency"] == 8
+  assert stats["tools"]["search_security_events"]["rate"] == 1.0
@@ -0,0 +1,57 @@
+"""Tests for the memory-mapped BM25 index over the rules-bank."""
+import pytest
+
+from manager.tools.search_index import SearchIndex, build_index, corpus_fingerprint
+
+
+@pytest.fixture
+def index(tmp_path):
+  rules_bank = tmp_path / "rules-bank"
+  (rules_bank / "runbooks").mkdir(parents=True)
+  (rules_bank / "runbooks" / "phishing_response.md").write_text(
+      "Intro for analysts.\n\n# Triage\n\nCheck the sender and the URL.\n\n"
+      "# Containment\n\nPurge the message from every mailbox.\n", encoding="utf-8")
+  (rules_bank / "personas").mkdir()
+  (rules_bank / "personas" / "analyst.md").write_text(
+      "# Rôle\n\nTriage alerts — résumé écrit en français.\n", encoding="utf-8")
+  build_index(tmp_path / "index.bm25", rules_bank)
+  index = SearchIndex(tmp_path / "index.bm25", rules_bank)
+  yield index
+  index.close()
+
+
+def test_query_returns_the_matching_section(index):
+  (score, doc_id), = index.search("purge mailbox", max_results=1)
+  assert score > 0
+  assert index.section(doc_id) == {
+      "path": "runbooks/phishing_response.md",
+      "heading": "Containment",
+      "content": "# Containment\n\nPurge the message from every mailbox.\n",
+  }
+
+
+def test_non_ascii_headings_and_offsets_round_trip(index):
+  (_, doc_id), = index.search("résumé", max_results=1)
+  section = index.section(doc_id)
+  assert section["heading"] == "Rôle"
+  assert section["content"].endswith("en français.\n")
+
+
+def test_lookup_finds_every_term_and_only_those(index):
+  assert index.lookup("triage")[1] == 2
+  assert index.lookup("zzz") is None
+  assert index.lookup("0") is None
+  assert index.search("nothing matches") == []
+
+
+def test_header_holds_no_vocabulary(index, tmp_path):
+  assert index.fingerprint == corpus_fingerprint(tmp_path / "rules-bank")
+  assert index.files == ["personas/analyst.md", "runbooks/phishing_response.md"]
+  assert index.n_docs == 4 and index.n_terms > 10
+
+
+def test_old_index_format_is_rejected(tmp_path):
+  path = tmp_path / "old.bm25"
+  path.write_bytes(b"RBBM25\x00\x01" + b"\x00" * 16)
+  with pytest.raises(ValueError):
+    SearchIndex(path, tmp_path)
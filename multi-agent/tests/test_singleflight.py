@@ -0,0 +1,67 @@
+"""Tests for single-flight coalescing of identical calls."""
+import asyncio
+
+import pytest
+
+from manager.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_upstream_request():
+  async def scenario():
+    flight = SingleFlight()
+    upstream = 0
+
+    async def fetch():
+      nonlocal upstream
+      upstream += 1
+      await asyncio.sleep(0.01)
+      return "result"
+
+    results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+    return flight, upstream, results
+
+  flight, upstream, results = asyncio.run(scenario())
+  assert results == ["result"] * 5
+  assert upstream == 1
+  assert flight.stats() == {"calls": 5, "coalesced": 4, "upstream": 1, "in_flight": 0}
+
+
+def test_exception_is_raised_to_every_waiter_and_not_kept():
+  async def scenario():
+    flight = SingleFlight()
+    attempts = 0
+
+    async def fail():
+      nonlocal attempts
+      attempts += 1
+      await asyncio.sleep(0.01)
+      raise RuntimeError("quota exceeded")
+
+    results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+    # The failed call is not remembered: the next call goes upstream again.
+    with pytest.raises(RuntimeError):
+      await flight.do("key", fail)
+    return results, attempts
+
+  results, attempts = asyncio.run(scenario())
+  assert [str(result) for result in results] == ["quota exceeded"] * 3
+  assert all(isinstance(result, RuntimeError) for result in results)
+  assert attempts == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+  async def scenario():
+    flight = SingleFlight()
+
+    async def fetch():
+      await asyncio.sleep(0.02)
+      return "result"
+
+    first = asyncio.ensure_future(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    return await second, first.cancelled()
+
+  assert asyncio.run(scenario()) == ("result", True)
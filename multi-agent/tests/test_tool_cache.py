@@ -0,0 +1,52 @@
+"""Tests for the TTL + LRU tool result cache."""
+from manager.utils.tool_cache import ToolResultCache, normalize_arguments, tool_call_key
+
+
+class FakeClock:
+
+  def __init__(self):
+    self.now = 0.0
+
+  def __call__(self):
+    return self.now
+
+
+def test_entries_expire_after_their_tool_ttl():
+  clock = FakeClock()
+  cache = ToolResultCache(cacheable_tools={"get_file_report": 60}, clock=clock)
+  key = tool_call_key("gti", "get_file_report", {"hash": "abc"})
+  cache.put(key, "report")
+
+  clock.now = 59
+  assert cache.get(key) == (True, "report")
+  clock.now = 60
+  assert cache.get(key) == (False, None)
+  assert cache.stats()["expirations"] == 1
+  assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+  cache = ToolResultCache(max_entries=2, cacheable_tools={"lookup_entity": 300})
+  keys = [tool_call_key("secops", "lookup_entity", {"value": v}) for v in ("a", "b", "c")]
+  cache.put(keys[0], 0)
+  cache.put(keys[1], 1)
+  cache.get(keys[0])  # a is now more recent than b
+  cache.put(keys[2], 2)
+
+  assert cache.get(keys[1]) == (False, None)
+  assert cache.get(keys[0]) == (True, 0)
+  assert cache.get(keys[2]) == (True, 2)
+  assert cache.stats()["evictions"] == 1
+
+
+def test_tools_off_the_allowlist_are_not_cached():
+  cache = ToolResultCache(cacheable_tools={"lookup_entity": 300})
+  key = tool_call_key("soar", "post_case_comment", {"case_id": 1})
+  cache.put(key, "ok")
+  assert not cache.is_cacheable("post_case_comment")
+  assert cache.get(key) == (False, None)
+
+
+def test_equivalent_arguments_share_a_key():
+  assert normalize_arguments({"b": " x ", "a": 1, "c": None}) == normalize_arguments({"a": 1, "b": "x"})
+  assert tool_call_key("gti", "t", {"a": 1}) != tool_call_key("secops", "t", {"a": 1})
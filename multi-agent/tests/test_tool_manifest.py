@@ -0,0 +1,49 @@
+"""Tests for the on-disk cache of MCP tool listings."""
+import os
+from types import SimpleNamespace
+
+from mcp.types import Tool
+
+from manager.utils.tool_manifest import ToolManifestCache, server_fingerprint
+
+TOOLS = [Tool(name="get_file_report", description="GTI file report", inputSchema={"type": "object"})]
+
+
+def server(tmp_path):
+  (tmp_path / "pyproject.toml").write_text('[project]\nname = "gti"\n')
+  (tmp_path / "server.py").write_text("print('v1')\n")
+  return SimpleNamespace(server_params=SimpleNamespace(command="uv", args=["--directory", str(tmp_path), "run"]))
+
+
+def test_listing_round_trips(tmp_path):
+  cache = ToolManifestCache(tmp_path / "manifests")
+  cache.save("gti", "fp", TOOLS)
+  assert cache.load("gti", "fp") == TOOLS
+  assert cache.load("secops", "fp") is None
+
+
+def test_listing_is_stale_once_the_server_changes(tmp_path):
+  server_dir = tmp_path / "server"
+  server_dir.mkdir()
+  params = server(server_dir)
+  cache = ToolManifestCache(tmp_path / "manifests")
+  cache.save("gti", server_fingerprint(params), TOOLS)
+  assert cache.load("gti", server_fingerprint(params)) == TOOLS
+
+  source = server_dir / "server.py"
+  source.write_text("print('version 2')\n")
+  os.utime(source, ns=(0, 1_000_000_000))
+  assert cache.load("gti", server_fingerprint(params)) is None
+
+
+def test_lock_file_change_invalidates(tmp_path):
+  params = server(tmp_path)
+  before = server_fingerprint(params)
+  (tmp_path / "pyproject.toml").write_text('[project]\nname = "gti"\nversion = "2"\n')
+  assert server_fingerprint(params) != before
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+  cache = ToolManifestCache(tmp_path)
+  (tmp_path / "gti.json").write_text("{not json")
+  assert cache.load("gti", "fp") is None